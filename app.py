@@ -1,13 +1,63 @@
+import gc
+import time
 from flask import Flask
 from flask_cors import CORS
-from blueprints.basic_endpoints import blueprint as basic_endpoints
 
+# Expressions touching every part of the grammar (evaluated once before serving any request)
+WARM_UP: tuple[str, ...] = (
+    "2+3*4-5/6%7^2",
+    "-(1)+5!",
+    "sin(PI)+cos(E)+tan(0)",
+    "mod(7,3)+fdiv(7,2)+min(1,2)+max(1,2)+root(4)+pow(2)+log(100)+ln(E)",
+    "add(1,2,3)+sub(3,2)+mul(2,3)+div(6,3)",
+)
+
+
+def warm_up() -> float:
+    """
+    Builds the grammar and evaluates warm-up expressions, so the first request doesn't pay compilation latency
+    (called before fork - workers share compiled state copy-on-write)
+
+    :return: Warm-up time in seconds
+    """
+    start = time.perf_counter()
+    # Importing setup builds rulesets and compiles tokenizer of the calculator
+    from setup import calculator
+    for expression in WARM_UP:
+        calculator.evaluate(expression)
+    calculator.compile("x+1")
+
+    # Objects created so far are never modified by garbage collector
+    # (otherwise collections in workers would copy pages shared with the master process)
+    gc.collect()
+    gc.freeze()
+    return time.perf_counter() - start
+
+
+def create_app() -> Flask:
+    """
+    Creates Flask app (ex for WSGI server: gunicorn --preload -w 4 "app:create_app()")
+    Startup time is stored in app config (STARTUP_TIME and WARM_UP_TIME in seconds)
+
+    :return: Flask app
+    """
+    start = time.perf_counter()
+    warm_up_time = warm_up()
+    # Blueprint uses calculator created by setup (already built by warm up)
+    from blueprints.basic_endpoints import blueprint as basic_endpoints
 
-if __name__ == "__main__":
     # Initiate Flask app
     app = Flask(__name__)
     app.register_blueprint(basic_endpoints)
     # Cors policy for communication with Angular
     app.config['CORS_HEADERS'] = 'Content-Type'
-    cors = CORS(app)
-    app.run(debug=True)
+    CORS(app)
+
+    app.config['WARM_UP_TIME'] = warm_up_time
+    app.config['STARTUP_TIME'] = time.perf_counter() - start
+    app.logger.info(f"Started in {app.config['STARTUP_TIME']:.3f}s (warm up {warm_up_time:.3f}s)")
+    return app
+
+
+if __name__ == "__main__":
+    create_app().run(debug=True)
@@ -0,0 +1,120 @@
+import random
+import re
+from typing import NamedTuple
+from setup import *
+
+
+def _symbols(ruleset: Ruleset) -> list[str]:
+    """
+    Symbols of ruleset tokens (read from identity patterns of the grammar)
+
+    :param ruleset: Ruleset of the grammar
+    :return: Symbols in order of ruleset identity
+    """
+    return [re.sub(r"\\(.)", r"\1", x.identity().pattern) for x in ruleset.identity]
+
+
+# Symbols of setup grammar (functions are paired with their minimal and maximal number of arguments)
+OPERATORS: list[str] = [x for x in _symbols(b_operator) if x not in _symbols(separator)]
+FUNCTIONS: list[tuple[str, int, float]] = [
+    (x.lower(), *token.flyweight().args_min_max) for x, token in zip(_symbols(function), function.identity)
+]
+CONSTANTS: list[str] = _symbols(constant)
+PREFIX: list[str] = _symbols(ul_operator)
+SUFFIX: list[str] = _symbols(ur_operator)
+SEPARATOR: str = _symbols(separator)[0]
+
+# Default weights of binary operators (operators giving huge results are rare)
+MIX: dict[str, float] = {'+': 4, '-': 4, '*': 3, '/': 2, '%': 1, '^': 0.25}
+# Default functions (defined for every argument, so random expressions rarely fail)
+CALLS: tuple[str, ...] = ('add', 'sub', 'mul', 'div', 'min', 'max', 'sin', 'cos', 'tan')
+
+
+class Shape(NamedTuple):
+    """
+    Parameters of generated expressions
+    """
+    # Number of operands (numbers and constants) of an expression
+    length: int
+    # Maximal nesting depth of brackets and function calls
+    depth: int = 4
+    # Weights of binary operators (missing operators are never used)
+    mix: dict[str, float] = MIX
+    # Maximal number of arguments of a function call
+    arguments: int = 4
+    # Names of used functions
+    calls: tuple[str, ...] = CALLS
+    # Probability of wrapping a subexpression in a function call (brackets are used with the same probability)
+    functions: float = 0.2
+
+
+def generate(shape: Shape, count: int, seed: int = 0) -> list[str]:
+    """
+    Generates expressions of the setup grammar
+
+    :param shape: Parameters of expressions
+    :param count: Number of expressions
+    :param seed: Seed of the generator (the same seed gives the same expressions)
+    :return: Whitespace free expressions
+    """
+    if shape.length < 1 or shape.depth < 0 or shape.arguments < 1:
+        raise ValueError("Invalid shape of expressions", shape)
+    if unknown := set(shape.mix) - set(OPERATORS):
+        raise ValueError(f"Unknown operators. Expected some of {OPERATORS}", unknown)
+    if unknown := set(shape.calls) - {x for x, _, _ in FUNCTIONS}:
+        raise ValueError("Unknown functions", unknown)
+
+    generator = random.Random(seed)
+    return [_expression(generator, shape, shape.length, shape.depth) for _ in range(count)]
+
+
+def _expression(generator: random.Random, shape: Shape, length: int, depth: int) -> str:
+    """
+    Generates random subexpression
+
+    :param generator: Random numbers generator
+    :param shape: Parameters of expressions
+    :param length: Number of operands of the subexpression
+    :param depth: Remaining nesting depth
+    :return: Subexpression
+    """
+    if depth > 0 and generator.random() < shape.functions:
+        # Operands are split between arguments (every argument gets at least one)
+        arguments = generator.randint(1, min(length, shape.arguments))
+        names = [x for x, low, high in FUNCTIONS if x in shape.calls and low <= arguments <= high]
+        if len(names) == 0:
+            # Only single argument functions are used
+            arguments, names = 1, [x for x, low, _ in FUNCTIONS if x in shape.calls and low <= 1]
+        name = generator.choice(names)
+        cuts = [0, *sorted(generator.sample(range(1, length), arguments - 1)), length]
+        return f"{name}(" + SEPARATOR.join(
+            _expression(generator, shape, cuts[i + 1] - cuts[i], depth - 1) for i in range(arguments)
+        ) + ")"
+    if depth > 0 and generator.random() < shape.functions:
+        return f"({_expression(generator, shape, length, depth - 1)})"
+    if length == 1:
+        return _operand(generator)
+
+    left = generator.randint(1, length - 1)
+    operator = generator.choices(list(shape.mix), weights=list(shape.mix.values()))[0]
+    return _expression(generator, shape, left, depth) + operator + _expression(generator, shape, length - left, depth)
+
+
+def _operand(generator: random.Random) -> str:
+    """
+    Generates random operand (number or constant, optionally with unary operator)
+
+    :param generator: Random numbers generator
+    :return: Operand
+    """
+    kind = generator.random()
+    if kind < 0.1:
+        return generator.choice(CONSTANTS)
+    if kind < 0.15:
+        # Factorial only of small integers
+        return f"{generator.randint(0, 9)}{generator.choice(SUFFIX)}"
+    if kind < 0.25:
+        return f"{generator.choice(PREFIX)}{generator.randint(1, 99)}"
+    if kind < 0.4:
+        return f"{generator.uniform(0, 100):.3f}"
+    return str(generator.randint(1, 99))
@@ -0,0 +1,55 @@
+import os
+import random
+import sys
+import time
+from setup import *
+
+
+def generate(count: int, seed: int = 0) -> list[tuple[str, dict]]:
+    """
+    Generates unique (not cached) expressions of similar cost
+
+    :param count: Number of expressions
+    :param seed: Seed of the generator (the same seed gives the same expressions)
+    :return: Pairs of expression and its operation options
+    """
+    generator = random.Random(seed)
+    return [
+        (f"sin({i})*{generator.randint(1, 99)}+pow({generator.random():.6f},2)^3-max({i},{generator.randint(1, 9)})!",
+         {'rad': generator.random() < 0.5})
+        for i in range(count)
+    ]
+
+
+def measure(evaluate, items: list[tuple[str, dict]]) -> float:
+    """
+    Measures evaluation time of the whole batch
+
+    :param evaluate: Batch evaluation function
+    :param items: Pairs of expression and its operation options
+    :return: Evaluation time in seconds
+    """
+    start = time.perf_counter()
+    evaluate(items)
+    return time.perf_counter() - start
+
+
+def main(count: int) -> None:
+    """
+    Prints speedup of parallel evaluation over sequential one for increasing number of workers
+
+    :param count: Number of expressions in the batch
+    """
+    sequential = measure(calculator.evaluate_batch, generate(count))
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    print(f"{'-':>8} {sequential:>10.4f} {1:>8.2f}")
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        # Warm-up batch starts worker processes (their start-up is not measured)
+        calculator.evaluate_parallel(generate(workers, seed=1), workers=workers)
+        seconds = measure(lambda x: calculator.evaluate_parallel(x, workers=workers), generate(count, seed=workers + 1))
+        print(f"{workers:>8} {seconds:>10.4f} {sequential / seconds:>8.2f}")
+    calculator.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
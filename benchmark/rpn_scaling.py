@@ -0,0 +1,53 @@
+import sys
+import timeit
+from typing import Callable
+from setup import *
+
+# Expression shapes built for given number of operators
+# (left associative chain keeps operands stack shallow, right associative one makes it deep,
+# variadic call passes every operand as an argument of a single function)
+SHAPES: dict[str, Callable[[int], str]] = {
+    'chain': lambda n: "+".join(["1"] * (n + 1)),
+    'deep': lambda n: "^".join(["1"] * (n + 1)),
+    'call': lambda n: f"add({','.join(['1'] * (n + 1))})"
+}
+
+
+def measure(calculator: Calculator, shape: Callable[[int], str], operators: int, repeat: int = 5) -> float:
+    """
+    Measures evaluation time of compiled (cached) expression
+
+    :param calculator: Calculator used for evaluation
+    :param shape: Expression builder (one of SHAPES)
+    :param operators: Number of operators (or separators) in the expression
+    :param repeat: Number of measurements (the best one is taken)
+    :return: Evaluation time in seconds
+    """
+    expression = shape(operators)
+    # First evaluation compiles the expression (further ones reuse cached program)
+    calculator.evaluate(expression)
+    return min(timeit.repeat(lambda: calculator.evaluate(expression), number=1, repeat=repeat))
+
+
+def main(sizes: list[int]) -> None:
+    """
+    Prints evaluation time for expressions of increasing size
+    (constant time per operator means linear scaling)
+
+    :param sizes: Numbers of operators to measure
+    """
+    # Optimizer would fold every shape into a single constant (interpreter of the program is measured instead)
+    calculator = Calculator(optimize=False)
+    calculator.set_rules(
+        function=function, separator=separator, open_bracket=open_bracket, close_bracket=close_bracket,
+        number=number, b_operator=b_operator
+    )
+    print(f"{'shape':>6} {'operators':>10} {'seconds':>10} {'ns/operator':>12}")
+    for name, shape in SHAPES.items():
+        for size in sizes:
+            seconds = measure(calculator, shape, size)
+            print(f"{name:>6} {size:>10} {seconds:>10.4f} {seconds / size * 1e9:>12.1f}")
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [10_000, 20_000, 50_000, 100_000])
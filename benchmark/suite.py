@@ -0,0 +1,209 @@
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+from typing import Optional
+from benchmark.corpus import Shape, generate
+from logic.observer import Observer
+from setup import *
+
+# Benchmarked corpora (lengths are multiplied by the scale of the run)
+CASES: dict[str, Shape] = {
+    'short': Shape(length=4, depth=2),
+    'long': Shape(length=256, mix={'+': 4, '-': 4, '*': 3, '/': 2, '%': 1}),
+    'deep': Shape(length=32, depth=32, functions=0.6),
+    'functions': Shape(length=64, depth=8, arguments=8, functions=0.5),
+    'arithmetic': Shape(length=64, depth=0, mix={'+': 1, '-': 1, '*': 1, '/': 1})
+}
+
+# Measured timings - pipeline stages (tokenize and validate make Tokenizer.parse, rpn is conversion to rpn,
+# evaluate is execution of the program) and the whole Calculator.evaluate with and without cache
+# (optimizer is disabled by default - corpus has no variables, so it would fold whole programs into constants
+# and evaluate would not execute any instruction)
+TIMINGS: tuple[str, ...] = (*Metrics.STAGES, 'calculator', 'cached')
+
+
+class StageTimer(Observer):
+    """
+    Observer summing up durations of pipeline stages
+    """
+    seconds: dict[str, float]
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(Metrics.STAGES, 0.0)
+
+    def end(self, stage: str, expression: str, seconds: float, error: Optional[Exception]) -> None:
+        self.seconds[stage] += seconds
+
+
+def build(**options) -> Calculator:
+    """
+    Creates calculator with the setup grammar
+
+    :param options: Calculator options
+    :return: Calculator
+    """
+    result = Calculator(history_size=0, **options)
+    result.set_rules(
+        function=function, separator=separator, constant=constant, variable=variable, open_bracket=open_bracket,
+        close_bracket=close_bracket, number=number, ul_operator=ul_operator, ul_start_operator=ul_start_operator,
+        b_operator=b_operator, ur_operator=ur_operator
+    )
+    return result
+
+
+def evaluate(calculator: Calculator, expressions: list[str]) -> tuple[float, int]:
+    """
+    Evaluates every expression (failed expressions are counted)
+
+    :param calculator: Calculator used for evaluation
+    :param expressions: Evaluated expressions
+    :return: Evaluation time in seconds and number of failed expressions
+    """
+    errors = 0
+    gc.disable()
+    start = time.perf_counter()
+    try:
+        for expression in expressions:
+            try:
+                calculator.evaluate(expression)
+            except Exception:
+                errors += 1
+        return time.perf_counter() - start, errors
+    finally:
+        gc.enable()
+
+
+def measure(expressions: list[str], repeat: int, mode: str, optimize: bool) -> tuple[dict[str, float], int]:
+    """
+    Measures timings of the corpus
+
+    :param expressions: Corpus of expressions
+    :param repeat: Number of measurements (the best one is taken)
+    :param mode: Evaluation mode (one of Calculator.MODES)
+    :param optimize: Decides if programs are optimized
+    :return: Timings (mean time of a single expression in seconds) and number of failed expressions
+    """
+    best = dict.fromkeys(TIMINGS, float('inf'))
+    # Disabled cache makes every evaluation go through the whole pipeline
+    timer = StageTimer()
+    options = {'mode': mode, 'optimize': optimize}
+    staged, plain, cached = build(cache_size=0, observers=[timer], **options), build(cache_size=0, **options), \
+        build(cache_size=len(expressions), **options)
+    _, errors = evaluate(cached, expressions)
+
+    for _ in range(repeat):
+        timer.seconds = dict.fromkeys(Metrics.STAGES, 0.0)
+        evaluate(staged, expressions)
+        timings = {**timer.seconds, 'calculator': evaluate(plain, expressions)[0],
+                   'cached': evaluate(cached, expressions)[0]}
+        for name, seconds in timings.items():
+            best[name] = min(best[name], seconds / len(expressions))
+
+    return best, errors
+
+
+def run(count: int, repeat: int, scale: float, seed: int, mode: str, optimize: bool) -> dict:
+    """
+    Measures every benchmarked corpus
+
+    :param count: Number of expressions of a corpus
+    :param repeat: Number of measurements of a corpus
+    :param scale: Multiplier of expression lengths
+    :param seed: Seed of the corpus generator
+    :param mode: Evaluation mode (one of Calculator.MODES)
+    :param optimize: Decides if programs are optimized
+    :return: Results (serializable to JSON)
+    """
+    results = {
+        'meta': {'python': platform.python_version(), 'machine': platform.machine(), 'count': count,
+                 'repeat': repeat, 'scale': scale, 'seed': seed, 'mode': mode, 'optimize': optimize},
+        'cases': dict()
+    }
+    for name, shape in CASES.items():
+        shape = shape._replace(length=max(1, round(shape.length * scale)))
+        timings, errors = measure(generate(shape, count, seed), repeat, mode, optimize)
+        results['cases'][name] = {'shape': shape._asdict(), 'errors': errors, 'seconds': timings}
+        print(f"{name:>12} " + " ".join(f"{x}={y * 1e6:.1f}us" for x, y in timings.items()), file=sys.stderr)
+
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float, noise: float) -> list[tuple[str, str, float, float]]:
+    """
+    Compares results with baseline
+
+    :param baseline: Baseline results
+    :param current: Compared results
+    :param threshold: Allowed relative slowdown (ex 0.1 allows timings 10% longer than baseline)
+    :param noise: Absolute slowdown ignored regardless of threshold (in seconds)
+    :return: Regressions - case, timing, baseline and current time in seconds
+    """
+    regressions = []
+    print(f"{'case':>12} {'timing':>10} {'baseline':>10} {'current':>10} {'change':>8}")
+    for case, result in current['cases'].items():
+        reference = baseline['cases'].get(case)
+        if reference is None:
+            continue
+        for timing, seconds in result['seconds'].items():
+            before = reference['seconds'].get(timing)
+            if before is None:
+                continue
+            regression = seconds > before * (1 + threshold) and seconds - before > noise
+            if regression:
+                regressions.append((case, timing, before, seconds))
+            print(f"{case:>12} {timing:>10} {before * 1e6:>8.1f}us {seconds * 1e6:>8.1f}us "
+                  f"{seconds / before - 1:>+8.1%}" + ("  REGRESSION" if regression else ""))
+
+    # Results are comparable only if measured with the same parameters
+    for key, value in current['meta'].items():
+        if baseline['meta'].get(key) != value:
+            print(f"Warning: {key} differs from baseline ({baseline['meta'].get(key)} != {value})")
+    return regressions
+
+
+def main(arguments: list[str]) -> int:
+    """
+    Runs benchmarks and/or compares results with baseline
+
+    :param arguments: Command line arguments
+    :return: Exit code (1 if any regression was found)
+    """
+    parser = argparse.ArgumentParser(description="Benchmark suite of the calculator")
+    parser.add_argument('--count', type=int, default=100, help="number of expressions of a corpus")
+    parser.add_argument('--repeat', type=int, default=5, help="number of measurements (the best one is taken)")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiplier of expression lengths")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the corpus generator")
+    parser.add_argument('--mode', choices=Calculator.MODES, default='interpret', help="evaluation mode")
+    parser.add_argument('--optimize', action='store_true', help="optimize programs (folds constant corpus)")
+    parser.add_argument('--output', help="file the results are saved to (JSON)")
+    parser.add_argument('--input', help="file with results to compare instead of running benchmarks")
+    parser.add_argument('--baseline', help="file with baseline results the results are compared with")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed relative slowdown")
+    parser.add_argument('--noise', type=float, default=2e-7, help="ignored absolute slowdown in seconds")
+    options = parser.parse_args(arguments)
+
+    if options.input:
+        with open(options.input) as file:
+            results = json.load(file)
+    else:
+        results = run(options.count, options.repeat, options.scale, options.seed, options.mode, options.optimize)
+    if options.output:
+        with open(options.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    elif not options.baseline:
+        print(json.dumps(results, indent=2))
+
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, results, options.threshold, options.noise)
+        print(f"{len(regressions)} regression(s) found")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,10 +1,67 @@
-from flask import Blueprint, request, make_response
+import json
+import os
+import uuid
+from typing import IO, Iterable, Iterator, Optional, Union
+from flask import Blueprint, Response, abort, current_app, request, make_response, stream_with_context
 from flask_cors import cross_origin
 from setup import calculator
+from logic.errors import ExpressionSizeException, ExpressionDepthException
 
 # Blueprint to be used by Flask app
 blueprint: Blueprint = Blueprint('basic_endpoints', __name__)
 
+# History page size limits
+HISTORY_PAGE: int = 50
+HISTORY_PAGE_MAX: int = 1000
+# Versions of history are numbered from 1 in every process (ETag has to differ between processes and restarts)
+# - token is drawn again in every forked process (workers of preloaded app do not share the token of the master)
+_INSTANCE: str = uuid.uuid4().hex[:8]
+# Session key is read from header (or cookie) - requests without it use shared history
+SESSION_HEADER: str = 'X-Session-Id'
+SESSION_COOKIE: str = 'session_id'
+SESSION_MAX_LENGTH: int = 128
+# Maximal length of a single line of streamed request (longer lines are never read into memory as a whole)
+STREAM_LINE_MAX: int = 1 << 20
+
+
+def _reseed() -> None:
+    """
+    Draws new instance token (called in child process after fork)
+    """
+    global _INSTANCE
+    _INSTANCE = uuid.uuid4().hex[:8]
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed)
+
+
+def _session() -> Optional[str]:
+    """
+    Session key of the request
+
+    :return: Session key (None if request has no session)
+    """
+    session = request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+    if session is not None and len(session) > SESSION_MAX_LENGTH:
+        abort(400, f"Session key is too long. Expected at most {SESSION_MAX_LENGTH} characters")
+
+    return session
+
+
+@blueprint.after_request
+def count_request(response: Response) -> Response:
+    """
+    Counts handled requests (by endpoint and status)
+
+    :param response: Response to the request
+    :return: Unchanged response
+    """
+    if calculator.metrics is not None:
+        calculator.metrics.increment('requests', endpoint=request.endpoint or '', status=str(response.status_code))
+
+    return response
+
 
 @blueprint.route('/evaluate', methods=['POST'])
 @cross_origin()
@@ -14,22 +71,182 @@ def evaluate():
 
     :return: Response with result if everything was correct or error encountered during evaluation
     """
+    session = _session()
     try:
         inp = request.get_json()
-        calculator.evaluate(inp['expression'], True, **inp.get('options', dict()))
-        return calculator.history[0]["result"]
+        # History is shared between concurrent requests (result is taken directly from evaluation)
+        result = calculator.evaluate(inp['expression'], True, session, **inp.get('options', dict()))
+        return calculator.format_result(result)
+    except ExpressionSizeException as e:
+        # Expressions exceeding admission limits are rejected before tokenization
+        return make_response(str(e), 413)
+    except ExpressionDepthException as e:
+        return make_response(str(e), 422)
     except Exception as e:
-        print(e)
+        current_app.logger.exception(e)
         resp = make_response(str(e), 500)
         return resp
 
 
-@blueprint.route('/history', methods=['GET'])
+@blueprint.route('/evaluate/batch', methods=['POST'])
+@cross_origin()
+def evaluate_batch():
+    """
+    Post method for obtaining results of many mathematical equations at once
+
+    :return: Response with list of results (or errors) in order of given expressions
+    """
+    session = _session()
+    inp = request.get_json(silent=True)
+    if not isinstance(inp, dict) or not isinstance(inp.get('items'), list):
+        return make_response("Expected json object with list of items", 400)
+
+    try:
+        # Malformed items are reported as errors of those items only
+        items = [
+            (x.get('expression'), x.get('options', dict())) if isinstance(x, dict) else (x, dict())
+            for x in inp['items']
+        ]
+        results = calculator.evaluate_batch(items, inp.get('save', True), session)
+        return [
+            {'error': str(x)} if isinstance(x, Exception) else {'result': calculator.format_result(x)}
+            for x in results
+        ]
+    except Exception as e:
+        current_app.logger.exception(e)
+        resp = make_response(str(e), 500)
+        return resp
+
+
+@blueprint.route('/evaluate/stream', methods=['POST'])
 @cross_origin()
+def evaluate_stream():
+    """
+    Post method for obtaining results of newline delimited json expressions (the same format as /evaluate)
+    Results are streamed back as newline delimited json as soon as they are computed
+    (neither request nor response is kept in memory as a whole)
+
+    :return: Streamed response with result or error for every given expression (in order of expressions)
+    """
+    save = request.args.get('save', 'true').lower() != 'false'
+    session = _session()
+    # Generator pipeline - request lines are read only when next result is requested by the response
+    lines = _non_empty(_read_lines(request.stream, STREAM_LINE_MAX))
+    results = _evaluate_lines(lines, save, session)
+    return Response(stream_with_context(_serialize(results)), mimetype='application/x-ndjson')
+
+
+def _read_lines(stream: IO[bytes], limit: int) -> Iterator[Optional[bytes]]:
+    """
+    Reads lines of request body (at most limit bytes of a line are kept in memory)
+
+    :param stream: Request body
+    :param limit: Maximal length of a line (newline excluded)
+    :return: Lines of request body (None in place of a line longer than limit)
+    """
+    while True:
+        line = stream.readline(limit + 1)
+        if not line:
+            return
+        if len(line) > limit and not line.endswith(b'\n'):
+            # Rest of too long line is skipped (chunk by chunk)
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(limit)
+            yield None
+        else:
+            yield line
+
+
+def _non_empty(lines: Iterable[Optional[bytes]]) -> Iterator[Optional[bytes]]:
+    """
+    Skips blank lines
+
+    :param lines: Lines of request body
+    :return: Not blank lines
+    """
+    for line in lines:
+        if line is None or line.strip():
+            yield line
+
+
+def _evaluate_lines(
+        lines: Iterable[Optional[bytes]],
+        save: bool,
+        session: Optional[str]
+) -> Iterator[dict[str, str]]:
+    """
+    Evaluates every json encoded expression (failure of one expression does not stop the stream)
+
+    :param lines: Json encoded expressions (None in place of too long line)
+    :param save: Decides if results are added to history
+    :param session: Session key (None for shared history)
+    :return: Result or error of every expression
+    """
+    for line in lines:
+        if line is None:
+            yield {'error': f"Line is too long. Expected at most {STREAM_LINE_MAX} bytes"}
+            continue
+        try:
+            inp = json.loads(line)
+            result = calculator.evaluate(inp['expression'], save, session, **inp.get('options', dict()))
+            yield {'result': calculator.format_result(result)}
+        except Exception as e:
+            yield {'error': str(e)}
+
+
+def _serialize(results: Iterable[dict[str, Union[str, float]]]) -> Iterator[str]:
+    """
+    Encodes results as newline delimited json
+
+    :param results: Results of expressions
+    :return: Json lines
+    """
+    for x in results:
+        yield json.dumps(x) + '\n'
+
+
+@blueprint.route('/history', methods=['GET'])
+@cross_origin(expose_headers=['ETag'])
 def history():
     """
-    Forwards used calculator's equation history
+    Forwards a page of used calculator's equation history (?limit=<size>&before=<id>)
+    Unchanged history is not serialized again (304 is returned for matching If-None-Match)
+    Requests with session key get only history of their session
 
-    :return: Calculator history
+    :return: Page of calculator history (the newest entries first)
     """
-    return calculator.history
+    # Parameters are parsed explicitly (invalid values are rejected instead of replaced with defaults)
+    try:
+        limit = min(int(request.args.get('limit', HISTORY_PAGE)), HISTORY_PAGE_MAX)
+        before = int(request.args['before']) if 'before' in request.args else None
+    except ValueError:
+        return make_response("Invalid page parameters. Expected integer limit and before", 400)
+    if limit < 0:
+        return make_response(f"Invalid limit {limit}", 400)
+
+    # Version of history is checked before any entry is copied
+    # (session without entries has no history yet - version 0 is never used by any history)
+    buffer = calculator.session_history(_session())
+    etag = f"{_INSTANCE}-{buffer.version if buffer is not None else 0}"
+    if request.if_none_match.contains(etag):
+        resp = make_response('', 304)
+    else:
+        resp = make_response(buffer.page(limit, before) if buffer is not None else [])
+    resp.set_etag(etag)
+    # History depends on session key of the request
+    resp.vary.update((SESSION_HEADER, 'Cookie'))
+    return resp
+
+
+@blueprint.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Forwards metrics of evaluation pipeline in Prometheus text format
+
+    :return: Metrics (404 if metrics are disabled)
+    """
+    if calculator.metrics is None:
+        return make_response("Metrics are disabled", 404)
+
+    text = calculator.metrics.render(calculator.cache.stats, calculator.history_buffer.stats)
+    return Response(text, mimetype='text/plain; version=0.0.4')
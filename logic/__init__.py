@@ -1,3 +1,16 @@
+from .cache import *
+from .observer import *
+from .metrics import *
+from .persistence import *
+from .history import *
+from .sessions import *
+from .stream import *
+from .program import *
+from .native import *
+from .optimizer import *
+from .vectorized import *
+from .formula import *
+from .parallel import *
 from .calculator import *
 from .tokenizer import *
 from .tokens import *
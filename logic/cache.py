@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+Key_T = TypeVar('Key_T', bound=Hashable)
+Value_T = TypeVar('Value_T')
+
+
+class ProgramCache(Generic[Key_T, Value_T]):
+    """
+    Bounded, thread-safe LRU cache for compiled expressions
+    """
+    __capacity: int
+    __entries: OrderedDict
+    __lock: threading.Lock
+    __hits: int
+    __misses: int
+    __evictions: int
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Constructs new ProgramCache
+
+        :param capacity: Maximum number of stored entries (0 disables caching)
+        """
+        if capacity < 0:
+            raise ValueError("Cache capacity cannot be negative", capacity)
+
+        # Initiate fields
+        self.__capacity = capacity
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    @property
+    def capacity(self) -> int:
+        """
+        Maximum number of stored entries
+
+        :return: Cache capacity
+        """
+        return self.__capacity
+
+    @capacity.setter
+    def capacity(self, capacity: int) -> None:
+        """
+        Changes cache capacity (the least recently used entries are evicted if necessary)
+
+        :param capacity: New maximum number of stored entries
+        """
+        if capacity < 0:
+            raise ValueError("Cache capacity cannot be negative", capacity)
+
+        with self.__lock:
+            self.__capacity = capacity
+            self.__shrink()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Cache counters
+
+        :return: Number of hits, misses, evictions together with current size and capacity
+        """
+        with self.__lock:
+            return {
+                'hits': self.__hits,
+                'misses': self.__misses,
+                'evictions': self.__evictions,
+                'size': len(self.__entries),
+                'capacity': self.__capacity
+            }
+
+    def get(self, key: Key_T) -> Optional[Value_T]:
+        """
+        Retrieves cached entry (and marks it as the most recently used one)
+
+        :param key: Entry key
+        :return: Cached value or None if key is not present
+        """
+        with self.__lock:
+            value = self.__entries.get(key)
+            if value is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+                self.__entries.move_to_end(key)
+
+            return value
+
+    def put(self, key: Key_T, value: Value_T) -> None:
+        """
+        Stores entry in the cache (evicting the least recently used ones if capacity is exceeded)
+
+        :param key: Entry key
+        :param value: Entry value (should not be modified afterwards as it is shared between callers)
+        """
+        with self.__lock:
+            if self.__capacity == 0:
+                return
+
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            self.__shrink()
+
+    def clear(self) -> None:
+        """
+        Removes every entry (counters are preserved)
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __shrink(self) -> None:
+        """
+        Evicts the least recently used entries until capacity is respected (lock has to be acquired)
+        """
+        while len(self.__entries) > self.__capacity:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
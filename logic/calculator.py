@@ -1,33 +1,311 @@
+import functools
+import re
+import threading
+import time
 from . import tokenizer
-from typing import Callable
-import collections.abc
+from typing import Any, Callable, Iterable, Mapping, NamedTuple, Optional, Type
+from .cache import ProgramCache
+from .history import History
+from .persistence import HistoryStore
+from .sessions import SessionHistories
+from .metrics import Metrics
+from .observer import Observer, observe
+from .stream import TokenStream
+from .program import Opcode, Program
+from .native import lower_program
+from .optimizer import optimize_program
+from .formula import Formula
+from .vectorized import evaluate_vectorized
+from .parallel import ProcessEvaluator
 from .tokens import *
 from .errors import *
 
+# Opcodes as plain integers (for fast comparisons in evaluation loop)
+_PUSH, _LOAD, _UNARY, _BINARY, _STORE, _FETCH = (
+    int(Opcode.PUSH), int(Opcode.LOAD), int(Opcode.UNARY), int(Opcode.BINARY), int(Opcode.STORE), int(Opcode.FETCH)
+)
+# Number of interpreted instructions between deadline checks
+_DEADLINE_INTERVAL: int = 1024
+# Maximal number of lowered functions kept for a single program (other sets of options are interpreted)
+_NATIVES_LIMIT: int = 8
+# Cheap approximation of tokens used by admission checks (runs of name or number characters and single symbols)
+_SCAN: re.Pattern = re.compile(r"[A-Za-z0-9_.]+|[^A-Za-z0-9_.]")
+# Brackets counted by admission checks (the same symbols OpenBracket and CloseBracket tokens are made of)
+_OPEN: frozenset[str] = frozenset("([{")
+_CLOSE: frozenset[str] = frozenset(")]}")
+
+
+class _Kind(IntEnum):
+    """
+    Enum for token type roles in rpn conversion
+    """
+    OPERAND = 0
+    OPEN_BRACKET = 1
+    CLOSE_BRACKET = 2
+    SEPARATOR = 3
+    OPERATOR = 4
+    INVALID = 5
+    UNRECOGNIZED = 6
+
+
+class _TypeInfo(NamedTuple):
+    """
+    Token type classification (role, compiled opcode, flyweight token and operator ordering properties)
+    """
+    kind: _Kind
+    opcode: Optional[Opcode]
+    flyweight: Token_t
+    precedence: int = 0
+    associativity: Associativity = Associativity.LTR
+
+
+@functools.lru_cache(maxsize=64)
+def _classify(types: tuple[Type[Token_t], ...]) -> tuple[_TypeInfo, ...]:
+    """
+    Classifies every token type of types table
+
+    :param types: Token types table
+    :return: Classification of every token type (indexed by type code)
+    """
+    def info(kind: Type[Token_t]) -> _TypeInfo:
+        token = kind.flyweight()
+        if issubclass(kind, Variable):
+            return _TypeInfo(_Kind.OPERAND, Opcode.LOAD, token)
+        elif issubclass(kind, Operand):
+            return _TypeInfo(_Kind.OPERAND, Opcode.PUSH, token)
+        elif issubclass(kind, OpenBracket):
+            return _TypeInfo(_Kind.OPEN_BRACKET, None, token)
+        elif issubclass(kind, CloseBracket):
+            return _TypeInfo(_Kind.CLOSE_BRACKET, None, token)
+        elif issubclass(kind, BinaryComma):
+            # Separators are not compiled into instructions (functions know number of their arguments)
+            return _TypeInfo(_Kind.SEPARATOR, None, token)
+        elif issubclass(kind, AnyChar):
+            return _TypeInfo(_Kind.INVALID, None, token)
+        elif issubclass(kind, Operator):
+            opcode = (
+                Opcode.BINARY if issubclass(kind, Binary) else
+                Opcode.UNARY if issubclass(kind, Unary) else
+                Opcode.CALL if issubclass(kind, Function) else
+                None
+            )
+            return _TypeInfo(_Kind.OPERATOR, opcode, token, token.precedence, token.associativity)
+        else:
+            return _TypeInfo(_Kind.UNRECOGNIZED, None, token)
+
+    return tuple(map(info, types))
+
 
 class Calculator:
     """
     Abstracts calculator functionality
+    (evaluate is reentrant and history writes are synchronized, so a single Calculator can be shared between threads)
     """
+    # Available evaluation modes
+    # - interpret: compiled program is interpreted instruction by instruction
+    # - compile: compiled program is lowered into python function (once per set of options)
+    MODES: tuple[str, ...] = ('interpret', 'compile')
+
+    __mode: str
+    __optimize: bool
+    __budget: Optional[int]
+    __timeout: Optional[float]
+    __max_length: Optional[int]
+    __max_tokens: Optional[int]
+    __max_depth: Optional[int]
     __tokenizer: tokenizer.Tokenizer
-    __history: list[dict[str, str]]
+    __history: History
+    __sessions: Optional[SessionHistories]
+    __metrics: Optional[Metrics]
+    __observers: tuple[Observer, ...]
+    __tracers: tuple[Observer, ...]
+    __observers_lock: threading.Lock
+    __cache: ProgramCache[str, Program]
+    __pool: Optional[ProcessEvaluator]
+    __pool_lock: threading.Lock
 
-    def __init__(self):
+    def __init__(
+            self,
+            cache_size: int = 1024,
+            engine: str = 'regex',
+            mode: str = 'interpret',
+            optimize: bool = True,
+            budget: Optional[int] = None,
+            timeout: Optional[float] = None,
+            max_length: Optional[int] = None,
+            max_tokens: Optional[int] = None,
+            max_depth: Optional[int] = None,
+            history_size: int = 10_000,
+            history_store: Optional[HistoryStore] = None,
+            sessions: Optional[SessionHistories] = None,
+            metrics: Optional[Metrics] = None,
+            observers: Iterable[Observer] = ()
+    ):
         """
         Creates new Calculator
+
+        :param cache_size: Number of compiled expressions kept in LRU cache (0 disables caching)
+        :param engine: Tokenizing engine (one of Tokenizer.ENGINES)
+        :param mode: Evaluation mode (one of Calculator.MODES)
+        :param optimize: Decides if compiled programs are optimized (see optimize_program)
+        :param budget: Maximal evaluation cost of an expression (see Program.cost, None means no limit)
+        :param timeout: Maximal time of a single evaluation in seconds (None means no limit)
+        :param max_length: Maximal number of characters of an expression (None means no limit)
+        :param max_tokens: Maximal (estimated) number of tokens of an expression (None means no limit)
+        :param max_depth: Maximal bracket nesting depth of an expression (None means no limit)
+        :param history_size: Number of the newest results kept in history (0 disables history)
+        :param history_store: Persistent history backend (history kept in memory becomes its cache)
+        :param sessions: Histories partitioned by session (results saved with session key are kept there)
+        :param metrics: Metrics recording durations of evaluation stages, evaluations and errors (None disables them)
+        :param observers: Observers notified about evaluation stages and executed operators (see Observer)
         """
-        self.__tokenizer = tokenizer.Tokenizer()
-        self.__history = []
+        if mode not in Calculator.MODES:
+            raise ValueError(f"Unknown mode. Expected one of {Calculator.MODES}", mode)
+        if budget is not None and budget < 0:
+            raise ValueError("Budget can't be negative", budget)
+        if timeout is not None and timeout <= 0:
+            raise ValueError("Timeout must be positive", timeout)
+        if any(x is not None and x < 0 for x in (max_length, max_tokens, max_depth)):
+            raise ValueError("Limits can't be negative", max_length, max_tokens, max_depth)
+
+        self.__mode = mode
+        self.__optimize = optimize
+        self.__budget = budget
+        self.__timeout = timeout
+        self.__max_length = max_length
+        self.__max_tokens = max_tokens
+        self.__max_depth = max_depth
+        self.__tokenizer = tokenizer.Tokenizer(engine)
+        self.__metrics = metrics
+        self.__observers_lock = threading.Lock()
+        # Metrics are notified about stages as the first observer
+        self.__publish((metrics, *observers) if metrics is not None else tuple(observers))
+        self.__history = History(history_size, history_store)
+        self.__sessions = sessions
+        self.__cache = ProgramCache(cache_size)
+        self.__pool = None
+        self.__pool_lock = threading.Lock()
 
     @property
     def history(self) -> list[dict[str, str]]:
         """
         Operations history
 
-        :return: History of operations (lower index represents newer result)
+        :return: Snapshot of operations history (lower index represents newer result)
+        """
+        return self.__history.snapshot()
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """
+        Metrics of evaluation pipeline
+
+        :return: Metrics (None if evaluation is not measured)
+        """
+        return self.__metrics
+
+    @property
+    def observers(self) -> tuple[Observer, ...]:
+        """
+        Observers of evaluation pipeline
+
+        :return: Tuple of observers (metrics included)
+        """
+        return self.__observers
+
+    def add_observer(self, observer: Observer) -> None:
+        """
+        Registers observer of evaluation pipeline
+
+        :param observer: Observer (see Observer)
+        """
+        with self.__observers_lock:
+            self.__publish((*self.__observers, observer))
+
+    def remove_observer(self, observer: Observer) -> None:
+        """
+        Unregisters observer of evaluation pipeline
+
+        :param observer: Registered observer
+        """
+        with self.__observers_lock:
+            self.__publish(tuple(x for x in self.__observers if x is not observer))
+
+    @property
+    def sessions(self) -> Optional[SessionHistories]:
+        """
+        Histories partitioned by session
+
+        :return: Session histories (None if results are saved only in shared history)
+        """
+        return self.__sessions
+
+    def session_history(self, session: Optional[str]) -> Optional[History]:
+        """
+        History results saved with given session key are added to
+
+        :param session: Session key (None for shared history)
+        :return: History (None if session has no entries yet)
+        """
+        if session is None or self.__sessions is None:
+            return self.__history
+
+        return self.__sessions.get(session)
+
+    @property
+    def history_buffer(self) -> History:
+        """
+        Storage of operations history (bounded ring buffer)
+
+        :return: History used by evaluate
         """
         return self.__history
 
+    @property
+    def mode(self) -> str:
+        """
+        Evaluation mode
+
+        :return: Name of used mode
+        """
+        return self.__mode
+
+    @property
+    def budget(self) -> Optional[int]:
+        """
+        Maximal evaluation cost of an expression
+
+        :return: Cost units (None means no limit)
+        """
+        return self.__budget
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """
+        Maximal time of a single evaluation
+
+        :return: Seconds (None means no limit)
+        """
+        return self.__timeout
+
+    @property
+    def limits(self) -> tuple[Optional[int], Optional[int], Optional[int]]:
+        """
+        Admission limits checked before an expression is tokenized
+
+        :return: Maximal length, number of tokens and bracket nesting depth (None means no limit)
+        """
+        return self.__max_length, self.__max_tokens, self.__max_depth
+
+    @property
+    def cache(self) -> ProgramCache[str, Program]:
+        """
+        Cache of compiled expressions (rpn ordered programs keyed by whitespace free expression)
+
+        :return: Cache used by evaluate
+        """
+        return self.__cache
+
     def set_rules(self, **kwargs: tokenizer.Ruleset) -> None:
         """
         Sets ruleset for parsing logic
@@ -36,21 +314,32 @@ class Calculator:
         """
         self.__tokenizer.set_rules(**kwargs)
         self.__tokenizer.compile()
+        # Compiled expressions are no longer valid for changed grammar
+        self.__cache.clear()
 
-    def set_validators(self, **validators: Callable[[list[Token_t]], None]) -> None:
+    def set_validators(self, **validators: Callable[[TokenStream], None]) -> None:
         """
         Sets validators for additional checks (they are ignored here)
 
         :param validators: Callables (called in verify stage of parsing)
         """
         self.__tokenizer.set_validators(**validators)
+        # Cached expressions were accepted by previous validators
+        self.__cache.clear()
 
-    def evaluate(self, expression: str, save: bool = False, **operation_options: Union[bool, str]) -> float:
+    def evaluate(
+            self,
+            expression: str,
+            save: bool = False,
+            session: Optional[str] = None,
+            **operation_options: Union[bool, str]
+    ) -> float:
         """
         Evaluates stringified mathematical expression
 
         :param expression: Stringified mathematical expression
         :param save: Decides if result are added to history
+        :param session: Session key (result is saved in history of the session instead of shared history)
         :param operation_options: Additional options passed to individual math operations
         (ex rad=True for trigonometric functions)
         :return: Result of the equation
@@ -60,112 +349,579 @@ class Calculator:
             raise TypeError(f"Invalid type: {expression.__class__}. Only strings are allowed.")
 
         # Internal evaluation stages
-        # 1. Parse to token list
-        # 2. Convert token list to rpn order
-        # 3. Evaluate rpn ordered list
-        # 4. Round for precision lost
-        tokens: list[Token_t] = self.__tokenizer.parse(expression)
-        rpn: list[Token_t] = self.__to_rpn(tokens)
-        result: float = round(self.__evaluate_rpn(rpn, **operation_options), 15)
+        # 1. Compile expression (or take compiled one from cache)
+        # 2. Run compiled program (expression without bindings can't contain variables)
+        #    - deadline includes compilation time
+        deadline: Optional[float] = self.__deadline()
+        try:
+            result: float = self.__run(self.__compile(expression, deadline), dict(), deadline, **operation_options)
+        except Exception as e:
+            if self.__metrics is not None:
+                self.__metrics.increment('errors', type=type(e).__name__)
+            raise
+
+        if self.__metrics is not None:
+            self.__metrics.increment('evaluations')
 
         # Optional saving
         if save:
-            # Trim leading 0 in floats such that ex 1.0 becomes 1 but 1.02 is still 1.02
-            # (for readability)
-            stringified_result: str = re.sub(r'\.0$', '', str(result))
-            self.__history.insert(0, {'expression': expression, 'result': stringified_result})
+            self.__save([(expression, self.format_result(result))], session)
 
         return result
 
-    def __to_rpn(self, tokens: list[Token_t]) -> list[Token_t]:
+    def evaluate_batch(
+            self,
+            items: Iterable[tuple[str, Mapping[str, Union[bool, str]]]],
+            save: bool = False,
+            session: Optional[str] = None
+    ) -> list[Union[float, Exception]]:
         """
-        Change given list of tokens order to represent rpn
+        Evaluates many stringified mathematical expressions (failure of one expression does not stop the batch)
 
-        :return: Rpn ordered list of tokens
+        :param items: Pairs of expression and its operation options
+        :param save: Decides if successful results are added to history (all at once, in order of expressions)
+        :param session: Session key (results are saved in history of the session instead of shared history)
+        :return: Results in order of expressions (exception raised by evaluation in place of failed result)
         """
-        operators: list[Operator_T] = []
-        result: list[Token_t] = []
-        for token in tokens:
+        results: list[Union[float, Exception]] = []
+        entries: list[tuple[str, str]] = []
+        for expression, options in items:
+            try:
+                result = self.evaluate(expression, False, None, **options)
+            except Exception as e:
+                results.append(e)
+                continue
+
+            results.append(result)
+            if save:
+                entries.append((expression, self.format_result(result)))
+
+        # History is locked once per batch
+        self.__save(entries, session)
+        return results
+
+    def evaluate_parallel(
+            self,
+            items: Iterable[tuple[str, Mapping[str, Union[bool, str]]]],
+            save: bool = False,
+            workers: Optional[int] = None,
+            session: Optional[str] = None
+    ) -> list[Union[float, Exception]]:
+        """
+        Evaluates many stringified mathematical expressions in worker processes (for large CPU bound batches)
+        Workers evaluate expressions with a copy of this calculator (the same rules, validators, mode and limits)
+        built once per worker process
+
+        :param items: Pairs of expression and its operation options
+        :param save: Decides if successful results are added to history (all at once, in order of expressions)
+        :param workers: Number of worker processes (defaults to number of cores)
+        :param session: Session key (results are saved in history of the session instead of shared history)
+        :return: Results in order of expressions (exception raised by evaluation in place of failed result)
+        """
+        items = list(items)
+        rules, validators = self.__tokenizer.rules, self.__tokenizer.validators
+        options = {
+            'engine': self.__tokenizer.engine, 'mode': self.__mode, 'optimize': self.__optimize,
+            'budget': self.__budget, 'timeout': self.__timeout, 'max_length': self.__max_length,
+            'max_tokens': self.__max_tokens, 'max_depth': self.__max_depth
+        }
+        with self.__pool_lock:
+            # Worker processes are kept between batches
+            # (pool is replaced only if its configuration changes - ex rules are set again)
+            pool = self.__pool
+            if pool is None or pool.configuration != (rules, validators, options) or \
+                    (workers is not None and pool.workers != workers):
+                if pool is not None:
+                    pool.close()
+                pool = self.__pool = ProcessEvaluator(workers, rules, validators, **options)
+
+        results = pool.evaluate(items)
+        if save:
+            self.__save([
+                (expression, self.format_result(result))
+                for (expression, _), result in zip(items, results) if not isinstance(result, Exception)
+            ], session)
+
+        return results
+
+    def close(self) -> None:
+        """
+        Stops worker processes started by evaluate_parallel
+        """
+        with self.__pool_lock:
+            pool, self.__pool = self.__pool, None
+
+        if pool is not None:
+            pool.close()
+
+    def compile(self, expression: str) -> Formula:
+        """
+        Compiles stringified mathematical expression (which can contain variables) for repeated evaluation
+
+        :param expression: Stringified mathematical expression
+        :return: Formula evaluated with variable bindings
+        """
+        # Enforce that expression is a str
+        if not isinstance(expression, str):
+            raise TypeError(f"Invalid type: {expression.__class__}. Only strings are allowed.")
+
+        return Formula(expression, self.__compile(expression), self.__run, self.__run_vectorized)
+
+    @staticmethod
+    def format_result(result: float) -> str:
+        """
+        Stringifies evaluation result (the same way as it is stored in history)
+
+        :param result: Evaluation result
+        :return: Stringified result
+        """
+        # Trim leading 0 in floats such that ex 1.0 becomes 1 but 1.02 is still 1.02
+        # (for readability)
+        return re.sub(r'\.0$', '', str(result))
+
+    def __save(self, entries: list[tuple[str, str]], session: Optional[str] = None) -> None:
+        """
+        Adds entries to history
+
+        :param entries: Pairs of expression and stringified result (in order of evaluation)
+        :param session: Session key (None for shared history - also used if sessions are not configured)
+        """
+        if len(entries) == 0:
+            return
+
+        # History is locked once per call (the oldest entries are evicted if history is full)
+        if session is None or self.__sessions is None:
+            self.__history.extend(entries)
+        else:
+            self.__sessions.extend(session, entries)
+
+    def __compile(self, expression: str, deadline: Optional[float] = None) -> Program:
+        """
+        Compiles stringified mathematical expression into rpn ordered program
+
+        :param expression: Stringified mathematical expression
+        :param deadline: Monotonic clock time compilation has to end before (None means no limit)
+        :return: Rpn ordered program
+        """
+        # Internal compilation stages
+        # 1. Reject too long expression before any processing
+        # 2. Look up compiled expression in cache (whitespaces do not change the meaning of an expression)
+        # 3. On cache miss check structural limits, parse to token stream, compile token stream into
+        #    rpn ordered program, optimize it and cache the result
+        #    - deadline is checked between stages and during optimization
+        #    - programs exceeding budget are not optimized (folding would evaluate them ahead of time),
+        #      they are rejected by run instead
+        if self.__max_length is not None and len(expression) > self.__max_length:
+            raise ExpressionSizeException(
+                f"Expression is too long. Expected at most {self.__max_length} characters. Got {len(expression)}"
+            )
+
+        key: str = re.sub(r"\s", '', expression)
+        rpn: Program = self.__cache.get(key)
+        if rpn is None:
+            self.__admit(key)
+            tokens: TokenStream = self.__tokenizer.parse(key)
+            self.__check_deadline(deadline)
+            # Observers are notified about stages only if there are any (stages are called directly otherwise)
+            observers = self.__observers
+            rpn = self.__to_rpn(tokens) if not observers else observe(observers, 'rpn', key, self.__to_rpn, tokens)
+            self.__check_deadline(deadline)
+            if self.__optimize and (self.__budget is None or rpn.cost <= self.__budget):
+                rpn = optimize_program(rpn, deadline) if not observers else \
+                    observe(observers, 'optimize', key, optimize_program, rpn, deadline)
+            self.__cache.put(key, rpn)
+
+        return rpn
+
+    def __admit(self, expression: str) -> None:
+        """
+        Checks structural limits of an expression in a single linear scan (stopped as soon as a limit is exceeded)
+
+        :param expression: Whitespace free expression
+        """
+        max_tokens, max_depth = self.__max_tokens, self.__max_depth
+        if max_tokens is None and max_depth is None:
+            return
+
+        count: int = 0
+        depth: int = 0
+        for count, match in enumerate(_SCAN.finditer(expression), 1):
+            if max_tokens is not None and count > max_tokens:
+                raise ExpressionSizeException(f"Expression has too many tokens. Expected at most {max_tokens}")
+
+            # Every kind of bracket accepted by OpenBracket and CloseBracket tokens is counted
+            symbol = match.group()
+            if symbol in _OPEN:
+                depth += 1
+                if max_depth is not None and depth > max_depth:
+                    raise ExpressionDepthException(
+                        f"Expression is nested too deep. Expected at most {max_depth} levels of brackets"
+                    )
+            elif symbol in _CLOSE:
+                depth -= 1
+
+    def __publish(self, observers: tuple[Observer, ...]) -> None:
+        """
+        Replaces observers (tuples are replaced as a whole, so evaluation never sees partial changes)
+
+        :param observers: Tuple of observers
+        """
+        self.__tracers = tuple(x for x in observers if x.traces_operators)
+        self.__observers = observers
+        self.__tokenizer.observers = observers
+
+    def __deadline(self) -> Optional[float]:
+        """
+        Deadline of evaluation starting now
+
+        :return: Monotonic clock time (None if evaluation time is not limited)
+        """
+        return None if self.__timeout is None else time.monotonic() + self.__timeout
+
+    def __check_deadline(self, deadline: Optional[float]) -> None:
+        """
+        Checks if deadline is exceeded
+
+        :param deadline: Monotonic clock time (None means no limit)
+        """
+        if deadline is not None and time.monotonic() > deadline:
+            raise DeadlineException(f"Evaluation exceeded timeout of {self.__timeout}s")
+
+    def __check_budget(self, rpn: Program) -> None:
+        """
+        Checks if program fits the budget (too expensive programs are rejected before any operation is executed)
+
+        :param rpn: Rpn ordered program
+        """
+        if self.__budget is not None and rpn.cost > self.__budget:
+            raise BudgetException(f"Evaluation cost {rpn.cost} exceeds budget {self.__budget}")
+
+    def __run_vectorized(self, rpn: Program, bindings: Mapping[str, Any], **options: Union[bool, str]) -> Any:
+        """
+        Runs compiled program with arrays of variable values (the same limits as for scalar evaluation)
+
+        :param rpn: Rpn ordered program
+        :param bindings: Values of variables (arrays or scalars broadcast against each other)
+        :param options: Options to pass to modify operators functionality
+        :return: Array of results
+        """
+        self.__check_budget(rpn)
+        deadline = self.__deadline()
+        try:
+            return evaluate_vectorized(rpn, bindings, deadline, **options)
+        except DeadlineException:
+            raise DeadlineException(f"Evaluation exceeded timeout of {self.__timeout}s") from None
+
+    def __run(
+            self,
+            rpn: Program,
+            bindings: Mapping[str, float],
+            deadline: Optional[float] = None,
+            **options: Union[bool, str]
+    ) -> float:
+        """
+        Runs compiled program with given variable bindings
+
+        :param rpn: Rpn ordered program
+        :param bindings: Values of variables (by variable name)
+        :param deadline: Monotonic clock time evaluation has to end before (defaults to timeout from now)
+        :param options: Options to pass to modify operators functionality
+        :return: Result of the equation (rounded for precision lost)
+        """
+        self.__check_budget(rpn)
+        if deadline is None:
+            deadline = self.__deadline()
+
+        # Variable values are passed in order of program variables
+        values: list[float] = []
+        for name in rpn.variables:
+            if name not in bindings:
+                raise VariableException(f"Unbound variable {name}")
+            try:
+                values.append(float(bindings[name]))
+            except (TypeError, ValueError):
+                raise VariableException(f"Invalid value of variable {name}", bindings[name])
+
+        # Evaluate rpn ordered program (interpret it or run it lowered into python function)
+        # and round for precision lost
+        observers = self.__observers
+        if not observers:
+            return round(self.__execute(rpn, values, deadline, **options), 15)
+
+        return round(observe(
+            observers, 'evaluate', rpn.tokens.source, lambda: self.__execute(rpn, values, deadline, **options)
+        ), 15)
+
+    def __to_rpn(self, tokens: TokenStream) -> Program:
+        """
+        Change given stream of tokens order to represent rpn (compiled into program instructions)
+        Conversion is also a validation pass - unrecognized parts of expression, unbalanced brackets
+        and separators not matching function arguments limit are reported here
+
+        :return: Rpn ordered program
+        """
+        # Token types are classified once per types table (instead of once per token)
+        kinds, codes = _classify(tokens.types), tokens.codes
+        # Operators stack keeps indexes of tokens (operator behaviour is read from type flyweights)
+        operators: list[int] = []
+        # Number of arguments (separated values) counted for every open bracket
+        # (first entry is reserved for the top level of expression)
+        arguments: list[int] = [1]
+        result: Program = Program(tokens)
+
+        def forward(index: int, arity: int = None) -> None:
+            # Every token is translated into instruction with opcode determined by its type
+            # (operands are cast only once - at compile time)
+            _, opcode, flyweight, _, _ = kinds[codes[index]]
+            if opcode == Opcode.PUSH:
+                result.push(tokens[index].cast, index)
+            elif opcode == Opcode.LOAD:
+                result.load(tokens.value_at(index), index)
+            elif opcode is not None:
+                result.apply(opcode, flyweight, index, arity)
+
+        def close(index: int) -> None:
+            # Bracket group is closed - function owning it (if any) is called with counted number of arguments
+            count = arguments.pop()
+            if len(operators) > 0 and kinds[codes[operators[-1]]].opcode == Opcode.CALL:
+                # Counted arguments have to fit function arguments limit
+                a_min, a_max = kinds[codes[operators[-1]]].flyweight.args_min_max
+                if not (a_min <= count <= a_max):
+                    raise SeparatorException(
+                        fr'Invalid number of separators. Expected {a_min - 1}-{a_max - 1}. Got {count - 1}',
+                        tokens[operators[-1]]
+                    )
+                forward(operators.pop(), count)
+            elif count > 1:
+                raise SeparatorException('Separators outside function body', tokens[index])
+
+        operand, open_bracket, close_bracket, separator, operator, invalid = (
+            _Kind.OPERAND, _Kind.OPEN_BRACKET, _Kind.CLOSE_BRACKET, _Kind.SEPARATOR, _Kind.OPERATOR, _Kind.INVALID
+        )
+        for i in range(len(tokens)):
             # For every token determine if it's operand, operator or special token (such as bracket)
-            if issubclass(type(token), Operand):
+            kind, _, _, precedence, associativity = kinds[codes[i]]
+            if kind == operand:
                 # Every operand is appended to result stack
-                result.append(token)
+                forward(i)
 
-            elif issubclass(type(token), OpenBracket):
-                # Every opening bracket is forwarded to operators stack
-                operators.append(token)
+            elif kind == open_bracket:
+                # Every opening bracket is forwarded to operators stack (and starts counting arguments)
+                operators.append(i)
+                arguments.append(1)
 
-            elif issubclass(type(token), CloseBracket):
+            elif kind == separator:
+                # Separator ends an argument - operators of the argument are appended to result stack
+                while len(operators) > 0 and kinds[codes[operators[-1]]].kind != open_bracket:
+                    forward(operators.pop())
+                arguments[-1] += 1
+
+            elif kind == close_bracket:
                 # If given token is closing bracket then
-                while not issubclass(type(operators[-1]), OpenBracket):
+                while len(operators) > 0 and kinds[codes[operators[-1]]].kind != open_bracket:
                     # append every operator token to result stack as long as it's not an open bracket
-                    result.append(operators.pop())
-                else:
-                    # discard operator (it should be an opening bracket)
-                    operators.pop()
+                    forward(operators.pop())
 
-            elif issubclass(type(token), Operator):
+                # Closing bracket without matching opening bracket
+                if len(operators) == 0:
+                    raise BracketException('Unbalanced brackets', tokens[i])
+
+                # discard operator (it is an opening bracket)
+                operators.pop()
+                close(i)
+
+            elif kind == operator:
                 # In case of operator determine how many (if any) operators should be forwarded to result stack
                 # Things to consider are operator precedence, and it's associativity
-                while (len(operators) > 0 and not issubclass(type(operators[-1]), OpenBracket) and
-                       (operators[-1].precedence > token.precedence or
-                       (operators[-1].precedence == token.precedence and
-                        token.associativity == Associativity.LTR))):
-                    result.append(operators.pop())
+                while len(operators) > 0:
+                    top_kind, _, _, top_precedence, _ = kinds[codes[operators[-1]]]
+                    if top_kind == open_bracket or not (
+                            top_precedence > precedence or
+                            (top_precedence == precedence and associativity == Associativity.LTR)):
+                        break
+                    forward(operators.pop())
 
                 # No matter what given token should still be added to result stack
                 # (after optional operators stated earlier)
-                operators.append(token)
+                operators.append(i)
+            elif kind == invalid:
+                # Part of expression not recognized by any ruleset
+                raise UnrecognizedTokenException('Invalid expression', tokens[i])
             else:
                 # In any other case given token is completely unrecognized by calculator
-                raise UnrecognizedTokenException(f"Invalid token {token}")
+                raise UnrecognizedTokenException(f"Invalid token {tokens[i]}")
         else:
             # Remaining operators goes to the end of rpn
+            # (not closed bracket groups are closed implicitly)
             while len(operators) > 0:
-                result.append(operators.pop())
+                index = operators.pop()
+                if kinds[codes[index]].kind == open_bracket:
+                    close(index)
+                else:
+                    forward(index)
+
+            if arguments[0] > 1:
+                raise SeparatorException('Separators outside bracket group', tokens.source)
 
         return result
 
-    def __evaluate_rpn(self, rpn: list[Token_t], **options: Union[bool, str]) -> float:
+    def __execute(
+            self,
+            rpn: Program,
+            values: list[float],
+            deadline: Optional[float],
+            **options: Union[bool, str]
+    ) -> float:
         """
-        Evaluates given list of tokens in rpn order
+        Executes given rpn ordered program in calculator mode
 
-        :param rpn: List of tokens in rpn order
+        :param rpn: Rpn ordered program
+        :param values: Values of program variables
+        :param deadline: Monotonic clock time evaluation has to end before (None means no limit)
         :param options: Options to pass to modify operators functionality
         :return: Result of all executed operations
         """
-        numbers: list[Union[float, list[float]]] = []
-        for token in rpn:
-            # For every token try one of possible token case
+        if self.__tracers:
+            # Operator events require evaluation instruction by instruction
+            return self.__trace_rpn(rpn, values, deadline, **options)
+
+        if self.__mode == 'compile':
+            # Program is lowered once per set of values of options its operators read
+            # (options come from clients, so unknown options are ignored and number of lowered functions is limited)
             try:
-                if issubclass(type(token), Operand):
-                    # Operands are cast by calling their cast method and appended to numbers stack
-                    numbers.append(token.cast)
-                elif issubclass(type(token), Binary):
+                relevant = {x: options[x] for x in rpn.options if x in options}
+                key = frozenset(relevant.items())
+                native = rpn.natives.get(key)
+                if native is None and key not in rpn.natives and len(rpn.natives) < _NATIVES_LIMIT:
+                    native = rpn.natives[key] = lower_program(rpn, **relevant)
+            except TypeError:
+                # Options which can't be used as a key are handled by interpreter
+                native = None
+
+            if native is not None:
+                # Lowered function can't be interrupted (its run time is limited by budget instead)
+                if deadline is not None and time.monotonic() > deadline:
+                    raise DeadlineException(f"Evaluation exceeded timeout of {self.__timeout}s")
+                try:
+                    return native(*values)
+                except Exception:
+                    # Errors are reported by interpreter (exact message and token which caused an error)
+                    pass
+
+        return self.__evaluate_rpn(rpn, values, deadline, **options)
+
+    def __evaluate_rpn(
+            self,
+            rpn: Program,
+            values: list[float],
+            deadline: Optional[float],
+            **options: Union[bool, str]
+    ) -> float:
+        """
+        Evaluates given rpn ordered program
+
+        :param rpn: Rpn ordered program
+        :param values: Values of program variables
+        :param deadline: Monotonic clock time evaluation has to end before (None means no limit)
+        :param options: Options to pass to modify operators functionality
+        :return: Result of all executed operations
+        """
+        constants, operators = rpn.constants, rpn.operators
+        registers: list[float] = [0.0] * rpn.registers
+        numbers: list[float] = []
+        push, pop = numbers.append, numbers.pop
+        i: int = 0
+        # Index of the instruction before which deadline is checked (never reached without deadline)
+        checkpoint: int = 0 if deadline is not None else -1
+        try:
+            # Every instruction is dispatched by its opcode
+            # and touches only the top of the stack (constant time stack operations)
+            for i, (opcode, operand, arity) in enumerate(zip(rpn.opcodes, rpn.operands, rpn.arities)):
+                if i == checkpoint:
+                    if time.monotonic() > deadline:
+                        raise DeadlineException(f"Evaluation exceeded timeout of {self.__timeout}s")
+                    checkpoint += _DEADLINE_INTERVAL
+
+                if opcode == _PUSH:
+                    # Constants (operands cast during compilation) are appended to numbers stack
+                    push(constants[operand])
+                elif opcode == _LOAD:
+                    # Variables are bound at evaluation
+                    push(values[operand])
+                elif opcode == _BINARY:
                     # Binary operators expects two arguments
-                    # After extraction token operation is executed on given operands
-                    # Then result is appended to numbers stack
-                    args, numbers = numbers[-2:], numbers[:-2]
-                    numbers.append(token.operation(args, **options))
-                elif issubclass(type(token), (Unary, Function)):
-                    # Unary operators and functions takes single argument as parameter
-                    # Said argument needs to be flattened (in case of nesting lists produced by binary comma operator)
-                    numbers.append(token.operation(self.__flatten(numbers.pop()), **options))
-            except Exception as e:
-                # This stage should be inaccessible
-                # (otherwise something went wrong stage earlier or operators were misinterpreted)
-                raise CalculationException(f"{e} - {token}")
+                    # Operation result replaces them on the numbers stack
+                    y = pop()
+                    numbers[-1] = operators[operand].operation([numbers[-1], y], **options)
+                elif opcode == _UNARY:
+                    # Unary operators takes single argument
+                    numbers[-1] = operators[operand].operation([numbers[-1]], **options)
+                elif opcode == _FETCH:
+                    # Shared subexpression is reused
+                    push(registers[operand])
+                elif opcode == _STORE:
+                    # Shared subexpression is kept for further use
+                    registers[operand] = numbers[-1]
+                else:
+                    # Functions takes all of their arguments (counted during compilation) as flat list
+                    args = numbers[-arity:]
+                    del numbers[-arity:]
+                    push(operators[operand].operation(args, **options))
+        except DeadlineException:
+            raise
+        except Exception as e:
+            # This stage should be inaccessible
+            # (otherwise something went wrong stage earlier or operators were misinterpreted)
+            raise CalculationException(f"{e} - {rpn.token_at(i)}")
 
         return numbers[0] if len(numbers) > 0 else 0.0
 
-    def __flatten(self, x) -> list:
+    def __trace_rpn(
+            self,
+            rpn: Program,
+            values: list[float],
+            deadline: Optional[float],
+            **options: Union[bool, str]
+    ) -> float:
         """
-        Flattens given object to one dimensional list
+        Evaluates given rpn ordered program notifying observers about every executed operator
+        (slow path of __evaluate_rpn used only if any observer traces operators)
 
-        :param x: object to flatten
-        :return: one dimensional list
+        :param rpn: Rpn ordered program
+        :param values: Values of program variables
+        :param deadline: Monotonic clock time evaluation has to end before (None means no limit)
+        :param options: Options to pass to modify operators functionality
+        :return: Result of all executed operations
         """
-        if isinstance(x, collections.abc.Iterable):
-            return [j for i in x for j in self.__flatten(i)]
-        else:
-            return [x]
+        tracers = self.__tracers
+        registers: list[float] = [0.0] * rpn.registers
+        numbers: list[float] = []
+        i: int = 0
+        try:
+            for i, (opcode, operand, arity) in enumerate(zip(rpn.opcodes, rpn.operands, rpn.arities)):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise DeadlineException(f"Evaluation exceeded timeout of {self.__timeout}s")
+
+                if opcode == _PUSH:
+                    numbers.append(rpn.constants[operand])
+                elif opcode == _LOAD:
+                    numbers.append(values[operand])
+                elif opcode == _FETCH:
+                    numbers.append(registers[operand])
+                elif opcode == _STORE:
+                    registers[operand] = numbers[-1]
+                else:
+                    # Every operator takes its arguments from the top of the stack
+                    operator = rpn.operators[operand]
+                    pack = numbers[len(numbers) - arity:]
+                    del numbers[len(numbers) - arity:]
+                    result = operator.operation(pack, **options)
+                    for tracer in tracers:
+                        tracer.operator(operator, pack, result)
+                    numbers.append(result)
+        except DeadlineException:
+            raise
+        except Exception as e:
+            raise CalculationException(f"{e} - {rpn.token_at(i)}")
+
+        return numbers[0] if len(numbers) > 0 else 0.0
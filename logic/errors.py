@@ -12,3 +12,27 @@ class CalculationException(Exception):
 
 class SeparatorException(Exception):
     pass
+
+
+class BracketException(Exception):
+    pass
+
+
+class VariableException(Exception):
+    pass
+
+
+class BudgetException(Exception):
+    pass
+
+
+class DeadlineException(Exception):
+    pass
+
+
+class ExpressionSizeException(Exception):
+    pass
+
+
+class ExpressionDepthException(Exception):
+    pass
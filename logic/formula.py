@@ -0,0 +1,91 @@
+from typing import Any, Callable, Mapping, Optional, Union
+from .program import Program
+
+
+class Formula:
+    """
+    Expression compiled once and evaluated with many variable bindings (see Calculator.compile)
+    """
+    __slots__ = ('__expression', '__program', '__run', '__run_vectorized')
+
+    __expression: str
+    __program: Program
+    __run: Callable[..., float]
+    __run_vectorized: Callable[..., Any]
+
+    def __init__(
+            self,
+            expression: str,
+            program: Program,
+            run: Callable[..., float],
+            run_vectorized: Callable[..., Any]
+    ):
+        """
+        Constructs new Formula
+
+        :param expression: Stringified mathematical expression
+        :param program: Rpn ordered program compiled from the expression
+        :param run: Callable executing the program with bindings and options (provided by Calculator)
+        :param run_vectorized: Callable executing the program with arrays of bindings (provided by Calculator)
+        """
+        self.__expression = expression
+        self.__program = program
+        self.__run = run
+        self.__run_vectorized = run_vectorized
+
+    @property
+    def expression(self) -> str:
+        """
+        Expression the formula is compiled from
+
+        :return: Stringified mathematical expression
+        """
+        return self.__expression
+
+    @property
+    def program(self) -> Program:
+        """
+        Compiled program
+
+        :return: Rpn ordered program
+        """
+        return self.__program
+
+    @property
+    def variables(self) -> list[str]:
+        """
+        Names of variables expected in bindings
+
+        :return: List of variable names
+        """
+        return self.__program.variables
+
+    def evaluate(self, bindings: Optional[Mapping[str, float]] = None, **operation_options: Union[bool, str]) -> float:
+        """
+        Evaluates the formula for given variable values
+
+        :param bindings: Values of variables (by variable name)
+        :param operation_options: Additional options passed to individual math operations
+        (ex rad=True for trigonometric functions)
+        :return: Result of the equation
+        """
+        return self.__run(self.__program, bindings or dict(), **operation_options)
+
+    def evaluate_vectorized(self, bindings: Optional[Mapping[str, Any]] = None,
+                            **operation_options: Union[bool, str]) -> Any:
+        """
+        Evaluates the formula for arrays of variable values at once (requires NumPy)
+        Budget and timeout of the calculator apply the same way as to evaluate
+
+        :param bindings: Values of variables (arrays or scalars broadcast against each other)
+        :param operation_options: Additional options passed to individual math operations
+        (ex rad=True for trigonometric functions)
+        :return: Array of results (inf for division by zero or overflow, NaN for other invalid elements)
+        """
+        return self.__run_vectorized(self.__program, bindings or dict(), **operation_options)
+
+    def __call__(self, bindings: Optional[Mapping[str, float]] = None, **operation_options: Union[bool, str]) -> float:
+        return self.evaluate(bindings, **operation_options)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.__expression!r})"
@@ -0,0 +1,219 @@
+import itertools
+import logging
+import os
+import sys
+import threading
+from array import array
+from typing import Iterable, Optional, Union
+from .persistence import HistoryStore
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+# Versions are unique among all histories of the process (version of a recreated history never matches old one)
+_VERSIONS: Iterable[int] = itertools.count(1)
+# Ids kept only in memory start from a process specific origin in forked processes
+# (workers forked from the same master never give the same id to different entries)
+_PROCESS_IDS: int = 1 << 30
+
+
+class History:
+    """
+    Bounded, thread-safe history of evaluated expressions (ring buffer - the oldest entries are overwritten)
+    Entries are kept in parallel arrays of interned strings (repeated expressions and results share memory)
+    - arrays grow with entries up to the capacity (memory of empty history does not depend on its capacity)
+    Every entry gets an id - ids are increasing in order of evaluation (and never reused, even after clear)
+    - ids of forked process continue from an origin derived from its pid (ids of sibling processes never collide)
+    With a store entries are persisted as well (buffer becomes read-through cache of the newest entries)
+    - ids are reserved by the store, so they are unique among all processes sharing the database
+    - entries saved while the store has no reserved ids get ids in memory and are not persisted
+    """
+    __capacity: int
+    __expressions: list[Optional[str]]
+    __results: list[Optional[str]]
+    __ids: array
+    __lock: threading.Lock
+    __head: int
+    __size: int
+    __evictions: int
+    __next_id: int
+    __version: int
+    __pid: int
+    __store: Optional[HistoryStore]
+
+    def __init__(self, capacity: int = 10_000, store: Optional[HistoryStore] = None):
+        """
+        Constructs new History
+
+        :param capacity: Maximum number of entries stored in memory (0 disables history kept in memory)
+        :param store: Persistent history backend (ids are reserved by the store)
+        """
+        if capacity < 0:
+            raise ValueError("History capacity cannot be negative", capacity)
+
+        # Initiate fields
+        self.__capacity = capacity
+        self.__expressions = []
+        self.__results = []
+        self.__ids = array('q')
+        self.__lock = threading.Lock()
+        # Index of the slot for the next entry
+        self.__head = 0
+        self.__size = 0
+        self.__evictions = 0
+        self.__next_id = 0
+        self.__version = next(_VERSIONS)
+        self.__pid = os.getpid()
+        self.__store = store
+
+    @property
+    def capacity(self) -> int:
+        """
+        Maximum number of stored entries
+
+        :return: History capacity
+        """
+        return self.__capacity
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        History counters
+
+        :return: Number of evictions together with current size and capacity
+        """
+        with self.__lock:
+            return {'evictions': self.__evictions, 'size': self.__size, 'capacity': self.__capacity}
+
+    @property
+    def store(self) -> Optional[HistoryStore]:
+        """
+        Persistent history backend
+
+        :return: Store (None if history is kept only in memory)
+        """
+        return self.__store
+
+    @property
+    def version(self) -> int:
+        """
+        Version of stored entries (changed by every modification, so it can be used as a cache validator)
+        Versions are never repeated within a process
+
+        :return: Version number
+        """
+        return self.__version
+
+    def extend(self, entries: Iterable[tuple[str, str]]) -> None:
+        """
+        Adds entries to history (constant time per entry - the oldest entries are overwritten if history is full)
+
+        :param entries: Pairs of expression and stringified result (in order of evaluation)
+        """
+        entries = list(entries)
+        with self.__lock:
+            if (self.__capacity == 0 and self.__store is None) or len(entries) == 0:
+                return
+
+            self.__version = next(_VERSIONS)
+            # Store never waits for the database (ids are reserved ahead in the background)
+            ids = self.__store.reserve(len(entries), self.__next_id) if self.__store is not None else None
+            persisted = ids is not None
+            if ids is None:
+                if self.__store is None:
+                    self.__process()
+                else:
+                    _logger.warning("History ids are not reserved yet - %d entries are not persisted", len(entries))
+                ids = range(self.__next_id, self.__next_id + len(entries))
+            self.__next_id = ids[-1] + 1
+
+            for entry, (expression, result) in zip(ids, entries):
+                if self.__capacity == 0:
+                    break
+
+                if self.__size < self.__capacity:
+                    # Arrays grow until history is full (head is always at the end of them)
+                    self.__expressions.append(sys.intern(expression))
+                    self.__results.append(sys.intern(result))
+                    self.__ids.append(entry)
+                    self.__size += 1
+                    self.__head = self.__size % self.__capacity
+                    continue
+
+                self.__expressions[self.__head] = sys.intern(expression)
+                self.__results[self.__head] = sys.intern(result)
+                self.__ids[self.__head] = entry
+                self.__head = (self.__head + 1) % self.__capacity
+                self.__evictions += 1
+
+            # Entries are persisted in the background (in order of their ids)
+            if persisted:
+                self.__store.put((x, e, r) for x, (e, r) in zip(ids, entries))
+
+    def snapshot(self) -> list[dict[str, str]]:
+        """
+        Copy of stored entries
+
+        :return: List of entries (lower index represents newer result)
+        """
+        with self.__lock:
+            # Slots in order from the newest to the oldest entry
+            order = [(self.__head - k - 1) % self.__capacity for k in range(self.__size)]
+            return [{'expression': self.__expressions[i], 'result': self.__results[i]} for i in order]
+
+    def page(self, limit: int, before: Optional[int] = None) -> list[dict[str, Union[int, str]]]:
+        """
+        Copy of a page of stored entries (only the page is copied)
+        Entries no longer kept in memory are read from the store (if any)
+
+        :param limit: Maximal number of entries
+        :param before: Id of the entry the page ends before (None for the page of the newest entries)
+        :return: List of entries with their ids (lower index represents newer result)
+        """
+        if limit < 0:
+            raise ValueError("Page limit cannot be negative", limit)
+
+        with self.__lock:
+            # Ids are increasing from the oldest to the newest entry (binary search for the newest entry before id)
+            oldest = self.__head - self.__size
+            low, high = 0, self.__size
+            while before is not None and low < high:
+                middle = (low + high) // 2
+                if self.__ids[(oldest + middle) % self.__capacity] < before:
+                    low = middle + 1
+                else:
+                    high = middle
+            page = []
+            for k in range(high - 1, max(high - limit, 0) - 1, -1):
+                i = (oldest + k) % self.__capacity
+                page.append({'id': self.__ids[i], 'expression': self.__expressions[i], 'result': self.__results[i]})
+
+        if self.__store is not None and len(page) < limit:
+            # Rest of the page is older than entries kept in memory
+            # (evicted entries might be still queued, so queue is written first)
+            self.__store.flush()
+            page += self.__store.page(limit - len(page), page[-1]['id'] if len(page) > 0 else before)
+
+        return page
+
+    def clear(self) -> None:
+        """
+        Removes every entry (counters are preserved)
+        """
+        with self.__lock:
+            self.__version = next(_VERSIONS)
+            self.__expressions = []
+            self.__results = []
+            self.__ids = array('q')
+            self.__head = 0
+            self.__size = 0
+
+    def __process(self) -> None:
+        """
+        Moves ids kept in memory to the origin of the current process after fork (called with the lock held)
+        """
+        if self.__pid != os.getpid():
+            self.__pid = os.getpid()
+            self.__next_id = max(self.__next_id, self.__pid * _PROCESS_IDS)
+
+    def __len__(self) -> int:
+        return self.__size
@@ -0,0 +1,178 @@
+import bisect
+import math
+import threading
+from typing import Mapping, Optional
+from .observer import Observer
+
+# Upper bounds of latency buckets in seconds (from 1 microsecond to 1 second)
+BUCKETS: tuple[float, ...] = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25,
+    0.5, 1.0
+)
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed buckets (observation costs a binary search and a single increment)
+    """
+    __slots__ = ('__bounds', '__counts', '__sum', '__lock')
+
+    __bounds: tuple[float, ...]
+    __counts: list[int]
+    __sum: float
+    __lock: threading.Lock
+
+    def __init__(self, bounds: tuple[float, ...] = BUCKETS):
+        """
+        Constructs new Histogram
+
+        :param bounds: Increasing upper bounds of buckets (the last bucket without bound is added implicitly)
+        """
+        self.__bounds = bounds
+        self.__counts = [0] * (len(bounds) + 1)
+        self.__sum = 0.0
+        self.__lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """
+        Records observed value
+
+        :param value: Observed value
+        """
+        i = bisect.bisect_left(self.__bounds, value)
+        with self.__lock:
+            self.__counts[i] += 1
+            self.__sum += value
+
+    def snapshot(self) -> tuple[list[tuple[float, int]], float, int]:
+        """
+        Cumulative counts of buckets
+
+        :return: Pairs of upper bound and number of values not greater than the bound, sum and count of values
+        """
+        with self.__lock:
+            counts, total = self.__counts[:], self.__sum
+
+        cumulative, buckets = 0, []
+        for bound, count in zip((*self.__bounds, math.inf), counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+
+        return buckets, total, cumulative
+
+
+class Metrics(Observer):
+    """
+    Instrumentation of evaluation pipeline (stage latencies, evaluations, errors and requests)
+    Metrics are rendered in Prometheus text format
+    """
+    # Measured stages of evaluation pipeline
+    STAGES: tuple[str, ...] = ('tokenize', 'validate', 'rpn', 'optimize', 'evaluate')
+
+    __stages: dict[str, Histogram]
+    __counters: dict[tuple[str, tuple[tuple[str, str], ...]], int]
+    __lock: threading.Lock
+
+    def __init__(self):
+        """
+        Constructs new Metrics
+        """
+        self.__stages = {x: Histogram() for x in Metrics.STAGES}
+        self.__counters = dict()
+        self.__lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        Records latency of pipeline stage
+
+        :param stage: Stage name (one of Metrics.STAGES)
+        :param seconds: Stage duration
+        """
+        self.__stages[stage].observe(seconds)
+
+    def end(self, stage: str, expression: str, seconds: float, error: Optional[Exception]) -> None:
+        self.observe(stage, seconds)
+
+    def increment(self, name: str, **labels: str) -> None:
+        """
+        Increments counter
+
+        :param name: Counter name (without calculator_ prefix and _total suffix)
+        :param labels: Counter labels
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0) + 1
+
+    def counter(self, name: str, **labels: str) -> int:
+        """
+        Current value of counter
+
+        :param name: Counter name (without calculator_ prefix and _total suffix)
+        :param labels: Counter labels
+        :return: Counter value
+        """
+        with self.__lock:
+            return self.__counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def stage(self, stage: str) -> tuple[list[tuple[float, int]], float, int]:
+        """
+        Latency histogram of pipeline stage
+
+        :param stage: Stage name (one of Metrics.STAGES)
+        :return: Cumulative buckets, sum and count of stage durations
+        """
+        return self.__stages[stage].snapshot()
+
+    def render(self, cache: Optional[Mapping[str, int]] = None, history: Optional[Mapping[str, int]] = None) -> str:
+        """
+        Renders metrics in Prometheus text format
+
+        :param cache: Cache counters (see ProgramCache.stats)
+        :param history: History counters (see History.stats)
+        :return: Text exposition of metrics
+        """
+        lines: list[str] = [
+            "# HELP calculator_stage_seconds Duration of evaluation pipeline stages",
+            "# TYPE calculator_stage_seconds histogram"
+        ]
+        for stage in Metrics.STAGES:
+            buckets, total, count = self.stage(stage)
+            for bound, cumulative in buckets:
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f'calculator_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'calculator_stage_seconds_sum{{stage="{stage}"}} {total!r}')
+            lines.append(f'calculator_stage_seconds_count{{stage="{stage}"}} {count}')
+
+        with self.__lock:
+            counters = sorted(self.__counters.items())
+        # Samples are grouped by counter name (every group gets its own type line)
+        groups: dict[str, list[str]] = dict()
+        for (name, labels), value in counters:
+            text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            groups.setdefault(name, []).append(
+                f"calculator_{name}_total{{{text}}} {value}" if text else f"calculator_{name}_total {value}"
+            )
+        for name, samples in groups.items():
+            lines.append(f"# TYPE calculator_{name}_total counter")
+            lines.extend(samples)
+
+        # Cache and history counters are read from their own stats
+        for prefix, stats in (('cache', cache), ('history', history)):
+            for key, value in (stats or dict()).items():
+                kind = 'gauge' if key in ('size', 'capacity') else 'counter'
+                name = f"calculator_{prefix}_{key}" + ("_total" if kind == 'counter' else "")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """
+    Escapes label value for Prometheus text format
+
+    :param value: Label value
+    :return: Escaped value
+    """
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
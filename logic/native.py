@@ -0,0 +1,66 @@
+import math
+from typing import Callable, Optional, Union
+from .program import Opcode, Program
+
+
+def lower_program(program: Program, **options: Union[bool, str]) -> Optional[Callable[..., float]]:
+    """
+    Lowers rpn ordered program into python function (specialized for given options)
+    Every stack slot becomes a local variable (s0, s1, ...) and every instruction becomes a single assignment
+    - operators are lowered by their lower method (or called directly if they can't be lowered)
+    - variables are parameters of the function (v0, v1, ... in order of program variables)
+
+    :param program: Rpn ordered program
+    :param options: Options to pass to modify operators functionality
+    :return: Function evaluating the program (None if program can't be lowered)
+    """
+    # Constants and operators are bound as names (c0, c1, ... and o0, o1, ...)
+    namespace: dict[str, object] = {'math': math, 'options': options}
+    namespace.update((f"c{i}", x) for i, x in enumerate(program.constants))
+    namespace.update((f"o{i}", x) for i, x in enumerate(program.operators))
+
+    lines: list[str] = []
+    depth: int = 0
+    for opcode, operand, arity in zip(program.opcodes, program.operands, program.arities):
+        if opcode == Opcode.PUSH:
+            lines.append(f"s{depth} = c{operand}")
+            depth += 1
+            continue
+        elif opcode == Opcode.LOAD:
+            lines.append(f"s{depth} = v{operand}")
+            depth += 1
+            continue
+        elif opcode == Opcode.FETCH:
+            # Registers are local variables as well (r0, r1, ...)
+            lines.append(f"s{depth} = r{operand}")
+            depth += 1
+            continue
+        elif opcode == Opcode.STORE:
+            if depth == 0:
+                return None
+            lines.append(f"r{operand} = s{depth - 1}")
+            continue
+
+        # Malformed program (stack underflow) is left to the interpreter
+        if depth < arity:
+            return None
+
+        depth -= arity
+        args = [f"s{depth + k}" for k in range(arity)]
+        expression = program.operators[operand].lower(args, **options)
+        if expression is None:
+            # Generic fallback - operation is called the same way as interpreter does
+            expression = f"o{operand}.operation([{', '.join(args)}], **options)"
+        lines.append(f"s{depth} = {expression}")
+        depth += 1
+
+    lines.append(f"return {'s0' if depth > 0 else '0.0'}")
+    parameters = ', '.join(f"v{i}" for i in range(len(program.variables)))
+    source = f"def program({parameters}):\n" + "".join(f"    {line}\n" for line in lines)
+    try:
+        exec(compile(source, '<program>', 'exec'), namespace)
+    except (SyntaxError, RecursionError, MemoryError):
+        # Lowered expressions can be nested too deep for python compiler
+        return None
+
+    return namespace['program']
@@ -0,0 +1,79 @@
+import time
+from typing import Callable, Optional, TypeVar, Union
+from .tokens import Operator_T
+
+Result_T = TypeVar('Result_T')
+
+
+class Observer:
+    """
+    Base class for observers of evaluation pipeline (ex profilers, tracing spans or metrics)
+    Every method does nothing by default - observers override only the events they need
+    Stages: tokenize, validate, rpn, optimize and evaluate
+    """
+    def start(self, stage: str, expression: str) -> None:
+        """
+        Called when pipeline stage starts
+
+        :param stage: Stage name
+        :param expression: Whitespace free expression
+        """
+        pass
+
+    def end(self, stage: str, expression: str, seconds: float, error: Optional[Exception]) -> None:
+        """
+        Called when pipeline stage ends (even if it failed)
+
+        :param stage: Stage name
+        :param expression: Whitespace free expression
+        :param seconds: Stage duration
+        :param error: Exception raised by the stage (None if stage succeeded)
+        """
+        pass
+
+    def operator(self, operator: Operator_T, pack: list[float], result: Union[float, list]) -> None:
+        """
+        Called after every executed operator (evaluation is slower if any observer overrides this method)
+
+        :param operator: Executed operator (flyweight token)
+        :param pack: Operands
+        :param result: Result of operation
+        """
+        pass
+
+    @property
+    def traces_operators(self) -> bool:
+        """
+        Decides if operator events are needed
+
+        :return: True if operator method is overridden
+        """
+        return type(self).operator is not Observer.operator
+
+
+def observe(observers: tuple[Observer, ...], stage: str, expression: str,
+            function: Callable[..., Result_T], *args) -> Result_T:
+    """
+    Calls function as pipeline stage (observers are notified about its start and end)
+
+    :param observers: Notified observers
+    :param stage: Stage name
+    :param expression: Whitespace free expression
+    :param function: Stage implementation
+    :param args: Arguments of the function
+    :return: Result of the function
+    """
+    for observer in observers:
+        observer.start(stage, expression)
+
+    error: Optional[Exception] = None
+    start = time.perf_counter()
+    try:
+        return function(*args)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        for observer in observers:
+            observer.end(stage, expression, seconds, error)
@@ -0,0 +1,186 @@
+import functools
+import math
+import time
+from typing import Optional, Union
+from .program import Opcode, Program
+from .tokens import *
+from .errors import DeadlineException
+
+
+def _is_constant(value: Union[float, Operator_T], constant: float) -> bool:
+    """
+    Checks if value is exactly given float constant (sign of zero included)
+
+    :param value: Checked value
+    :param constant: Expected constant
+    :return: True if value is the constant
+    """
+    return type(value) is float and value == constant and math.copysign(1, value) == math.copysign(1, constant)
+
+
+# Algebraic identities (rule name, operator type, constant argument index, the constant and index of the kept argument)
+# x+0 is not an identity for floats (-0.0 + 0 is 0.0) so it is never rewritten
+_IDENTITIES: tuple[tuple[str, type, int, float, int], ...] = (
+    ('x*1', BinaryMultiply, 1, 1.0, 0),
+    ('1*x', BinaryMultiply, 0, 1.0, 1),
+    ('x/1', BinaryDivide, 1, 1.0, 0),
+    ('x-0', BinaryMinus, 1, 0.0, 0),
+)
+
+# Number of instructions between deadline checks
+_DEADLINE_INTERVAL: int = 1024
+# Opcodes as plain integers (for fast comparisons)
+_PUSH, _LOAD, _UNARY, _BINARY, _CALL = (
+    int(Opcode.PUSH), int(Opcode.LOAD), int(Opcode.UNARY), int(Opcode.BINARY), int(Opcode.CALL)
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _rules(kind: type) -> tuple[tuple[str, int, float, int], ...]:
+    """
+    Algebraic identities applicable to operator type
+
+    :param kind: Operator type
+    :return: Identities (rule name, constant argument index, the constant and index of the kept argument)
+    """
+    return tuple((rule, at, constant, kept) for rule, base, at, constant, kept in _IDENTITIES if issubclass(kind, base))
+
+
+def optimize_program(program: Program, deadline: Optional[float] = None) -> Program:
+    """
+    Optimizes rpn ordered program
+    1. Folds constant subexpressions (with operators own operation - operators reading options are skipped)
+    2. Applies safe algebraic identities (x*1, 1*x, x/1, x-0, --x)
+    3. Eliminates common subexpressions (expression is hash consed into DAG, shared nodes are kept in registers)
+    Optimized program keeps cost of the original one (folded operations are evaluated ahead of time, not skipped)
+
+    :param program: Rpn ordered program
+    :param deadline: Monotonic clock time optimization has to end before (None means no limit)
+    :return: Optimized program (applied rewrites are listed in its rewrites)
+    """
+    # Nodes of expression DAG are kept in parallel lists
+    # - opcode, payload (constant value, variable name or applied operator), indexes of argument nodes
+    #   and index of the token the node is compiled from
+    opcodes: list[int] = []
+    payloads: list[Union[float, str, Operator_T]] = []
+    arguments: list[tuple[int, ...]] = []
+    positions: list[int] = []
+    # Hash consing tables (structurally equal nodes are created only once)
+    # - floats are keyed by their value (zeros by representation - 0.0 and -0.0 are different constants)
+    values: dict[object, int] = dict()
+    table: dict[tuple, int] = dict()
+    # Rewrites are recorded as pairs of rule name and token index (tokens are created only when rewrites are read)
+    rewrites: list[tuple[str, int]] = []
+    # Operators properties are read once per operator
+    # (operators are flyweights keyed by identity - value-less flyweights of all types have equal hashes)
+    foldable: dict[int, bool] = dict()
+    stack: list[int] = []
+
+    def new(opcode: int, payload: Union[float, str, Operator_T], children: tuple[int, ...], position: int) -> int:
+        opcodes.append(opcode)
+        payloads.append(payload)
+        arguments.append(children)
+        positions.append(position)
+        return len(opcodes) - 1
+
+    def constant(value: float, position: int) -> int:
+        key = value if type(value) is float and value != 0 else (type(value), repr(value))
+        index = values.get(key)
+        if index is None:
+            index = values[key] = new(_PUSH, value, (), position)
+        return index
+
+    def apply(opcode: int, operator: Operator_T, children: tuple[int, ...], position: int) -> int:
+        fold = foldable.get(id(operator))
+        if fold is None:
+            fold = foldable[id(operator)] = len(operator.options) == 0
+        # Constant folding (operations raising an error are left to evaluation - error is reported there)
+        if fold and all(opcodes[x] == _PUSH for x in children):
+            try:
+                value = operator.operation([payloads[x] for x in children])
+            except Exception:
+                pass
+            else:
+                rewrites.append(('fold', position))
+                return constant(value, position)
+
+        # Algebraic identities
+        if len(children) == 2:
+            for rule, at, value, kept in _rules(type(operator)):
+                if opcodes[children[at]] == _PUSH and _is_constant(payloads[children[at]], value):
+                    rewrites.append((rule, position))
+                    return children[kept]
+        elif isinstance(operator, UnaryMinus) and opcodes[children[0]] == _UNARY and \
+                isinstance(payloads[children[0]], UnaryMinus):
+            rewrites.append(('--x', position))
+            return arguments[children[0]][0]
+
+        key = (id(operator), children)
+        index = table.get(key)
+        if index is None:
+            index = table[key] = new(opcode, operator, children, position)
+        else:
+            rewrites.append(('cse', position))
+        return index
+
+    # Rebuild expression tree (as hash consed DAG) from rpn
+    constants, operators, variables = program.constants, program.operators, program.variables
+    # Index of the instruction before which deadline is checked (never reached without deadline)
+    checkpoint: int = 0 if deadline is not None else -1
+    instructions = zip(program.opcodes, program.operands, program.arities, program.positions)
+    for i, (opcode, operand, arity, position) in enumerate(instructions):
+        if i == checkpoint:
+            checkpoint += _DEADLINE_INTERVAL
+            if time.monotonic() > deadline:
+                raise DeadlineException("Optimization exceeded deadline")
+        if opcode == _PUSH:
+            stack.append(constant(constants[operand], position))
+        elif opcode == _LOAD:
+            name = variables[operand]
+            index = table.get(name)
+            if index is None:
+                index = table[name] = new(_LOAD, name, (), position)
+            stack.append(index)
+        elif (opcode == _BINARY or opcode == _UNARY or opcode == _CALL) and len(stack) >= arity:
+            children = tuple(stack[len(stack) - arity:])
+            del stack[len(stack) - arity:]
+            stack.append(apply(opcode, operators[operand], children, position))
+        else:
+            # Program can't be optimized (already optimized or malformed one)
+            return program
+
+    # Count references of nodes reachable from remaining stack values
+    # (nodes referenced more than once are kept in registers)
+    references: list[int] = [0] * len(opcodes)
+    reachable: list[int] = stack[:]
+    while len(reachable) > 0:
+        index = reachable.pop()
+        references[index] += 1
+        if references[index] == 1:
+            reachable.extend(arguments[index])
+
+    # Emit nodes reachable from remaining stack values in post order (iteratively - expressions can be deep)
+    result: Program = Program(program.tokens)
+    registers: dict[int, int] = dict()
+    pending: list[tuple[int, bool]] = [(x, False) for x in reversed(stack)]
+    while len(pending) > 0:
+        index, expanded = pending.pop()
+        opcode = opcodes[index]
+        if index in registers:
+            result.fetch(registers[index], positions[index])
+        elif opcode == _PUSH:
+            result.push(payloads[index], positions[index])
+        elif opcode == _LOAD:
+            result.load(payloads[index], positions[index])
+        elif not expanded:
+            pending.append((index, True))
+            pending.extend((x, False) for x in reversed(arguments[index]))
+        else:
+            result.apply(Opcode(opcode), payloads[index], positions[index], len(arguments[index]))
+            if references[index] > 1:
+                registers[index] = len(registers)
+                result.store(registers[index], positions[index])
+
+    result.record(rewrites)
+    result.charge(max(0, program.cost - result.cost))
+    return result
@@ -0,0 +1,150 @@
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Mapping, Optional, Union
+from .ruleset import Ruleset
+from .stream import TokenStream
+
+# Calculator of worker process (built once by worker initializer)
+_calculator = None
+
+# Chunks per worker (more chunks balance uneven work better, less chunks reduce pickling overhead)
+_CHUNKS_PER_WORKER: int = 4
+# Chunk size limits
+_MIN_CHUNK: int = 16
+_MAX_CHUNK: int = 4096
+
+Item_T = tuple[str, Mapping[str, Union[bool, str]]]
+
+
+def _initialize(
+        rules: Mapping[str, Ruleset],
+        validators: Mapping[str, Callable[[TokenStream], None]],
+        options: Mapping[str, Any]
+) -> None:
+    """
+    Worker process initializer - builds calculator exactly once per worker
+    (with configuration of the calculator the batch is evaluated for)
+
+    :param rules: Named rulesets of the calculator
+    :param validators: Named validators of the calculator
+    :param options: Calculator options (ex mode, budget or limits)
+    """
+    global _calculator
+    # Imported here - calculator module depends on this one
+    from .calculator import Calculator
+    _calculator = Calculator(history_size=0, **options)
+    _calculator.set_rules(**rules)
+    _calculator.set_validators(**validators)
+
+
+def _evaluate_chunk(items: list[Item_T]) -> list[Union[float, Exception]]:
+    """
+    Evaluates chunk of expressions in worker process
+
+    :param items: Pairs of expression and its operation options
+    :return: Results in order of expressions (exception in place of failed result)
+    """
+    return _calculator.evaluate_batch(items)
+
+
+def chunk_size(count: int, workers: int) -> int:
+    """
+    Size of chunks sent to workers (adapted to the size of the batch)
+
+    :param count: Number of expressions in the batch
+    :param workers: Number of worker processes
+    :return: Number of expressions in a single chunk
+    """
+    return max(_MIN_CHUNK, min(_MAX_CHUNK, math.ceil(count / (workers * _CHUNKS_PER_WORKER))))
+
+
+class ProcessEvaluator:
+    """
+    Pool of worker processes evaluating batches of expressions
+    """
+    __workers: int
+    __rules: dict[str, Ruleset]
+    __validators: dict[str, Callable[[TokenStream], None]]
+    __options: dict[str, Any]
+    __executor: Optional[ProcessPoolExecutor]
+    __lock: threading.Lock
+
+    def __init__(
+            self,
+            workers: Optional[int] = None,
+            rules: Optional[Mapping[str, Ruleset]] = None,
+            validators: Optional[Mapping[str, Callable[[TokenStream], None]]] = None,
+            **options: Any
+    ):
+        """
+        Constructs new ProcessEvaluator (processes are started with the first batch)
+
+        :param workers: Number of worker processes (defaults to number of cores)
+        :param rules: Named rulesets of calculator used by workers
+        :param validators: Named validators of calculator used by workers
+        :param options: Options of calculator used by workers (see Calculator)
+        """
+        if workers is not None and workers < 1:
+            raise ValueError("Number of workers must be positive", workers)
+
+        self.__workers = workers or os.cpu_count() or 1
+        self.__rules = dict(rules or dict())
+        self.__validators = dict(validators or dict())
+        self.__options = options
+        self.__executor = None
+        self.__lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        """
+        Number of worker processes
+
+        :return: Number of workers
+        """
+        return self.__workers
+
+    @property
+    def configuration(self) -> tuple[dict[str, Ruleset], dict[str, Callable[[TokenStream], None]], dict[str, Any]]:
+        """
+        Configuration of calculator used by workers
+
+        :return: Rulesets, validators and options
+        """
+        return dict(self.__rules), dict(self.__validators), dict(self.__options)
+
+    def evaluate(self, items: list[Item_T]) -> list[Union[float, Exception]]:
+        """
+        Evaluates batch of expressions in worker processes
+
+        :param items: Pairs of expression and its operation options
+        :return: Results in order of expressions (exception in place of failed result)
+        """
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ProcessPoolExecutor(
+                    self.__workers, initializer=_initialize, initargs=(self.__rules, self.__validators, self.__options)
+                )
+            executor = self.__executor
+
+        size = chunk_size(len(items), self.__workers)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        # Map keeps order of chunks
+        return [x for chunk in executor.map(_evaluate_chunk, chunks) for x in chunk]
+
+    def close(self) -> None:
+        """
+        Stops worker processes
+        """
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self) -> 'ProcessEvaluator':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,312 @@
+import logging
+import os
+import queue
+import threading
+import weakref
+from typing import Iterable, Optional, Union
+
+# SQLAlchemy is an optional dependency (required only for persistent history)
+try:
+    import sqlalchemy
+    from sqlalchemy import Column, Integer, MetaData, Table, Text
+except ImportError:
+    sqlalchemy = None
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+# Table of persisted history entries and table with the next free id (a single row)
+# Ids are reserved in blocks by every process (processes sharing the database never assign the same id)
+if sqlalchemy is not None:
+    _metadata = MetaData()
+    _history = Table(
+        'history', _metadata,
+        Column('id', Integer, primary_key=True, autoincrement=False),
+        Column('expression', Text, nullable=False),
+        Column('result', Text, nullable=False)
+    )
+    _sequence = Table(
+        'history_sequence', _metadata,
+        Column('id', Integer, primary_key=True, autoincrement=False),
+        Column('next_id', Integer, nullable=False)
+    )
+
+
+class HistoryStore:
+    """
+    Persistent history backend (any database supported by SQLAlchemy, ex sqlite:///history.db or postgresql://...)
+    Writes are queued and inserted in batches by a background thread (callers never wait for the database)
+    Store can be created before fork (every process gets its own connections, writer and block of ids)
+    Ids are reserved ahead by the background thread as well (reserving ids never waits for the database)
+    """
+    __engine: 'sqlalchemy.engine.Engine'
+    __batch_size: int
+    __id_block: int
+    __queue: queue.Queue
+    __writer: Optional[threading.Thread]
+    __pid: int
+    __blocks: list[range]
+    __wanted: int
+    __refilling: bool
+    __closed: bool
+    __lock: threading.Lock
+    __written: int
+    __failures: int
+
+    def __init__(self, url: str, batch_size: int = 256, id_block: int = 1024):
+        """
+        Constructs new HistoryStore (history tables are created if they do not exist)
+
+        :param url: Database url
+        :param batch_size: Maximum number of entries inserted at once
+        :param id_block: Number of ids reserved at once (one database transaction per block)
+            - the next block is reserved when less than half of a block is left
+        """
+        if sqlalchemy is None:
+            raise ImportError("SQLAlchemy is required for persistent history")
+        if batch_size < 1 or id_block < 1:
+            raise ValueError("Batch size and id block must be positive", batch_size, id_block)
+
+        self.__engine = sqlalchemy.create_engine(url, future=True)
+        _metadata.create_all(self.__engine)
+        self.__initialize_sequence()
+        self.__batch_size = batch_size
+        self.__id_block = id_block
+        self.__queue = queue.Queue()
+        self.__writer = None
+        self.__pid = os.getpid()
+        self.__wanted = 0
+        self.__refilling = False
+        self.__closed = False
+        self.__lock = threading.Lock()
+        self.__written = 0
+        self.__failures = 0
+        # The first block is reserved right away (later blocks and blocks of forked processes in the background)
+        self.__blocks = [self.__reserve_block(id_block)]
+        if hasattr(os, 'register_at_fork'):
+            reference = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: (store := reference()) is not None and store.__forked())
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Store counters
+
+        :return: Number of written entries, failures (batches and reservations of ids) and entries waiting in queue
+        """
+        return {'written': self.__written, 'failures': self.__failures, 'pending': self.__queue.qsize()}
+
+    def reserve(self, count: int, start: int = 0) -> Optional[list[int]]:
+        """
+        Reserves ids for new entries (increasing, unique among all processes using the database)
+        Ids are taken from blocks reserved ahead by the process - database is never accessed by the caller
+
+        :param count: Number of ids
+        :param start: The lowest acceptable id (lower reserved ids are skipped)
+        :return: Reserved ids (None if not enough ids are reserved yet - the next block is reserved in the background)
+        """
+        self.__process()
+        ids: Optional[list[int]] = None
+        with self.__lock:
+            while len(self.__blocks) > 0 and self.__blocks[0].stop <= start:
+                self.__blocks.pop(0)
+            if len(self.__blocks) > 0:
+                self.__blocks[0] = self.__blocks[0][max(start - self.__blocks[0].start, 0):]
+
+            available = sum(len(x) for x in self.__blocks)
+            if available >= count:
+                ids = []
+                while len(ids) < count:
+                    taken = self.__blocks[0][:count - len(ids)]
+                    ids.extend(taken)
+                    self.__blocks[0] = self.__blocks[0][len(taken):]
+                    if len(self.__blocks[0]) == 0:
+                        self.__blocks.pop(0)
+                available -= count
+            else:
+                self.__wanted = max(self.__wanted, count)
+
+        if available < (self.__id_block + 1) // 2 or ids is None:
+            self.__refill()
+        return ids
+
+    def put(self, entries: Iterable[tuple[int, str, str]]) -> None:
+        """
+        Queues entries for writing (returns immediately)
+
+        :param entries: Triples of id, expression and stringified result
+        """
+        self.__process()
+        self.__start()
+        self.__queue.put([{'id': x, 'expression': e, 'result': r} for x, e, r in entries])
+
+    def flush(self) -> None:
+        """
+        Waits until every queued entry is written
+        """
+        self.__queue.join()
+
+    def page(self, limit: int, before: Optional[int] = None) -> list[dict[str, Union[int, str]]]:
+        """
+        Reads a page of persisted entries
+
+        :param limit: Maximal number of entries
+        :param before: Id of the entry the page ends before (None for the page of the newest entries)
+        :return: List of entries with their ids (lower index represents newer result)
+        """
+        self.__process()
+        query = sqlalchemy.select(_history).order_by(_history.c.id.desc()).limit(limit)
+        if before is not None:
+            query = query.where(_history.c.id < before)
+
+        with self.__engine.connect() as connection:
+            return [dict(x) for x in connection.execute(query).mappings()]
+
+    def close(self) -> None:
+        """
+        Writes queued entries and stops the background thread
+        """
+        self.__process()
+        with self.__lock:
+            writer, self.__writer = self.__writer, None
+
+        if writer is not None:
+            # None stops the writer (after every entry queued before it)
+            self.__queue.put(None)
+            writer.join()
+        self.__closed = True
+        self.__engine.dispose()
+
+    def __initialize_sequence(self) -> None:
+        """
+        Creates the row with the next free id (ids continue after the newest persisted entry)
+        """
+        try:
+            with self.__engine.begin() as connection:
+                if connection.execute(sqlalchemy.select(_sequence.c.next_id)).first() is None:
+                    newest = connection.execute(sqlalchemy.select(sqlalchemy.func.max(_history.c.id))).scalar()
+                    first = 0 if newest is None else newest + 1
+                    connection.execute(sqlalchemy.insert(_sequence).values(id=0, next_id=first))
+        except sqlalchemy.exc.IntegrityError:
+            # Row was created by another process in the meantime
+            pass
+
+    def __reserve_block(self, size: int) -> range:
+        """
+        Reserves block of ids (in a single transaction - concurrent reservations get disjoint blocks)
+
+        :param size: Number of ids
+        :return: Reserved ids
+        """
+        with self.__engine.begin() as connection:
+            connection.execute(sqlalchemy.update(_sequence).values(next_id=_sequence.c.next_id + size))
+            end = connection.execute(sqlalchemy.select(_sequence.c.next_id)).scalar()
+
+        return range(end - size, end)
+
+    def __process(self) -> None:
+        """
+        Resets state inherited from parent process after fork
+        (pooled connections, queue, writer thread and reserved ids belong to the parent)
+        """
+        if self.__pid == os.getpid():
+            return
+
+        with self.__lock:
+            if self.__pid != os.getpid():
+                # Connections of the parent are left open for it (they are only dropped from the pool)
+                self.__engine.dispose(close=False)
+                self.__queue = queue.Queue()
+                self.__writer = None
+                self.__blocks = []
+                self.__wanted = 0
+                self.__refilling = False
+                self.__pid = os.getpid()
+
+    def __forked(self) -> None:
+        """
+        Starts reserving ids of the child process right after fork (called by fork hook)
+        """
+        if not self.__closed:
+            self.__process()
+            self.__refill()
+
+    def __refill(self) -> None:
+        """
+        Asks background writer to reserve the next block of ids (only one request is pending at a time)
+        """
+        with self.__lock:
+            if self.__refilling:
+                return
+            self.__refilling = True
+
+        # Empty chunk wakes the writer up without writing anything
+        self.__start()
+        self.__queue.put([])
+
+    def __reserve_ahead(self) -> None:
+        """
+        Reserves the requested block of ids (called by background writer, failures are only logged)
+        """
+        with self.__lock:
+            if not self.__refilling:
+                return
+            size = max(self.__id_block, self.__wanted)
+
+        block = None
+        try:
+            block = self.__reserve_block(size)
+        except Exception:
+            # Entries are kept only in memory until a block is reserved (next reservation tries again)
+            _logger.exception("Failed to reserve %d history ids", size)
+            self.__failures += 1
+        finally:
+            with self.__lock:
+                if block is not None:
+                    self.__blocks.append(block)
+                    self.__wanted = 0
+                self.__refilling = False
+
+    def __start(self) -> None:
+        """
+        Starts background writer (threads do not survive fork, so every process starts its own writer)
+        """
+        with self.__lock:
+            if self.__writer is not None:
+                return
+
+            self.__writer = threading.Thread(target=self.__write, name='history-writer', daemon=True)
+            self.__writer.start()
+
+    def __write(self) -> None:
+        """
+        Background writer loop - queued entries are inserted in batches (one transaction per batch)
+        """
+        while True:
+            chunks = [self.__queue.get()]
+            # Everything queued in the meantime joins the batch
+            rows = len(chunks[0] or [])
+            while chunks[-1] is not None and rows < self.__batch_size:
+                try:
+                    chunks.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+                rows += len(chunks[-1] or [])
+
+            # Ids are reserved before the batch is written (callers wait for ids, not for written entries)
+            self.__reserve_ahead()
+            batch = [row for chunk in chunks if chunk is not None for row in chunk]
+            try:
+                if len(batch) > 0:
+                    with self.__engine.begin() as connection:
+                        connection.execute(sqlalchemy.insert(_history), batch)
+                    self.__written += len(batch)
+            except Exception:
+                # Failed batch is dropped (history is still available in memory)
+                _logger.exception("Failed to write %d history entries", len(batch))
+                self.__failures += 1
+            finally:
+                for _ in chunks:
+                    self.__queue.task_done()
+
+            if chunks[-1] is None:
+                return
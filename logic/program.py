@@ -0,0 +1,309 @@
+from array import array
+from enum import IntEnum
+from typing import Callable, NamedTuple, Optional
+from .stream import TokenStream
+from .tokens import Operator_T, Token_t
+
+
+class Opcode(IntEnum):
+    """
+    Enum for program instructions
+    """
+    # Push constant on the stack (operand is index of the constant)
+    PUSH = 0
+    # Replace top of the stack with result of unary operator (operand is index of the operator)
+    UNARY = 1
+    # Replace two topmost values of the stack with result of binary operator (operand is index of the operator)
+    BINARY = 2
+    # Replace arity topmost values of the stack with result of function (operand is index of the operator)
+    CALL = 3
+    # Copy top of the stack into register (operand is index of the register)
+    STORE = 4
+    # Push value of register on the stack (operand is index of the register)
+    FETCH = 5
+    # Push value bound to variable on the stack (operand is index of the variable)
+    LOAD = 6
+
+
+# Number of consumed stack values for operators of fixed arity
+_ARITIES: dict[Opcode, int] = {Opcode.UNARY: 1, Opcode.BINARY: 2, Opcode.CALL: 1}
+
+
+class Rewrite(NamedTuple):
+    """
+    Optimization applied to a program (reported for debugging purposes)
+    """
+    # Name of applied rule (ex fold, cse or identity such as x*1)
+    rule: str
+    # Token the rewritten instruction was compiled from
+    token: Token_t
+
+
+class Program:
+    """
+    Compiled (rpn ordered) expression - struct of arrays of instructions with constants and operators pools
+    """
+    __slots__ = (
+        '__tokens', '__opcodes', '__operands', '__arities', '__positions', '__constants', '__operators', '__indexes',
+        '__variables', '__natives', '__registers', '__rewrites', '__cost', '__options'
+    )
+
+    __tokens: TokenStream
+    __opcodes: array
+    __operands: array
+    __arities: array
+    __positions: array
+    __constants: list[float]
+    __operators: list[Operator_T]
+    __indexes: dict[int, int]
+    __variables: dict[str, int]
+    __natives: dict[frozenset, Optional[Callable[..., float]]]
+    __registers: int
+    __rewrites: list[tuple[str, int]]
+    __cost: int
+    __options: frozenset[str]
+
+    def __init__(self, tokens: TokenStream):
+        """
+        Constructs new (empty) Program
+
+        :param tokens: Stream of tokens the program is compiled from (used for error reporting)
+        """
+        self.__tokens = tokens
+        self.__opcodes = array('B')
+        self.__operands = array('I')
+        self.__arities = array('I')
+        self.__positions = array('I')
+        self.__constants = []
+        self.__operators = []
+        self.__indexes = dict()
+        self.__variables = dict()
+        self.__natives = dict()
+        self.__registers = 0
+        self.__rewrites = []
+        self.__cost = 0
+        self.__options = frozenset()
+
+    @property
+    def tokens(self) -> TokenStream:
+        """
+        Stream of tokens the program is compiled from
+
+        :return: Token stream
+        """
+        return self.__tokens
+
+    @property
+    def opcodes(self) -> array:
+        """
+        Opcode of every instruction
+
+        :return: Array of opcodes
+        """
+        return self.__opcodes
+
+    @property
+    def operands(self) -> array:
+        """
+        Operand of every instruction (index into constants or operators pool)
+
+        :return: Array of operands
+        """
+        return self.__operands
+
+    @property
+    def arities(self) -> array:
+        """
+        Number of stack values consumed by every instruction
+
+        :return: Array of arities
+        """
+        return self.__arities
+
+    @property
+    def constants(self) -> list[float]:
+        """
+        Constants pool
+
+        :return: List of constants
+        """
+        return self.__constants
+
+    @property
+    def operators(self) -> list[Operator_T]:
+        """
+        Operators pool (flyweight tokens)
+
+        :return: List of operators
+        """
+        return self.__operators
+
+    @property
+    def variables(self) -> list[str]:
+        """
+        Names of variables (order of names is the order of values expected by evaluation)
+
+        :return: List of variable names
+        """
+        return list(self.__variables)
+
+    @property
+    def positions(self) -> array:
+        """
+        Index of the token every instruction is compiled from
+
+        :return: Array of token indexes
+        """
+        return self.__positions
+
+    @property
+    def registers(self) -> int:
+        """
+        Number of registers used by STORE and FETCH instructions
+
+        :return: Number of registers
+        """
+        return self.__registers
+
+    @property
+    def rewrites(self) -> list[Rewrite]:
+        """
+        Optimizations applied to the program
+
+        :return: List of rewrites (in order they were applied)
+        """
+        return [Rewrite(rule, self.__tokens[position]) for rule, position in self.__rewrites]
+
+    @property
+    def cost(self) -> int:
+        """
+        Estimated evaluation cost (every instruction costs 1 and operators cost their cost per consumed value)
+        Programs have no loops, so the cost is known before evaluation
+
+        :return: Cost units
+        """
+        return self.__cost
+
+    @property
+    def options(self) -> frozenset[str]:
+        """
+        Names of options read by operators of the program (other options do not change the result)
+
+        :return: Option names
+        """
+        return self.__options
+
+    @property
+    def natives(self) -> dict[frozenset, Optional[Callable[..., float]]]:
+        """
+        Program lowered into python functions (keyed by values of program options the function is specialized for)
+
+        :return: Lowered functions (None marks program which can't be lowered)
+        """
+        return self.__natives
+
+    def push(self, value: float, position: int) -> None:
+        """
+        Appends PUSH instruction
+
+        :param value: Pushed constant
+        :param position: Index of the token the instruction is compiled from
+        """
+        self.__emit(Opcode.PUSH, len(self.__constants), 0, position)
+        self.__constants.append(value)
+
+    def apply(self, opcode: Opcode, operator: Operator_T, position: int, arity: int = None) -> None:
+        """
+        Appends operator instruction (UNARY, BINARY or CALL)
+
+        :param opcode: Instruction opcode
+        :param operator: Applied operator
+        :param position: Index of the token the instruction is compiled from
+        :param arity: Number of consumed stack values (defaults to 1 for UNARY and CALL and 2 for BINARY)
+        """
+        # Operators are flyweights keyed by identity (value-less flyweights of all types have equal hashes)
+        index = self.__indexes.get(id(operator))
+        if index is None:
+            index = self.__indexes[id(operator)] = len(self.__operators)
+            self.__operators.append(operator)
+            self.__options |= operator.options
+
+        arity = arity or _ARITIES[opcode]
+        self.__cost += operator.cost * arity
+        self.__emit(opcode, index, arity, position)
+
+    def load(self, name: str, position: int) -> None:
+        """
+        Appends LOAD instruction
+
+        :param name: Variable name
+        :param position: Index of the token the instruction is compiled from
+        """
+        index = self.__variables.get(name)
+        if index is None:
+            index = self.__variables[name] = len(self.__variables)
+
+        self.__emit(Opcode.LOAD, index, 0, position)
+
+    def store(self, register: int, position: int) -> None:
+        """
+        Appends STORE instruction
+
+        :param register: Index of the register
+        :param position: Index of the token the instruction is compiled from
+        """
+        self.__registers = max(self.__registers, register + 1)
+        self.__emit(Opcode.STORE, register, 0, position)
+
+    def fetch(self, register: int, position: int) -> None:
+        """
+        Appends FETCH instruction
+
+        :param register: Index of the register (set by preceding STORE instruction)
+        :param position: Index of the token the instruction is compiled from
+        """
+        self.__emit(Opcode.FETCH, register, 0, position)
+
+    def record(self, rewrites: list[tuple[str, int]]) -> None:
+        """
+        Records optimizations applied to the program
+
+        :param rewrites: Pairs of rule name and index of the token the rewritten instruction was compiled from
+        """
+        self.__rewrites.extend(rewrites)
+
+    def charge(self, cost: int) -> None:
+        """
+        Adds cost of work done for the program outside of its instructions
+        (ex operations evaluated ahead of time by optimizer)
+
+        :param cost: Cost units
+        """
+        self.__cost += cost
+
+    def token_at(self, index: int) -> Token_t:
+        """
+        Token the instruction located at given index is compiled from
+
+        :param index: Instruction index
+        :return: Token
+        """
+        return self.__tokens[self.__positions[index]]
+
+    def __emit(self, opcode: Opcode, operand: int, arity: int, position: int) -> None:
+        """
+        Appends instruction
+
+        :param opcode: Instruction opcode
+        :param operand: Instruction operand
+        :param arity: Number of consumed stack values
+        :param position: Index of the token the instruction is compiled from
+        """
+        self.__cost += 1
+        self.__opcodes.append(opcode)
+        self.__operands.append(operand)
+        self.__arities.append(arity)
+        self.__positions.append(position)
+
+    def __len__(self) -> int:
+        return len(self.__opcodes)
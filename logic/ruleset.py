@@ -46,6 +46,24 @@ class Ruleset:
         """
         return self.__identity
 
+    @property
+    def before(self) -> list[Type[Token_t]]:
+        """
+        Ruleset lookbehind (tokens allowed directly before identity)
+
+        :return: List of token types defining lookbehind
+        """
+        return self.__before
+
+    @property
+    def after(self) -> list[Type[Token_t]]:
+        """
+        Ruleset lookahead (tokens allowed directly after identity)
+
+        :return: List of token types defining lookahead
+        """
+        return self.__after
+
     def enclose(self, *, before: list[Type[Token_t]] = None, after: list[Type[Token_t]] = None) -> None:
         """
         Surround the identity with regex lookbehind and/ or lookahead
@@ -63,6 +81,42 @@ class Ruleset:
 
         :return: Ruleset regex pattern object
         """
+        # Join identity list
+        identity = '|'.join(map(lambda x: x.identity().pattern, self.__identity))
+
+        # Compile pattern object
+        return self.__enclosed(f"({identity})")
+
+    def groups(self, name: str) -> dict[str, Type[Token_t]]:
+        """
+        Names of regex groups created for every identity token type (used by named_regex)
+
+        :param name: Ruleset name (prefix of every group name)
+        :return: Mapping of group names to token types
+        """
+        return {f"{name}__{i}": x for i, x in enumerate(self.__identity)}
+
+    def named_regex(self, name: str) -> re.Pattern:
+        """
+        Compiles ruleset with separate named group for every identity token type
+        (matched group name directly points to token type)
+
+        :param name: Ruleset name (prefix of every group name)
+        :return: Ruleset regex pattern object
+        """
+        # Join identity list (every token type is wrapped in its own named group)
+        identity = '|'.join(map(lambda x: f"(?P<{x[0]}>{x[1].identity().pattern})", self.groups(name).items()))
+
+        # Compile pattern object
+        return self.__enclosed(f"(?:{identity})")
+
+    def __enclosed(self, identity: str) -> re.Pattern:
+        """
+        Surrounds identity with lookbehind and lookahead
+
+        :param identity: Identity regex
+        :return: Compiled regex pattern object
+        """
         # Join lookbehind if before list is not empty
         before = '|'.join(map(lambda x: x.identity().pattern, self.__before))
         if len(before) > 0:
@@ -73,8 +127,5 @@ class Ruleset:
         if len(after) > 0:
             after = fr"(?={after})"
 
-        # Join identity list
-        identity = '|'.join(map(lambda x: x.identity().pattern, self.__identity))
-
         # Compile pattern object
-        return re.compile(fr"{before}({identity}){after}", re.I)
+        return re.compile(fr"{before}{identity}{after}", re.I)
@@ -0,0 +1,159 @@
+import re
+from typing import Type
+from .tokens import Token_t
+from .ruleset import Ruleset
+from .stream import TokenStream
+
+# Identity patterns consisting only of plain characters and escaped symbols (ex "MOD" or "\+")
+_LITERAL: re.Pattern = re.compile(r"(?:\\[^A-Za-z0-9]|[^\\.^$*+?{}\[\]|()])+")
+
+
+class _Identity:
+    """
+    Precompiled token identity (either case-insensitive keyword or anchored pattern)
+    """
+    __slots__ = ('literal', 'pattern')
+
+    def __init__(self, token: Type[Token_t]):
+        """
+        Constructs new _Identity
+
+        :param token: Token type to precompile identity for
+        """
+        source = token.identity().pattern
+        if _LITERAL.fullmatch(source):
+            # Keywords are compared directly (no regex involved)
+            self.literal = re.sub(r"\\(.)", r"\1", source).upper()
+            self.pattern = None
+        else:
+            self.literal = None
+            self.pattern = re.compile(source, re.I)
+
+    def match(self, text: str, pos: int) -> int:
+        """
+        Matches identity at given position
+
+        :param text: Whitespace free expression
+        :param pos: Position to match at
+        :return: End of the match or -1 if identity does not match
+        """
+        if self.literal is not None:
+            end = pos + len(self.literal)
+            return end if text[pos:end].upper() == self.literal else -1
+
+        match = self.pattern.match(text, pos)
+        return match.end() if match else -1
+
+
+class _Entry:
+    """
+    Single token type of a ruleset together with its neighbourhood restrictions
+    """
+    __slots__ = ('identity', 'code', 'behind', 'follow', 'follow_patterns')
+
+    def __init__(self, identity: _Identity, code: int, ruleset: Ruleset):
+        """
+        Constructs new _Entry
+
+        :param identity: Precompiled identity of the token type
+        :param code: Token type code
+        :param ruleset: Ruleset the token type belongs to (source of before and after restrictions)
+        """
+        self.identity = identity
+        self.code = code
+
+        # Lookbehind is a fixed width check performed directly at token start
+        before = '|'.join(map(lambda x: x.identity().pattern, ruleset.before))
+        self.behind = re.compile(fr"(?<={before})", re.I) if len(before) > 0 else None
+
+        # Allowed next tokens (keywords indexed by their first character, patterns checked in order)
+        self.follow = None
+        self.follow_patterns = ()
+        if len(ruleset.after) > 0:
+            self.follow = dict()
+            for after in map(_Identity, ruleset.after):
+                if after.literal is not None:
+                    self.follow.setdefault(after.literal[0], []).append(after.literal)
+                else:
+                    self.follow_patterns += (after.pattern,)
+
+    def allows(self, text: str, begin: int, end: int) -> bool:
+        """
+        Checks neighbourhood restrictions of the token located between begin and end
+
+        :param text: Whitespace free expression
+        :param begin: Token start
+        :param end: Token end
+        :return: True if token is allowed in given place
+        """
+        if self.behind is not None and not self.behind.match(text, begin):
+            return False
+
+        if self.follow is None:
+            return True
+
+        if end < len(text):
+            for literal in self.follow.get(text[end].upper(), ()):
+                if text[end:end + len(literal)].upper() == literal:
+                    return True
+
+        return any(pattern.match(text, end) for pattern in self.follow_patterns)
+
+
+class Scanner:
+    """
+    Single pass, table driven alternative to regex alternation tokenizing
+    """
+    __types: tuple[Type[Token_t], ...]
+    __table: dict[str, tuple[_Entry, ...]]
+    __default: tuple[_Entry, ...]
+
+    def __init__(self, rules: dict[str, Ruleset], types: tuple[Type[Token_t], ...]):
+        """
+        Constructs new Scanner (precomputes dispatch tables)
+
+        :param rules: Named rulesets (order of rulesets decides priority as in regex alternation)
+        :param types: Token types table (index of a type is used as its code in token streams)
+        """
+        self.__types = types
+        identities: dict[Type[Token_t], _Identity] = dict()
+        entries: list[_Entry] = []
+        for ruleset in rules.values():
+            for token in ruleset.identity:
+                if token not in identities:
+                    identities[token] = _Identity(token)
+                entries.append(_Entry(identities[token], types.index(token), ruleset))
+
+        # Every character maps to candidates in priority order
+        # (keywords starting with given character and every pattern based identity)
+        characters = {e.identity.literal[0] for e in entries if e.identity.literal is not None}
+        self.__table = {
+            c: tuple(e for e in entries if e.identity.literal is None or e.identity.literal[0] == c)
+            for c in characters
+        }
+        self.__default = tuple(e for e in entries if e.identity.literal is None)
+
+    def scan(self, text: str) -> TokenStream:
+        """
+        Converts whitespace free mathematical expression into stream of tokens
+
+        :param text: Whitespace free mathematical expression
+        :return: Stream of tokens
+        """
+        tokens: TokenStream = TokenStream(text, self.__types)
+        pos: int = 0
+        while pos < len(text):
+            # First candidate (in priority order) accepted by its neighbourhood wins
+            for entry in self.__table.get(text[pos].upper(), self.__default):
+                end = entry.identity.match(text, pos)
+                if end > pos and entry.allows(text, pos, end):
+                    break
+            else:
+                # Nothing recognized at this position (not reachable while "invalid" ruleset is defined)
+                pos += 1
+                continue
+
+            tokens.append(entry.code, pos, end)
+            pos = end
+
+        return tokens
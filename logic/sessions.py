@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+from .history import History
+
+
+class _Shard:
+    """
+    Part of session histories guarded by its own lock (sessions ordered from the least recently active one)
+    """
+    __slots__ = ('lock', 'histories', 'entries', 'evictions')
+
+    lock: threading.Lock
+    histories: OrderedDict
+    entries: int
+    evictions: int
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histories = OrderedDict()
+        self.entries = 0
+        self.evictions = 0
+
+
+class SessionHistories:
+    """
+    Histories partitioned by session, kept in a sharded map (writes of different shards do not contend)
+    Number of stored entries is capped - the least recently active sessions are evicted to respect the cap
+    (every session counts against the cap with its entries and a fixed overhead - many small sessions are capped too)
+    """
+    __session_capacity: int
+    __session_overhead: int
+    __shard_capacity: int
+    __shards: tuple[_Shard, ...]
+
+    def __init__(
+            self,
+            session_capacity: int = 100,
+            max_entries: int = 100_000,
+            shards: int = 16,
+            session_overhead: int = 16
+    ):
+        """
+        Constructs new SessionHistories
+
+        :param session_capacity: Maximum number of entries kept for a single session
+        :param max_entries: Maximum number of entries of all sessions together (split evenly between shards)
+        :param shards: Number of shards (independently locked parts of the map)
+        :param session_overhead: Memory of a session without entries (in entries - counted against max_entries)
+        """
+        if session_capacity < 1 or shards < 1 or session_overhead < 0:
+            raise ValueError(
+                "Session capacity and number of shards must be positive", session_capacity, shards, session_overhead
+            )
+        if max_entries < (session_capacity + session_overhead) * shards:
+            raise ValueError("Every shard has to fit at least one full session", max_entries)
+
+        # Initiate fields
+        self.__session_capacity = session_capacity
+        self.__session_overhead = session_overhead
+        self.__shard_capacity = max_entries // shards
+        self.__shards = tuple(_Shard() for _ in range(shards))
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Session histories counters
+
+        :return: Number of sessions, stored entries and evicted sessions
+        """
+        sessions, entries, evictions = 0, 0, 0
+        for shard in self.__shards:
+            with shard.lock:
+                sessions += len(shard.histories)
+                entries += shard.entries
+                evictions += shard.evictions
+
+        return {'sessions': sessions, 'entries': entries, 'evictions': evictions}
+
+    def get(self, session: str) -> Optional[History]:
+        """
+        History of the session
+
+        :param session: Session key
+        :return: History (None if session has no entries)
+        """
+        shard = self.__shard(session)
+        with shard.lock:
+            return shard.histories.get(session)
+
+    def extend(self, session: str, entries: Iterable[tuple[str, str]]) -> None:
+        """
+        Adds entries to history of the session (session becomes the most recently active one)
+
+        :param session: Session key
+        :param entries: Pairs of expression and stringified result (in order of evaluation)
+        """
+        shard = self.__shard(session)
+        with shard.lock:
+            history = shard.histories.get(session)
+            if history is None:
+                history = shard.histories[session] = History(self.__session_capacity)
+            shard.histories.move_to_end(session)
+
+            size = len(history)
+            history.extend(entries)
+            shard.entries += len(history) - size
+
+            # The least recently active sessions are evicted (never the current one)
+            while shard.entries + len(shard.histories) * self.__session_overhead > self.__shard_capacity and \
+                    len(shard.histories) > 1:
+                _, evicted = shard.histories.popitem(last=False)
+                shard.entries -= len(evicted)
+                shard.evictions += 1
+
+    def __shard(self, session: str) -> _Shard:
+        """
+        Shard the session belongs to
+
+        :param session: Session key
+        :return: Shard
+        """
+        return self.__shards[hash(session) % len(self.__shards)]
@@ -0,0 +1,154 @@
+import collections.abc
+from array import array
+from typing import Iterator, Type, Union
+from .tokens import Token_t
+
+
+class TokenStream(collections.abc.Sequence):
+    """
+    Compact (struct of arrays) representation of tokenized expression
+    Every token is stored as a type code and begin/end offsets into whitespace free expression
+    (token objects are created only on demand)
+    """
+    __slots__ = ('__source', '__types', '__codes', '__begins', '__ends')
+
+    __source: str
+    __types: tuple[Type[Token_t], ...]
+    __codes: array
+    __begins: array
+    __ends: array
+
+    def __init__(self, source: str, types: tuple[Type[Token_t], ...]):
+        """
+        Constructs new (empty) TokenStream
+
+        :param source: Whitespace free expression (tokens offsets point into it)
+        :param types: Token types table (type codes are indexes of this table)
+        """
+        self.__source = source
+        self.__types = types
+        self.__codes = array('H')
+        self.__begins = array('I')
+        self.__ends = array('I')
+
+    @property
+    def source(self) -> str:
+        """
+        Expression the stream was created from
+
+        :return: Whitespace free expression
+        """
+        return self.__source
+
+    @property
+    def types(self) -> tuple[Type[Token_t], ...]:
+        """
+        Token types table
+
+        :return: Token types indexed by type codes
+        """
+        return self.__types
+
+    @property
+    def codes(self) -> array:
+        """
+        Type code of every token
+
+        :return: Array of type codes
+        """
+        return self.__codes
+
+    @property
+    def begins(self) -> array:
+        """
+        Start offset of every token
+
+        :return: Array of offsets
+        """
+        return self.__begins
+
+    @property
+    def ends(self) -> array:
+        """
+        End offset of every token
+
+        :return: Array of offsets
+        """
+        return self.__ends
+
+    def append(self, code: int, begin: int, end: int) -> None:
+        """
+        Appends token to the end of the stream
+
+        :param code: Token type code
+        :param begin: Token start
+        :param end: Token end
+        """
+        self.__codes.append(code)
+        self.__begins.append(begin)
+        self.__ends.append(end)
+
+    def copy(self) -> 'TokenStream':
+        """
+        Copies the stream (source and types table are shared)
+
+        :return: New TokenStream
+        """
+        stream = TokenStream(self.__source, self.__types)
+        stream.__codes = self.__codes[:]
+        stream.__begins = self.__begins[:]
+        stream.__ends = self.__ends[:]
+        return stream
+
+    def type_at(self, index: int) -> Type[Token_t]:
+        """
+        Type of token located at given index
+
+        :param index: Token index
+        :return: Token type
+        """
+        return self.__types[self.__codes[index]]
+
+    def value_at(self, index: int) -> str:
+        """
+        Value of token located at given index
+
+        :param index: Token index
+        :return: Token value
+        """
+        return self.__source[self.__begins[index]:self.__ends[index]]
+
+    def flyweight_at(self, index: int) -> Token_t:
+        """
+        Shared instance of the type of token located at given index (carries only behaviour of the type)
+
+        :param index: Token index
+        :return: Flyweight token
+        """
+        return self.__types[self.__codes[index]].flyweight()
+
+    def __len__(self) -> int:
+        return len(self.__codes)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Token_t, list[Token_t]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        begin, end = self.__begins[index], self.__ends[index]
+        return self.__types[self.__codes[index]].trusted(self.__source[begin:end], begin, end)
+
+    def __iter__(self) -> Iterator[Token_t]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TokenStream):
+            return self is other or list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)})"
@@ -1,37 +1,108 @@
 import re
-from typing import Callable, Iterator
+import threading
+from typing import Callable, Iterator, Type
 from .tokens import Token_t, AnyChar
 from .ruleset import Ruleset
+from .scanner import Scanner
+from .stream import TokenStream
+from .observer import Observer, observe
 
 
 class Tokenizer:
     """
     Class abstracting token parsing
+    (parse is reentrant - every parse keeps its state locally, so a single Tokenizer can be shared between threads)
     """
+    # Available tokenizing engines
+    # - regex: single alternation of every ruleset regex (lookbehind and lookahead based)
+    # - table: single pass scanner driven by precomputed tables (see Scanner)
+    ENGINES: tuple[str, ...] = ('regex', 'table')
+
+    __engine: str
     __rules: dict[str, Ruleset]
-    __tokens: list[Token_t]
-    __validators: dict[str, Callable[[list[Token_t]], None]]
+    __local: threading.local
+    __lock: threading.Lock
+    __validators: dict[str, Callable[[TokenStream], None]]
+    __types: tuple[Type[Token_t], ...]
     __pattern: re.Pattern
+    __dispatch: dict[str, int]
+    __scanner: Scanner
+    __observers: tuple[Observer, ...]
 
-    def __init__(self):
+    def __init__(self, engine: str = 'regex'):
         """
         Constructs new Tokenizer
+
+        :param engine: Tokenizing engine (one of Tokenizer.ENGINES)
         """
+        if engine not in Tokenizer.ENGINES:
+            raise ValueError(f"Unknown engine. Expected one of {Tokenizer.ENGINES}", engine)
 
         # Initiate fields
+        self.__engine = engine
         self.__rules = dict()
-        self.__tokens = []
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
         self.__validators = dict()
+        self.__types = ()
         self.__pattern = None
+        self.__dispatch = dict()
+        self.__scanner = None
+        self.__observers = ()
+
+    @property
+    def engine(self) -> str:
+        """
+        Tokenizing engine
+
+        :return: Name of used engine
+        """
+        return self.__engine
+
+    @property
+    def observers(self) -> tuple[Observer, ...]:
+        """
+        Observers of parsing stages (tokenize and validate)
+
+        :return: Tuple of observers
+        """
+        return self.__observers
+
+    @observers.setter
+    def observers(self, observers: tuple[Observer, ...]) -> None:
+        """
+        Changes observers of parsing stages
+
+        :param observers: Tuple of observers (empty tuple disables notifications)
+        """
+        self.__observers = observers
+
+    @property
+    def rules(self) -> dict[str, Ruleset]:
+        """
+        Named rulesets of parsing logic
+
+        :return: Copy of rulesets (by name)
+        """
+        return dict(self.__rules)
+
+    @property
+    def validators(self) -> dict[str, Callable[[TokenStream], None]]:
+        """
+        Named validators of parsing logic
+
+        :return: Copy of validators (by name)
+        """
+        return dict(self.__validators)
 
     @property
-    def tokens(self) -> list[Token_t]:
+    def tokens(self) -> TokenStream:
         """
-        Tokens parsed in last parse operation
+        Tokens parsed in last parse operation (performed by the calling thread)
 
-        :return: List of parsed tokens
+        :return: Stream of parsed tokens
         """
-        return self.__tokens
+        return getattr(self.__local, 'tokens', [])
 
     def set_rules(self, **kwargs: Ruleset) -> None:
         """
@@ -44,9 +115,13 @@ class Tokenizer:
             if not isinstance(v, Ruleset):
                 raise ValueError(f"{k} rule must be an instance of {Ruleset} or one of it's subclass", str(v))
 
-        self.__rules = kwargs
+        with self.__lock:
+            self.__rules = kwargs
+            # Previously compiled rules are outdated
+            self.__pattern = None
+            self.__scanner = None
 
-    def set_validators(self, **validators: Callable[[list[Token_t]], None]) -> None:
+    def set_validators(self, **validators: Callable[[TokenStream], None]) -> None:
         """
         Sets validators for additional checks (they are ignored here)
 
@@ -59,20 +134,27 @@ class Tokenizer:
 
         self.__validators = validators
 
-    def parse(self, expression: str) -> list[Token_t]:
+    def parse(self, expression: str) -> TokenStream:
         """
         Parses mathematical expression
 
         :param expression: Stringified mathematical expression
-        :return: List of tokens (tokenized mathematical expression)
+        :return: Stream of tokens (tokenized mathematical expression)
         """
         # Internal parsing stages
-        # 1. Split expression
+        # 1. Split expression (or scan it in case of table engine)
         # 2. Tokenize splitted iterable of match objects (tokens if match object format)
         # 3. Verify (call set validators)
-        split: Iterator[re.Match] = self.__split(expression)
-        tokens: list[Token_t] = self.__tokenize(split)
-        self.__verify()
+        # Observers are notified about stages only if there are any (stages are called directly otherwise)
+        observers = self.__observers
+        text: str = re.sub(r"\s", '', expression)
+        if not observers:
+            tokens: TokenStream = self.__lex(text)
+            self.__verify(tokens)
+        else:
+            tokens: TokenStream = observe(observers, 'tokenize', text, self.__lex, text)
+            observe(observers, 'validate', text, self.__verify, tokens)
+        self.__local.tokens = tokens
 
         return tokens
 
@@ -80,30 +162,59 @@ class Tokenizer:
         """
         Compiles rulesets into regex pattern object for further use
         """
-        # "invalid" ruleset is reserved for AnyChar (matching entire expression)
-        # in case of unrecognized pattern
-        self.__rules["invalid"] = Ruleset([AnyChar])
-        self.__pattern = re.compile(
-            fr"""{'|'.join(
-                map(
-                    lambda x: f'(?P<{x}>{self.__rules[x].regex.pattern})', 
-                    self.__rules.keys())
-            )}""",
-            re.X | re.I
-        )
+        with self.__lock:
+            # "invalid" ruleset is reserved for AnyChar (matching entire expression)
+            # in case of unrecognized pattern
+            rules = self.__rules
+            rules["invalid"] = Ruleset([AnyChar])
+
+            # Token types table (index of a type is used as its code in token streams)
+            types = tuple(dict.fromkeys(t for v in rules.values() for t in v.identity))
+            self.__types = types
+            if self.__engine == 'table':
+                self.__scanner = Scanner(rules, types)
+                return
+
+            # Every token type gets its own named group (matched group name leads directly to token type code)
+            # Dispatch table is published before the pattern (parse reads them in reverse order)
+            codes = {t: i for i, t in enumerate(types)}
+            self.__dispatch = {g: codes[t] for k, v in rules.items() for g, t in v.groups(k).items()}
+            self.__pattern = re.compile(
+                fr"""{'|'.join(
+                    map(
+                        lambda x: rules[x].named_regex(x).pattern,
+                        rules.keys())
+                )}""",
+                re.X | re.I
+            )
+
+    def __lex(self, text: str) -> TokenStream:
+        """
+        Splits and tokenizes expression (or scans it in case of table engine)
+
+        :param text: Whitespace free expression
+        :return: Stream of tokens
+        """
+        if self.__engine == 'table':
+            return self.__scan(text)
+
+        split: Iterator[re.Match] = self.__split(text)
+        return self.__tokenize(text, split)
 
-    def __verify(self) -> None:
+    def __verify(self, tokens: TokenStream) -> None:
         """
-        Calls validators in loop passing copy of token list (user shouldn't change parse result)
+        Calls validators in loop passing copy of token stream (user shouldn't change parse result)
+
+        :param tokens: Stream of tokens to verify
         """
         for k, v in self.__validators.items():
-            v(self.__tokens[:])
+            v(tokens.copy())
 
-    def __split(self, expression: str) -> Iterator[re.Match]:
+    def __split(self, text: str) -> Iterator[re.Match]:
         """
-        Splits stringified mathematical expression into regex match objects (reflected by set rulesets)
+        Splits whitespace free mathematical expression into regex match objects (reflected by set rulesets)
 
-        :param expression: Stringified mathematical expression
+        :param text: Whitespace free mathematical expression
         :return: List of regex match objects
         """
         # Check if parse pattern is set
@@ -111,26 +222,37 @@ class Tokenizer:
             self.compile()
 
         # Extract tokens (as iterable of match objects)
-        return self.__pattern.finditer(re.sub(r"\s", '', expression))
+        return self.__pattern.finditer(text)
+
+    def __scan(self, text: str) -> TokenStream:
+        """
+        Converts whitespace free mathematical expression into stream of tokens with table driven scanner
 
-    def __tokenize(self, matches: Iterator[re.Match]) -> list[Token_t]:
+        :param text: Whitespace free mathematical expression
+        :return: Stream of tokens
         """
-        Converts iterable of match objects into list of tokens (more readable)
+        # Check if scanner is set
+        if not self.__scanner:
+            self.compile()
+
+        return self.__scanner.scan(text)
 
+    def __tokenize(self, text: str, matches: Iterator[re.Match]) -> TokenStream:
+        """
+        Converts iterable of match objects into stream of tokens (more readable)
+
+        :param text: Whitespace free mathematical expression (matches source)
         :param matches: Iterable of match objects
-        :return: List of tokens
-        """
-        # Map every match object into token object by using appropriate constructor
-        # Constructors are matched by checking in order identity of named ruleset that created the match in expression
-        # Every ruleset contains an identity list of token constructors
-        # Regex match is performed by named groups (the same as named ruleset)
-        self.__tokens = list(
-            map(
-                lambda x: next(
-                    (c for c in self.__rules[x.lastgroup].identity if c.identity().search(x[x.lastgroup])),
-                    AnyChar
-                )(x[x.lastgroup], x.start(), x.end()),
-                matches
-            )
-        )
-        return self.__tokens
+        :return: Stream of tokens
+        """
+        # Map every match object into token type code and its offsets
+        # Every token type has its own named group (created during compile stage)
+        # so the name of the matched group points directly to the type code
+        # Token objects are not created at all (stream keeps only codes and offsets)
+        dispatch = self.__dispatch
+        tokens = TokenStream(text, self.__types)
+        append = tokens.append
+        for x in matches:
+            append(dispatch[x.lastgroup], x.start(), x.end())
+
+        return tokens
@@ -34,6 +34,10 @@ class BinaryPlus(Binary):
         x, y = pack
         return x + y
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        x, y = args
+        return f"({x} + {y})"
+
     @staticmethod
     def identity():
         return re.compile(fr"\+")
@@ -52,6 +56,10 @@ class BinaryMinus(Binary):
         x, y = pack
         return x - y
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        x, y = args
+        return f"({x} - {y})"
+
     @staticmethod
     def identity():
         return re.compile(fr"-")
@@ -70,6 +78,10 @@ class BinaryMultiply(Binary):
         x, y = pack
         return x * y
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        x, y = args
+        return f"({x} * {y})"
+
     @staticmethod
     def identity():
         return re.compile(fr"\*")
@@ -88,6 +100,10 @@ class BinaryDivide(Binary):
         x, y = pack
         return x / y
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        x, y = args
+        return f"({x} / {y})"
+
     @staticmethod
     def identity():
         return re.compile(fr"/")
@@ -106,6 +122,10 @@ class BinaryModulo(Binary):
         x, y = pack
         return x % y
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        x, y = args
+        return f"({x} % {y})"
+
     @staticmethod
     def identity():
         return re.compile(fr"%")
@@ -128,6 +148,14 @@ class BinaryExponent(Binary):
         x, y = pack
         return x ** y
 
+    @property
+    def cost(self):
+        return 2
+
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        x, y = args
+        return f"({x} ** {y})"
+
     @staticmethod
     def identity():
         return re.compile(fr"\^")
@@ -1,10 +1,36 @@
 from functools import reduce
 import math
 import re
-from typing import Union
+from typing import Callable, Optional, Union
 from .primitive_tokens import Function
 
 
+def _lower(token: Function, args: list[str], body: Callable[[list[str]], str]) -> Optional[str]:
+    """
+    Lowers function call into python expression (the same way as operation - result is added to 0)
+
+    :param token: Lowered function
+    :param args: Python expressions of arguments
+    :param body: Builder of lowered function body
+    :return: Python expression (None if arguments limit is exceeded - operation raises an error then)
+    """
+    x, y = token.args_min_max
+    if not (x <= len(args) <= y):
+        return None
+
+    return f"(0 + ({body(args)}))"
+
+
+def _chain(operator: str) -> Callable[[list[str]], str]:
+    """
+    Builder of left associative chain of arguments (lowered reduce)
+
+    :param operator: Python binary operator
+    :return: Lowered function body builder
+    """
+    return lambda args: reduce(lambda a, b: f"{a} {operator} {b}", args)
+
+
 # Unlimited arg (arg list are more over reduced to single value)
 class FunctionModulo(Function):
     """
@@ -13,6 +39,9 @@ class FunctionModulo(Function):
     def operation(self, pack: list[float], **options: Union[bool, str]):
         return super().operation(pack) + reduce(lambda a, b: a % b, pack)
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(self, args, _chain("%"))
+
     @staticmethod
     def identity():
         return re.compile(fr"MOD", re.I)
@@ -25,6 +54,9 @@ class FunctionFloorDivision(Function):
     def operation(self, pack: list[float], **options: Union[bool, str]):
         return super().operation(pack) + (reduce(lambda a, b: a // b, pack) if len(pack) > 1 else pack[0] // 1)
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(self, args, lambda p: _chain("//")(p) if len(p) > 1 else f"{p[0]} // 1")
+
     @staticmethod
     def identity():
         return re.compile(fr"FDIV", re.I)
@@ -37,6 +69,9 @@ class FunctionMin(Function):
     def operation(self, pack: list[float], **options: Union[bool, str]):
         return super().operation(pack) + min(pack)
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(self, args, lambda p: f"min(({', '.join(p)},))")
+
     @staticmethod
     def identity():
         return re.compile(fr"MIN", re.I)
@@ -49,6 +84,9 @@ class FunctionMax(Function):
     def operation(self, pack: list[float], **options: Union[bool, str]):
         return super().operation(pack) + max(pack)
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(self, args, lambda p: f"max(({', '.join(p)},))")
+
     @staticmethod
     def identity():
         return re.compile(fr"MAX", re.I)
@@ -62,6 +100,16 @@ class FunctionRoot(Function):
         s = super().operation(pack)
         return s + (reduce(lambda a, b: a ** (1/b), pack) if len(pack) > 1 else pack[0] ** 0.5)
 
+    @property
+    def cost(self):
+        return 2
+
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(
+            self, args,
+            lambda p: reduce(lambda a, b: f"({a}) ** (1/{b})", p) if len(p) > 1 else f"{p[0]} ** 0.5"
+        )
+
     @staticmethod
     def identity():
         return re.compile(fr"ROOT", re.I)
@@ -75,6 +123,13 @@ class FunctionPow(Function):
         s = super().operation(pack)
         return s + (reduce(lambda a, b: a ** b, pack) if len(pack) > 1 else pack[0] ** 2)
 
+    @property
+    def cost(self):
+        return 2
+
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(self, args, lambda p: reduce(lambda a, b: f"({a}) ** {b}", p) if len(p) > 1 else f"{p[0]} ** 2")
+
     @staticmethod
     def identity():
         return re.compile(fr"POW", re.I)
@@ -88,6 +143,12 @@ class FunctionLog(Function):
         s = super().operation(pack)
         return s + (reduce(lambda a, b: math.log(a, b), pack) if len(pack) > 1 else math.log10(pack[0]))
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(
+            self, args,
+            lambda p: reduce(lambda a, b: f"math.log({a}, {b})", p) if len(p) > 1 else f"math.log10({p[0]})"
+        )
+
     @staticmethod
     def identity():
         return re.compile(fr"LOG", re.I)
@@ -100,6 +161,9 @@ class FunctionAdd(Function):
     def operation(self, pack: list[float], **options: Union[bool, str]):
         return super().operation(pack) + sum(pack)
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(self, args, lambda p: f"sum(({', '.join(p)},))")
+
     @staticmethod
     def identity():
         return re.compile(fr"ADD", re.I)
@@ -112,6 +176,9 @@ class FunctionSubtract(Function):
     def operation(self, pack: list[float], **options: Union[bool, str]):
         return super().operation(pack) + reduce(lambda a, b: a - b, pack)
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(self, args, _chain("-"))
+
     @staticmethod
     def identity():
         return re.compile(fr"SUB", re.I)
@@ -124,6 +191,9 @@ class FunctionMultiply(Function):
     def operation(self, pack: list[float], **options: Union[bool, str]):
         return super().operation(pack) + reduce(lambda a, b: a * b, pack)
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(self, args, _chain("*"))
+
     @staticmethod
     def identity():
         return re.compile(fr"MUL", re.I)
@@ -136,6 +206,9 @@ class FunctionDivide(Function):
     def operation(self, pack: list[float], **options: Union[bool, str]):
         return super().operation(pack) + reduce(lambda a, b: a / b, pack)
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(self, args, _chain("/"))
+
     @staticmethod
     def identity():
         return re.compile(fr"DIV", re.I)
@@ -150,6 +223,10 @@ class FunctionSin(Function):
         rad: bool = options.get('rad') or False
         return super().operation(pack) + math.sin(pack[0] if not rad else math.radians(pack[0]))
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        rad: bool = options.get('rad') or False
+        return _lower(self, args, lambda p: f"math.sin({p[0]})" if not rad else f"math.sin(math.radians({p[0]}))")
+
     @staticmethod
     def identity():
         return re.compile(fr"SIN", re.I)
@@ -158,6 +235,10 @@ class FunctionSin(Function):
     def args_min_max(self) -> tuple[float, float]:
         return 1, 1
 
+    @property
+    def options(self) -> frozenset[str]:
+        return frozenset({'rad'})
+
 
 class FunctionCos(Function):
     """
@@ -167,6 +248,10 @@ class FunctionCos(Function):
         rad: bool = options.get('rad') or False
         return super().operation(pack) + math.cos(pack[0] if not rad else math.radians(pack[0]))
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        rad: bool = options.get('rad') or False
+        return _lower(self, args, lambda p: f"math.cos({p[0]})" if not rad else f"math.cos(math.radians({p[0]}))")
+
     @staticmethod
     def identity():
         return re.compile(fr"COS", re.I)
@@ -175,6 +260,10 @@ class FunctionCos(Function):
     def args_min_max(self) -> tuple[float, float]:
         return 1, 1
 
+    @property
+    def options(self) -> frozenset[str]:
+        return frozenset({'rad'})
+
 
 class FunctionTan(Function):
     """
@@ -184,6 +273,10 @@ class FunctionTan(Function):
         rad: bool = options.get('rad') or False
         return super().operation(pack) + math.tan(pack[0] if not rad else math.radians(pack[0]))
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        rad: bool = options.get('rad') or False
+        return _lower(self, args, lambda p: f"math.tan({p[0]})" if not rad else f"math.tan(math.radians({p[0]}))")
+
     @staticmethod
     def identity():
         return re.compile(fr"TAN", re.I)
@@ -192,6 +285,10 @@ class FunctionTan(Function):
     def args_min_max(self) -> tuple[float, float]:
         return 1, 1
 
+    @property
+    def options(self) -> frozenset[str]:
+        return frozenset({'rad'})
+
 
 class FunctionLn(Function):
     """
@@ -201,6 +298,9 @@ class FunctionLn(Function):
         s = super().operation(pack)
         return s + math.log(pack[0], math.e)
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return _lower(self, args, lambda p: f"math.log({p[0]}, math.e)")
+
     @staticmethod
     def identity():
         return re.compile(fr"LN", re.I)
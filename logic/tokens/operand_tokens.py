@@ -1,6 +1,7 @@
 import math
 import re
 from .primitive_tokens import Operand
+from ..errors import VariableException
 
 
 class Number(Operand):
@@ -47,3 +48,16 @@ class EConstant(Constant):
     @property
     def cast(self):
         return math.e
+
+
+class Variable(Operand):
+    """
+    Class for tokens resembling variables (value is bound at evaluation)
+    """
+    @staticmethod
+    def identity() -> re.Pattern:
+        return re.compile(fr"[A-Za-z_][A-Za-z0-9_]*")
+
+    @property
+    def cast(self):
+        raise VariableException(f"Variable {self.value} has no value without binding")
@@ -3,9 +3,12 @@ import re
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 from enum import IntEnum
-from typing import TypeVar, Union
+from typing import Optional, TypeVar, Union
 from ..errors import OperationArgumentsException
 
+# Shared token instances (see Token.flyweight)
+_flyweights: dict[type, 'Token'] = dict()
+
 
 @dataclass(frozen=True)
 class Token(ABC):
@@ -33,6 +36,35 @@ class Token(ABC):
         if not type(self).identity().match(self.value):
             raise ValueError(f"Invalid Token value for Token group {type(self)}")
 
+    @classmethod
+    def trusted(cls, value: str, begin: int, end: int) -> 'Token':
+        """
+        Creates token without identity verification (value has to be already matched by token identity)
+
+        :param value: Token value
+        :param begin: Token start
+        :param end: Token end
+        :return: New token
+        """
+        token = object.__new__(cls)
+        object.__setattr__(token, 'value', value)
+        object.__setattr__(token, 'begin', begin)
+        object.__setattr__(token, 'end', end)
+        return token
+
+    @classmethod
+    def flyweight(cls) -> 'Token':
+        """
+        Shared, value-less instance of token type (for accessing type behaviour without creating new tokens)
+
+        :return: Flyweight token
+        """
+        token = _flyweights.get(cls)
+        if token is None:
+            token = _flyweights.setdefault(cls, cls.trusted('', 0, 0))
+
+        return token
+
 
 class _Special(Token):
     """
@@ -148,6 +180,35 @@ class Operator(Token):
 
         return 0
 
+    @property
+    def options(self) -> frozenset[str]:
+        """
+        Names of options read by operation (such operations are never evaluated ahead of time)
+
+        :return: Option names
+        """
+        return frozenset()
+
+    @property
+    def cost(self) -> int:
+        """
+        Evaluation cost of operation per argument (relative to a single addition)
+
+        :return: Cost units
+        """
+        return 1
+
+    def lower(self, args: list[str], **options: Union[bool, str]) -> Optional[str]:
+        """
+        Lowers operation into python expression (used by compiled programs)
+        Lowered expression has to give exactly the same result as operation
+
+        :param args: Python expressions of operands
+        :param options: Parameters for modification of operation process
+        :return: Python expression (None if operation can't be lowered - operation is called directly then)
+        """
+        return None
+
     @property
     def args_min_max(self) -> tuple[float, float]:
         """
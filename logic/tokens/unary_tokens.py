@@ -34,6 +34,9 @@ class UnaryMinus(UnaryLeft):
         super().operation(pack)
         return -pack[0]
 
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return f"(-{args[0]})"
+
     @staticmethod
     def identity():
         return re.compile(fr"-")
@@ -47,6 +50,13 @@ class UnaryFactorial(UnaryRight):
         super().operation(pack)
         return math.gamma(pack[0] + 1)
 
+    @property
+    def cost(self):
+        return 4
+
+    def lower(self, args: list[str], **options: Union[bool, str]):
+        return f"math.gamma({args[0]} + 1)"
+
     @staticmethod
     def identity():
         return re.compile(fr"!")
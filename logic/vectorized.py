@@ -0,0 +1,162 @@
+import math
+import time
+from functools import reduce
+from typing import Any, Callable, Mapping, Optional, Union
+from .program import Opcode, Program
+from .tokens import *
+from .errors import DeadlineException, VariableException
+
+# NumPy is an optional dependency (required only for vectorized evaluation)
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Gamma function is vectorized only if SciPy is available (otherwise it is called per element)
+try:
+    from scipy.special import gamma as _gamma
+except ImportError:
+    _gamma = None
+
+
+def _elementwise(function: Callable[..., float]) -> Callable[..., Any]:
+    """
+    Wraps scalar function to be called for every element of given arrays
+    (elements for which function fails or returns non-real result are NaN)
+
+    :param function: Scalar function
+    :return: Function accepting arrays
+    """
+    def call(*pack: float) -> float:
+        try:
+            return float(function(*pack))
+        except Exception:
+            return math.nan
+
+    return numpy.vectorize(call, otypes=[float])
+
+
+def _gamma_elementwise(x: Any) -> Any:
+    """
+    Gamma function of every element (SciPy implementation is used if available)
+
+    :param x: Array of arguments
+    :return: Array of results
+    """
+    if _gamma is not None:
+        return _gamma(x)
+
+    return _elementwise(math.gamma)(x)
+
+
+def _radians(x: Any, options: Mapping[str, Union[bool, str]]) -> Any:
+    """
+    Converts degrees into radians if rad option is set (the same way as trigonometric functions do)
+
+    :param x: Array of angles
+    :param options: Operation options
+    :return: Array of angles
+    """
+    return numpy.radians(x) if options.get('rad') or False else x
+
+
+# Vectorized operations (by exact operator type - subclasses can change operation)
+# Every function mirrors operation of the operator (functions result is added to 0 as well)
+_VECTORIZED: dict[type, Callable[[list[Any], Mapping[str, Union[bool, str]]], Any]] = {
+    BinaryPlus: lambda p, o: numpy.add(*p),
+    BinaryMinus: lambda p, o: numpy.subtract(*p),
+    BinaryMultiply: lambda p, o: numpy.multiply(*p),
+    BinaryDivide: lambda p, o: numpy.true_divide(*p),
+    BinaryModulo: lambda p, o: numpy.remainder(*p),
+    BinaryExponent: lambda p, o: numpy.power(*p),
+    UnaryMinus: lambda p, o: numpy.negative(p[0]),
+    UnaryFactorial: lambda p, o: _gamma_elementwise(numpy.add(p[0], 1)),
+    FunctionModulo: lambda p, o: 0 + reduce(numpy.remainder, p),
+    FunctionFloorDivision: lambda p, o: 0 + (reduce(numpy.floor_divide, p) if len(p) > 1 else p[0] // 1),
+    FunctionMin: lambda p, o: 0 + reduce(numpy.minimum, p),
+    FunctionMax: lambda p, o: 0 + reduce(numpy.maximum, p),
+    FunctionRoot: lambda p, o: 0 + (
+        reduce(lambda a, b: numpy.power(a, numpy.true_divide(1, b)), p) if len(p) > 1 else numpy.power(p[0], 0.5)
+    ),
+    FunctionPow: lambda p, o: 0 + (reduce(numpy.power, p) if len(p) > 1 else numpy.power(p[0], 2)),
+    FunctionLog: lambda p, o: 0 + (
+        reduce(lambda a, b: numpy.log(a) / numpy.log(b), p) if len(p) > 1 else numpy.log10(p[0])
+    ),
+    FunctionAdd: lambda p, o: 0 + reduce(numpy.add, p),
+    FunctionSubtract: lambda p, o: 0 + reduce(numpy.subtract, p),
+    FunctionMultiply: lambda p, o: 0 + reduce(numpy.multiply, p),
+    FunctionDivide: lambda p, o: 0 + reduce(numpy.true_divide, p),
+    FunctionSin: lambda p, o: 0 + numpy.sin(_radians(p[0], o)),
+    FunctionCos: lambda p, o: 0 + numpy.cos(_radians(p[0], o)),
+    FunctionTan: lambda p, o: 0 + numpy.tan(_radians(p[0], o)),
+    FunctionLn: lambda p, o: 0 + numpy.log(p[0]) / numpy.log(math.e),
+}
+
+
+def evaluate_vectorized(
+        program: Program,
+        bindings: Mapping[str, Any],
+        deadline: Optional[float] = None,
+        **options: Union[bool, str]
+) -> Any:
+    """
+    Evaluates rpn ordered program for arrays of variable values (whole arrays are processed by every instruction)
+    Operators without vectorized operation are called per element with scalar operation
+    Failed elements follow IEEE 754 instead of raising - division by zero and overflow give inf (ex 1/0 or 10^400),
+    invalid operations and non-real results give NaN (ex root of negative number)
+
+    :param program: Rpn ordered program
+    :param bindings: Values of variables (arrays or scalars broadcast against each other)
+    :param deadline: Monotonic clock time evaluation has to end before (checked before every instruction)
+    :param options: Options to pass to modify operators functionality
+    :return: Array of results (rounded for precision lost)
+    """
+    if numpy is None:
+        raise ImportError("NumPy is required for vectorized evaluation")
+
+    # Variable values are converted into float arrays
+    values: list[Any] = []
+    for name in program.variables:
+        if name not in bindings:
+            raise VariableException(f"Unbound variable {name}")
+        try:
+            values.append(numpy.asarray(bindings[name], dtype=float))
+        except (TypeError, ValueError):
+            raise VariableException(f"Invalid value of variable {name}", bindings[name])
+    shape = numpy.broadcast_shapes(*(x.shape for x in values))
+
+    constants, operators = program.constants, program.operators
+    registers: list[Any] = [None] * program.registers
+    numbers: list[Any] = []
+    # Invalid elements are reported as inf or NaN (instead of warnings)
+    with numpy.errstate(all='ignore'):
+        for opcode, operand, arity in zip(program.opcodes, program.operands, program.arities):
+            # Every instruction processes whole arrays (clock is cheap compared to it)
+            if deadline is not None and time.monotonic() > deadline:
+                raise DeadlineException("Evaluation exceeded deadline")
+
+            if opcode == Opcode.PUSH:
+                numbers.append(constants[operand])
+            elif opcode == Opcode.LOAD:
+                numbers.append(values[operand])
+            elif opcode == Opcode.FETCH:
+                numbers.append(registers[operand])
+            elif opcode == Opcode.STORE:
+                registers[operand] = numbers[-1]
+            else:
+                pack = numbers[len(numbers) - arity:]
+                del numbers[len(numbers) - arity:]
+                operator = operators[operand]
+                vectorized = _VECTORIZED.get(type(operator))
+                if vectorized is not None:
+                    numbers.append(vectorized(pack, options))
+                else:
+                    # Fallback to scalar operation called per element
+                    numbers.append(_elementwise(lambda *x: operator.operation(list(x), **options))(*pack))
+
+        result = numpy.asarray(numbers[0] if len(numbers) > 0 else 0.0)
+        if numpy.iscomplexobj(result):
+            # Non-real results are invalid (scalar evaluation can't round them either)
+            result = numpy.where(result.imag == 0, result.real, math.nan)
+        result = result.astype(float)
+        return numpy.round(numpy.broadcast_to(result, shape), 15)
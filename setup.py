@@ -1,5 +1,10 @@
+import atexit
+import os
 from logic.ruleset import Ruleset
 from logic.calculator import Calculator
+from logic.persistence import HistoryStore
+from logic.sessions import SessionHistories
+from logic.metrics import Metrics
 from validators import *
 
 # Required for Rule objects (and __subclasses__ method)
@@ -9,6 +14,7 @@ from logic.tokens import operand_tokens, unary_tokens, binary_tokens, function_t
 function = Ruleset(Function.__subclasses__())
 separator = Ruleset([binary_tokens.BinaryComma])
 constant = Ruleset([*operand_tokens.Constant.__subclasses__()])
+variable = Ruleset([operand_tokens.Variable])
 open_bracket = Ruleset([OpenBracket])
 close_bracket = Ruleset([CloseBracket])
 number = Ruleset([operand_tokens.Number])
@@ -20,13 +26,16 @@ ur_operator = Ruleset([*unary_tokens.UnaryRight.__subclasses__()])
 # Rules before/after restrictions
 function.enclose(after=[*open_bracket.identity])
 separator.enclose(
-    after=[*ul_operator.identity, *number.identity, *open_bracket.identity, *constant.identity, *function.identity]
+    after=[*ul_operator.identity, *number.identity, *open_bracket.identity, *constant.identity, *variable.identity, *function.identity]
 )
 constant.enclose(
     after=[*ur_operator.identity, *close_bracket.identity, *b_operator.identity, *separator.identity, EndAnchor]
 )
+variable.enclose(
+    after=[*ur_operator.identity, *close_bracket.identity, *b_operator.identity, *separator.identity, EndAnchor]
+)
 open_bracket.enclose(
-    after=[*number.identity, *ul_operator.identity, *open_bracket.identity, *constant.identity, *function.identity]
+    after=[*number.identity, *ul_operator.identity, *open_bracket.identity, *constant.identity, *variable.identity, *function.identity]
 )
 close_bracket.enclose(
     after=[*ur_operator.identity, *close_bracket.identity, *b_operator.identity, *separator.identity, EndAnchor]
@@ -36,25 +45,46 @@ number.enclose(
 )
 ul_operator.enclose(
     before=[*b_operator.identity, *open_bracket.identity, *separator.identity],
-    after=[*number.identity, *ul_operator.identity, *open_bracket.identity, *function.identity, *constant.identity]
+    after=[*number.identity, *ul_operator.identity, *open_bracket.identity, *function.identity, *constant.identity, *variable.identity]
 )
 ul_start_operator.enclose(
     before=[StartAnchor],
-    after=[*number.identity, *ul_operator.identity, *open_bracket.identity, *function.identity, *constant.identity]
+    after=[*number.identity, *ul_operator.identity, *open_bracket.identity, *function.identity, *constant.identity, *variable.identity]
 )
 b_operator.enclose(
-    after=[*ul_operator.identity, *number.identity, *open_bracket.identity, *constant.identity, *function.identity]
+    after=[*ul_operator.identity, *number.identity, *open_bracket.identity, *constant.identity, *variable.identity, *function.identity]
 )
 ur_operator.enclose(
     after=[*separator.identity, *ur_operator.identity, *number.identity, *b_operator.identity, *close_bracket.identity, EndAnchor]
 )
 
 # Calculator object
-calculator: Calculator = Calculator()
+# (expressions are validated during rpn conversion - validators such as verify_groups or verify_functions
+# can still be set as an additional slow path)
+# Evaluation cost and time are limited, so a single pathological expression can't stall the server
+# (oversized expressions are rejected even before tokenization)
+# History is persisted if database url is given (ex HISTORY_DATABASE_URL=sqlite:///history.db)
+history_store: HistoryStore = None
+if os.environ.get('HISTORY_DATABASE_URL'):
+    history_store = HistoryStore(os.environ['HISTORY_DATABASE_URL'])
+    # Queued entries are written before exit
+    atexit.register(history_store.close)
+
+# Evaluation pipeline is measured unless disabled (CALCULATOR_METRICS=0)
+metrics: Metrics = None if os.environ.get('CALCULATOR_METRICS') == '0' else Metrics()
+
+calculator: Calculator = Calculator(
+    budget=1_000_000, timeout=1.0, max_length=100_000, max_tokens=50_000, max_depth=1_000,
+    history_store=history_store,
+    # Clients sending session key (X-Session-Id header or session_id cookie) get their own history
+    sessions=SessionHistories(),
+    metrics=metrics
+)
 calculator.set_rules(
     function=function,
     separator=separator,
     constant=constant,
+    variable=variable,
     open_bracket=open_bracket,
     close_bracket=close_bracket,
     number=number,
@@ -65,7 +95,3 @@ calculator.set_rules(
     b_operator=b_operator,
     ur_operator=ur_operator
 )
-calculator.set_validators(
-    group=verify_groups,
-    function=verify_functions
-)
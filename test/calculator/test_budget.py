@@ -0,0 +1,76 @@
+import unittest
+from setup import *
+from logic.errors import *
+from logic import optimize_program
+
+
+class TestCalculatorBudget(unittest.TestCase):
+
+    def create(self, **kwargs) -> Calculator:
+        calculator = Calculator(**kwargs)
+        calculator.set_rules(
+            function=function,
+            separator=separator,
+            variable=variable,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            b_operator=b_operator,
+            ur_operator=ur_operator
+        )
+        return calculator
+
+    def test_budget(self):
+        calculator = self.create(budget=15, optimize=False)
+        self.assertEqual(calculator.evaluate("2^3+1"), 9)
+        self.assertRaises(BudgetException, calculator.evaluate, "9^9^9^9")
+        self.assertRaises(BudgetException, calculator.evaluate, "170!!!!!")
+        self.assertRaises(BudgetException, calculator.evaluate, "+".join(["1"] * 20))
+
+    def test_budget_optimized(self):
+        # Constant folding does not bypass budget (cost is checked before optimization)
+        calculator = self.create(budget=20)
+        self.assertRaises(BudgetException, calculator.evaluate, "+".join(["1"] * 50))
+        self.assertRaises(BudgetException, calculator.evaluate, "170!!!!!")
+        self.assertEqual(calculator.evaluate("2^3+1"), 9)
+
+    def test_optimized_cost(self):
+        # Optimized program keeps cost of the original one
+        calculator = self.create(optimize=False)
+        optimized = self.create()
+        for expression in ("+".join(["1"] * 50), "x*1+2^3", "(x+1)*(x+1)"):
+            with self.subTest(expression=expression):
+                calculator.compile(expression)
+                optimized.compile(expression)
+                self.assertEqual(optimized.cache.get(expression).cost, calculator.cache.get(expression).cost)
+
+    def test_optimization_deadline(self):
+        calculator = self.create(optimize=False)
+        calculator.compile("+".join(["1"] * 100))
+        program = calculator.cache.get("+".join(["1"] * 100))
+        self.assertRaises(DeadlineException, optimize_program, program, 0.0)
+
+    def test_budget_cached(self):
+        calculator = self.create(budget=15, optimize=False)
+        for _ in range(2):
+            self.assertRaises(BudgetException, calculator.evaluate, "pow(10,10,10,10,10,10)")
+
+    def test_budget_formula(self):
+        formula = self.create(budget=10).compile("x^y^x")
+        self.assertRaises(BudgetException, formula, {'x': 2, 'y': 3})
+
+    def test_deadline(self):
+        calculator = self.create(timeout=1e-9)
+        self.assertRaises(DeadlineException, calculator.evaluate, "+".join(["1"] * 5000))
+
+    def test_deadline_compiled(self):
+        calculator = self.create(timeout=1e-9, mode='compile')
+        self.assertRaises(DeadlineException, calculator.evaluate, "+".join(["1"] * 100))
+
+    def test_deadline_not_exceeded(self):
+        calculator = self.create(timeout=10)
+        self.assertEqual(calculator.evaluate("+".join(["1"] * 5000)), 5000)
+
+    def test_invalid_limits(self):
+        self.assertRaises(ValueError, Calculator, budget=-1)
+        self.assertRaises(ValueError, Calculator, timeout=0)
@@ -60,3 +60,43 @@ class TestCalculatorCompoundExpressions(unittest.TestCase):
 
     def test_expression_10(self):
         self.assertRaises(CalculationException, self.calculator.evaluate, "3/0")
+
+
+class TestCalculatorCompoundExpressionsTable(TestCalculatorCompoundExpressions):
+
+    def setUp(self) -> None:
+        self.calculator = Calculator(engine='table')
+        self.calculator.set_rules(
+            function=function,
+            separator=separator,
+            constant=constant,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            ul_operator=ul_operator,
+            ul_start_operator=ul_start_operator,
+            b_operator=b_operator,
+            ur_operator=ur_operator
+        )
+        self.calculator.set_validators(
+            group=verify_groups,
+            function=verify_functions
+        )
+
+
+class TestCalculatorCompoundExpressionsCompiled(TestCalculatorCompoundExpressions):
+
+    def setUp(self) -> None:
+        self.calculator = Calculator(mode='compile')
+        self.calculator.set_rules(
+            function=function,
+            separator=separator,
+            constant=constant,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            ul_operator=ul_operator,
+            ul_start_operator=ul_start_operator,
+            b_operator=b_operator,
+            ur_operator=ur_operator
+        )
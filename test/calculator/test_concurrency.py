@@ -0,0 +1,81 @@
+import threading
+import unittest
+from setup import *
+from logic import Tokenizer
+
+
+class TestCalculatorConcurrency(unittest.TestCase):
+    THREADS = 16
+    ITERATIONS = 200
+
+    def setUp(self) -> None:
+        self.calculator = Calculator(cache_size=0)
+        self.calculator.set_rules(
+            function=function,
+            separator=separator,
+            constant=constant,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            ul_operator=ul_operator,
+            ul_start_operator=ul_start_operator,
+            b_operator=b_operator,
+            ur_operator=ur_operator
+        )
+        self.calculator.set_validators(
+            group=verify_groups,
+            function=verify_functions
+        )
+
+    def hammer(self, worker) -> list[Exception]:
+        errors: list[Exception] = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def run(index: int):
+            barrier.wait()
+            try:
+                for i in range(self.ITERATIONS):
+                    worker(index, i)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return errors
+
+    def test_shared_evaluate(self):
+        def worker(index: int, i: int):
+            # Every thread uses different expressions (valid and invalid ones are interleaved)
+            if i % 3 == 0:
+                self.assertRaises(SeparatorException, self.calculator.evaluate, f"sin({index},{i})")
+            else:
+                self.assertEqual(self.calculator.evaluate(f"add({index},{i})*2", True), (index + i) * 2)
+
+        self.assertEqual(self.hammer(worker), [])
+        saved = self.THREADS * sum(1 for i in range(self.ITERATIONS) if i % 3 != 0)
+        self.assertEqual(len(self.calculator.history), saved)
+
+    def test_shared_cache(self):
+        self.calculator.cache.capacity = 8
+
+        def worker(index: int, i: int):
+            self.assertEqual(self.calculator.evaluate(f"{i % 16}+{index}"), i % 16 + index)
+
+        self.assertEqual(self.hammer(worker), [])
+        self.assertLessEqual(len(self.calculator.cache), 8)
+
+    def test_tokens_per_thread(self):
+        tokenizer = Tokenizer()
+        tokenizer.set_rules(number=number, b_operator=b_operator)
+
+        def worker(index: int, i: int):
+            expression = "+".join(["1"] * (index + 1))
+            tokens = tokenizer.parse(expression)
+            self.assertEqual(len(tokens), 2 * index + 1)
+            self.assertIs(tokenizer.tokens, tokens)
+
+        self.assertEqual(self.hammer(worker), [])
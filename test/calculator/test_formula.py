@@ -0,0 +1,64 @@
+import math
+import unittest
+from setup import *
+
+
+class TestCalculatorFormula(unittest.TestCase):
+    MODE = 'interpret'
+
+    def setUp(self) -> None:
+        self.calculator = Calculator(mode=self.MODE)
+        self.calculator.set_rules(
+            function=function,
+            separator=separator,
+            constant=constant,
+            variable=variable,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            ul_operator=ul_operator,
+            ul_start_operator=ul_start_operator,
+            b_operator=b_operator,
+            ur_operator=ur_operator
+        )
+
+    def test_variables(self):
+        formula = self.calculator.compile("2*x + add(x, y_1) - pix^2")
+        self.assertEqual(formula.variables, ['x', 'y_1', 'pix'])
+        self.assertEqual(formula({'x': 3, 'y_1': 4, 'pix': 2}), 9)
+        self.assertEqual(formula.evaluate({'x': 0, 'y_1': 0, 'pix': 0}), 0)
+
+    def test_constants_are_not_variables(self):
+        formula = self.calculator.compile("pi*e+ex")
+        self.assertEqual(formula.variables, ['ex'])
+        self.assertEqual(formula({'ex': 1}), round(math.pi * math.e + 1, 15))
+
+    def test_sweep(self):
+        formula = self.calculator.compile("sin(x)^2 + cos(x)^2")
+        for x in range(1000):
+            self.assertAlmostEqual(formula({'x': x}), 1)
+        self.assertAlmostEqual(formula({'x': 90}, rad=True), 1)
+        self.assertEqual(self.calculator.compile("x*2")({'x': 2.5}), 5)
+
+    def test_compiled_once(self):
+        formula = self.calculator.compile("x+1")
+        self.assertIs(self.calculator.compile(" x + 1 ").program, formula.program)
+
+    def test_unbound_variable(self):
+        self.assertRaises(VariableException, self.calculator.evaluate, "x+1")
+        self.assertRaises(VariableException, self.calculator.compile("x+y"), {'x': 1})
+        self.assertRaises(VariableException, self.calculator.compile("x+1"), {'x': 'one'})
+        self.assertRaises(VariableException, lambda: Variable.trusted('x', 0, 1).cast)
+
+    def test_calculation_error(self):
+        formula = self.calculator.compile("1/x")
+        self.assertEqual(formula({'x': 4}), 0.25)
+        self.assertRaises(CalculationException, formula, {'x': 0})
+
+    def test_invalid_expression(self):
+        self.assertRaises(UnrecognizedTokenException, self.calculator.compile, "2x")
+        self.assertRaises(TypeError, self.calculator.compile, 2)
+
+
+class TestCalculatorFormulaCompiled(TestCalculatorFormula):
+    MODE = 'compile'
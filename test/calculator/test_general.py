@@ -65,3 +65,33 @@ class TestCalculatorGeneral(unittest.TestCase):
             constant=constant,
         )
         self.assertEqual(self.calculator.evaluate("e"), math.e)
+
+    def test_evaluate_batch(self):
+        self.calculator.set_rules(
+            function=function,
+            separator=separator,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            b_operator=b_operator,
+        )
+        results = self.calculator.evaluate_batch(
+            [("2+2", dict()), ("1/0", dict()), (5, dict()), ("sin(90)", {'rad': True}), ("3*3", [])], True
+        )
+        self.assertEqual(results[0], 4)
+        self.assertIsInstance(results[1], CalculationException)
+        self.assertIsInstance(results[2], TypeError)
+        self.assertEqual(results[3], 1)
+        self.assertIsInstance(results[4], TypeError)
+        self.assertEqual(
+            self.calculator.history,
+            [{'expression': 'sin(90)', 'result': '1'}, {'expression': '2+2', 'result': '4'}]
+        )
+
+    def test_evaluate_batch_without_history(self):
+        self.calculator.set_rules(
+            number=number,
+            b_operator=b_operator,
+        )
+        self.assertEqual(self.calculator.evaluate_batch([("2*3", dict()), ("4-1", dict())]), [6, 3])
+        self.assertEqual(self.calculator.history, [])
@@ -0,0 +1,59 @@
+import unittest
+from setup import *
+from logic.errors import *
+
+
+class TestCalculatorLimits(unittest.TestCase):
+
+    def create(self, **kwargs) -> Calculator:
+        calculator = Calculator(**kwargs)
+        calculator.set_rules(
+            function=function,
+            separator=separator,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            b_operator=b_operator
+        )
+        return calculator
+
+    def test_max_length(self):
+        calculator = self.create(max_length=10)
+        self.assertEqual(calculator.evaluate("1 + 2 + 3"), 6)
+        self.assertRaises(ExpressionSizeException, calculator.evaluate, "1 + 2 + 3 + 4")
+        self.assertEqual(len(calculator.cache), 1)
+
+    def test_max_tokens(self):
+        calculator = self.create(max_tokens=7)
+        self.assertEqual(calculator.evaluate("12.5 + 300 * 2"), 612.5)
+        self.assertEqual(calculator.evaluate("add(1,2)"), 3)
+        self.assertRaises(ExpressionSizeException, calculator.evaluate, "1+2+3+4+5")
+        self.assertRaises(ExpressionSizeException, calculator.evaluate, "add(1,2,3,4)")
+
+    def test_max_depth(self):
+        calculator = self.create(max_depth=2)
+        self.assertEqual(calculator.evaluate("((1+2)*3)+(4)"), 13)
+        self.assertEqual(calculator.evaluate("add((1),(2))"), 3)
+        self.assertRaises(ExpressionDepthException, calculator.evaluate, "(((1)))")
+        self.assertRaises(ExpressionDepthException, calculator.evaluate, "add(1,(2*(3)))")
+
+    def test_max_depth_of_every_bracket(self):
+        calculator = self.create(max_depth=3)
+        self.assertEqual(calculator.evaluate("[{(1)}]"), 1)
+        self.assertEqual(calculator.evaluate("[[1]]+{{2}}"), 3)
+        for expression in ("[[[[1]]]]", "{{{{1}}}}", "({[(1)]})", "add([{(1)}],[1])+[{add((1))}]"):
+            with self.subTest(expression=expression):
+                self.assertRaises(ExpressionDepthException, calculator.evaluate, expression)
+
+    def test_limits_before_tokenization(self):
+        calculator = self.create(max_depth=2)
+        self.assertRaises(ExpressionDepthException, calculator.evaluate, "((($)))")
+        self.assertRaises(UnrecognizedTokenException, calculator.evaluate, "(($))")
+
+    def test_formula(self):
+        calculator = self.create(max_tokens=3)
+        self.assertRaises(ExpressionSizeException, calculator.compile, "1+2+3")
+
+    def test_invalid_limits(self):
+        self.assertRaises(ValueError, Calculator, max_length=-1)
+        self.assertEqual(Calculator(max_depth=4).limits, (None, None, 4))
@@ -0,0 +1,68 @@
+import unittest
+from setup import *
+from logic import ProcessEvaluator, chunk_size
+
+
+class TestCalculatorParallel(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.calculator = Calculator()
+        self.calculator.set_rules(
+            function=function,
+            separator=separator,
+            constant=constant,
+            variable=variable,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            ul_operator=ul_operator,
+            ul_start_operator=ul_start_operator,
+            b_operator=b_operator,
+            ur_operator=ur_operator
+        )
+
+    def tearDown(self) -> None:
+        self.calculator.close()
+
+    def test_results_in_order(self):
+        items = [(f"{i}*2+sin({i})", {'rad': i % 2 == 0}) for i in range(500)] + [("1/0", dict()), ("2x", dict())]
+        results = self.calculator.evaluate_parallel(items, workers=2)
+        expected = self.calculator.evaluate_batch(items)
+        self.assertEqual(results[:-2], expected[:-2])
+        self.assertIsInstance(results[-2], CalculationException)
+        self.assertIsInstance(results[-1], UnrecognizedTokenException)
+
+    def test_history(self):
+        self.calculator.evaluate_parallel([("2+2", dict()), ("1/0", dict()), ("3!", dict())], True, workers=2)
+        self.assertEqual(
+            self.calculator.history,
+            [{'expression': '3!', 'result': '6'}, {'expression': '2+2', 'result': '4'}]
+        )
+
+    def test_chunk_size(self):
+        self.assertEqual(chunk_size(10, 4), 16)
+        self.assertEqual(chunk_size(100_000, 4), 4096)
+        self.assertEqual(chunk_size(20_000, 4), 1250)
+
+    def test_invalid_workers(self):
+        self.assertRaises(ValueError, ProcessEvaluator, 0)
+
+    def test_configuration_of_calculator(self):
+        # Workers use rules and options of the calculator evaluate_parallel is called on
+        calculator = Calculator(optimize=False, budget=10)
+        calculator.set_rules(number=number, b_operator=b_operator)
+        try:
+            items = [("sin(1)", dict()), ("1+2", dict()), ("+".join(["1"] * 20), dict())]
+            results = calculator.evaluate_parallel(items, workers=1)
+            expected = calculator.evaluate_batch(items)
+            self.assertIsInstance(results[0], UnrecognizedTokenException)
+            self.assertEqual(results[1], expected[1])
+            self.assertIsInstance(results[2], BudgetException)
+
+            # Changed rules replace worker processes
+            calculator.set_rules(
+                function=function, open_bracket=open_bracket, close_bracket=close_bracket, number=number
+            )
+            self.assertAlmostEqual(calculator.evaluate_parallel([("sin(1)", dict())], workers=1)[0], math.sin(1))
+        finally:
+            calculator.close()
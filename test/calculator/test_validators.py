@@ -82,3 +82,53 @@ class TestCalculatorValidators(unittest.TestCase):
 
         self.assertRaises(SeparatorException, self.calculator.evaluate, "sin(7,6)")
         self.assertRaises(UnrecognizedTokenException, self.calculator.evaluate, "sin")
+
+    def test_deep_nesting(self):
+        self.calculator.set_rules(
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            function=function,
+            separator=separator,
+            number=number
+        )
+
+        depth = 5000
+        self.assertEqual(self.calculator.evaluate("add(" * depth + "1" + ",1)" * depth), depth + 1)
+
+
+class TestCalculatorFusedValidation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.calculator = Calculator()
+        self.calculator.set_rules(
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            function=function,
+            separator=separator,
+            number=number,
+            b_operator=b_operator
+        )
+
+    def test_invalid_expression(self):
+        self.assertRaises(UnrecognizedTokenException, self.calculator.evaluate, "add(2,)")
+        self.assertRaises(UnrecognizedTokenException, self.calculator.evaluate, "sub()")
+        self.assertRaises(UnrecognizedTokenException, self.calculator.evaluate, "e")
+
+    def test_separators_outside_function(self):
+        self.assertRaises(SeparatorException, self.calculator.evaluate, "6,7+log(100,2)")
+        self.assertRaises(SeparatorException, self.calculator.evaluate, "6+(100,2)")
+        self.assertRaises(SeparatorException, self.calculator.evaluate, "(100,2)")
+
+    def test_function_arg_limit_exceeded(self):
+        self.assertRaises(SeparatorException, self.calculator.evaluate, "sin(7,6)")
+        self.assertRaises(SeparatorException, self.calculator.evaluate, "ln(7,6)")
+        self.assertEqual(self.calculator.evaluate("log(100,10)"), 2)
+
+    def test_unbalanced_brackets(self):
+        self.assertRaises(BracketException, self.calculator.evaluate, "2+3)")
+        self.assertRaises(BracketException, self.calculator.evaluate, "(2)+3)")
+
+    def test_deep_nesting(self):
+        depth = 5000
+        self.assertEqual(self.calculator.evaluate("(" * depth + "1" + ")" * depth), 1)
+        self.assertEqual(self.calculator.evaluate("add(" * depth + "1" + ",1)" * depth), depth + 1)
@@ -0,0 +1,89 @@
+import math
+import unittest
+from setup import *
+from logic import vectorized
+from logic.errors import BudgetException, DeadlineException
+
+
+@unittest.skipIf(vectorized.numpy is None, "NumPy is not installed")
+class TestCalculatorVectorized(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.numpy = vectorized.numpy
+        self.calculator = self.create()
+
+    def create(self, **kwargs) -> Calculator:
+        calculator = Calculator(**kwargs)
+        calculator.set_rules(
+            function=function,
+            separator=separator,
+            constant=constant,
+            variable=variable,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            ul_operator=ul_operator,
+            ul_start_operator=ul_start_operator,
+            b_operator=b_operator,
+            ur_operator=ur_operator
+        )
+        return calculator
+
+    def assertMatchesScalar(self, expression: str, **options):
+        formula = self.calculator.compile(expression)
+        x = self.numpy.linspace(0.5, 9.5, 50)
+        y = self.numpy.linspace(0.25, 4, 50)
+        result = formula.evaluate_vectorized({'x': x, 'y': y}, **options)
+        expected = [formula({'x': a, 'y': b}, **options) for a, b in zip(x, y)]
+        self.assertEqual(result.shape, (50,))
+        for actual, scalar in zip(result, expected):
+            self.assertLessEqual(abs(actual - scalar), 1e-12 * max(1, abs(scalar)))
+
+    def test_operators(self):
+        self.assertMatchesScalar("x+y*2-x/y%3-x^y+-y")
+        self.assertMatchesScalar("x!+y!")
+
+    def test_functions(self):
+        self.assertMatchesScalar("log(x)+log(x,y)+ln(x)+root(x)+root(x,y)+pow(x)+pow(x,y)")
+        self.assertMatchesScalar("fdiv(x,y)+fdiv(x)+mod(x,y,3)+min(x,y,1)+max(x,y)")
+        self.assertMatchesScalar("add(x,y,1)+sub(x,y)+mul(x,y,2)+div(x,y,2)")
+
+    def test_rad_option(self):
+        self.assertMatchesScalar("sin(x)+cos(y)*tan(x)")
+        self.assertMatchesScalar("sin(x)+cos(y)*tan(x)", rad=True)
+
+    def test_broadcasting(self):
+        formula = self.calculator.compile("x*y+1")
+        result = formula.evaluate_vectorized({'x': [[1], [2]], 'y': [1, 2, 3]})
+        self.assertEqual(result.tolist(), [[2, 3, 4], [3, 5, 7]])
+        self.assertEqual(self.calculator.compile("2+2").evaluate_vectorized().tolist(), 4)
+
+    def test_invalid_elements(self):
+        result = self.calculator.compile("1/x").evaluate_vectorized({'x': [0, 4]})
+        self.assertTrue(math.isinf(result[0]))
+        self.assertEqual(result[1], 0.25)
+        result = self.calculator.compile("root(x-2)").evaluate_vectorized({'x': [1, 6]})
+        self.assertTrue(math.isnan(result[0]))
+        self.assertEqual(result[1], 2)
+
+    def test_scalar_fallback(self):
+        class FunctionHalf(FunctionAdd):
+            def operation(self, pack, **options):
+                return super().operation(pack) / 2
+
+        formula = self.calculator.compile("add(x,1)")
+        formula.program.operators[0] = FunctionHalf.flyweight()
+        self.assertEqual(formula.evaluate_vectorized({'x': [1, 3]}).tolist(), [1, 2])
+
+    def test_unbound_variable(self):
+        formula = self.calculator.compile("x+y")
+        self.assertRaises(VariableException, formula.evaluate_vectorized, {'x': [1]})
+        self.assertRaises(VariableException, formula.evaluate_vectorized, {'x': [1], 'y': ['a']})
+
+    def test_limits(self):
+        # Vectorized evaluation is limited the same way as scalar one
+        x = self.numpy.arange(1000)
+        formula = self.create(budget=10).compile("x^x^x^x")
+        self.assertRaises(BudgetException, formula.evaluate_vectorized, {'x': x})
+        formula = self.create(timeout=1e-9).compile("x+1")
+        self.assertRaises(DeadlineException, formula.evaluate_vectorized, {'x': x})
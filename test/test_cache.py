@@ -0,0 +1,52 @@
+import unittest
+from setup import *
+from logic import ProgramCache
+
+
+class TestProgramCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.cache = ProgramCache(2)
+
+    def test_hit_miss(self):
+        self.assertEqual(self.cache.get("1+1"), None)
+        self.cache.put("1+1", [1])
+        self.assertEqual(self.cache.get("1+1"), [1])
+        self.assertEqual(self.cache.stats["hits"], 1)
+        self.assertEqual(self.cache.stats["misses"], 1)
+
+    def test_eviction(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        # Refresh "a" so that "b" becomes the least recently used entry
+        self.cache.get("a")
+        self.cache.put("c", 3)
+        self.assertEqual(self.cache.get("b"), None)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.get("c"), 3)
+        self.assertEqual(self.cache.stats["evictions"], 1)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_capacity(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.capacity = 1
+        self.assertEqual(self.cache.stats["size"], 1)
+        self.assertEqual(self.cache.stats["evictions"], 1)
+        self.cache.capacity = 0
+        self.cache.put("c", 3)
+        self.assertEqual(len(self.cache), 0)
+        self.assertRaises(ValueError, ProgramCache, -1)
+
+    def test_calculator_cache(self):
+        calculator = Calculator(cache_size=8)
+        calculator.set_rules(number=number, b_operator=b_operator)
+        self.assertEqual(calculator.evaluate("2 + 3"), 5)
+        self.assertEqual(calculator.evaluate("2+3"), 5)
+        self.assertEqual(calculator.cache.stats["hits"], 1)
+        self.assertEqual(calculator.cache.stats["misses"], 1)
+
+        # Changing grammar invalidates compiled expressions
+        calculator.set_rules(number=number)
+        self.assertEqual(len(calculator.cache), 0)
+        self.assertRaises(UnrecognizedTokenException, calculator.evaluate, "2+3")
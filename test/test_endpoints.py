@@ -0,0 +1,152 @@
+import json
+import os
+import unittest
+import uuid
+from unittest import mock
+from flask import Flask
+from setup import *
+import blueprints.basic_endpoints
+from blueprints.basic_endpoints import blueprint, SESSION_HEADER
+
+
+class TestEndpoints(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = Flask(__name__)
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client()
+        # Every test saves results in its own session (shared history is not modified)
+        self.headers = {SESSION_HEADER: uuid.uuid4().hex}
+
+    def history(self) -> list[dict]:
+        return self.client.get('/history', headers=self.headers).get_json()
+
+    def test_evaluate(self):
+        response = self.client.post('/evaluate', headers=self.headers, json={'expression': "2+2"})
+        self.assertEqual(response.get_data(as_text=True), "4")
+        self.assertEqual([x['expression'] for x in self.history()], ["2+2"])
+
+    def test_evaluate_error_logged(self):
+        with self.assertLogs(self.app.logger, 'ERROR'):
+            response = self.client.post('/evaluate', headers=self.headers, json={'options': {}})
+        self.assertEqual(response.status_code, 500)
+
+    def test_batch(self):
+        response = self.client.post('/evaluate/batch', headers=self.headers, json={'items': [
+            "2+2", {'expression': "1/0"}, {'expression': "sin(0)", 'options': {'rad': True}}, 5
+        ]})
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()
+        self.assertEqual(results[0], {'result': "4"})
+        self.assertIn('error', results[1])
+        self.assertEqual(results[2], {'result': "0"})
+        self.assertIn('error', results[3])
+        # Successful results are saved in order of expressions
+        self.assertEqual([x['expression'] for x in self.history()], ["sin(0)", "2+2"])
+
+    def test_batch_without_saving(self):
+        response = self.client.post('/evaluate/batch', headers=self.headers, json={'items': ["2+2"], 'save': False})
+        self.assertEqual(response.get_json(), [{'result': "4"}])
+        self.assertEqual(self.history(), [])
+
+    def test_invalid_batch(self):
+        for body in ({'items': "abc"}, {'items': {'expression': "1"}}, {}, ["2+2"]):
+            with self.subTest(body=body):
+                self.assertEqual(self.client.post('/evaluate/batch', json=body).status_code, 400)
+        self.assertEqual(self.client.post('/evaluate/batch', data="items").status_code, 400)
+
+    def stream(self, body: str, query: str = '') -> list[dict]:
+        response = self.client.post('/evaluate/stream' + query, headers=self.headers, data=body)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        return [json.loads(x) for x in response.get_data(as_text=True).splitlines()]
+
+    def test_stream(self):
+        body = "\n".join(json.dumps({'expression': f"{i}*2"}) for i in range(100)) + "\n"
+        self.assertEqual(self.stream(body), [{'result': str(i * 2)} for i in range(100)])
+        self.assertEqual(len(self.history()), 50)
+
+    def test_stream_errors(self):
+        results = self.stream('{"expression": "1/0"}\nnot json\n{"options": {}}\n{"expression": "2+2"}')
+        self.assertEqual([list(x) for x in results], [['error'], ['error'], ['error'], ['result']])
+        self.assertEqual(results[3], {'result': "4"})
+
+    def test_stream_blank_lines(self):
+        results = self.stream('\n  \n{"expression": "1+1"}\n\n\r\n{"expression": "2+2"}\n\n')
+        self.assertEqual(results, [{'result': "2"}, {'result': "4"}])
+
+    def test_stream_without_saving(self):
+        self.assertEqual(self.stream('{"expression": "1+1"}\n', '?save=false'), [{'result': "2"}])
+        self.assertEqual(self.history(), [])
+
+    def test_stream_long_line(self):
+        with mock.patch.object(blueprints.basic_endpoints, 'STREAM_LINE_MAX', 64):
+            body = '{"expression": "1+1"}\n' + json.dumps({'expression': "+".join(["1"] * 100)}) + \
+                   '\n{"expression": "2+2"}\n' + "1" * 1000
+            results = self.stream(body)
+        self.assertEqual(results[0], {'result': "2"})
+        self.assertIn("too long", results[1]['error'])
+        self.assertEqual(results[2], {'result': "4"})
+        self.assertIn("too long", results[3]['error'])
+        self.assertEqual(len(results), 4)
+
+    def test_history_pages(self):
+        self.client.post('/evaluate/batch', headers=self.headers, json={'items': [f"{i}+0" for i in range(10)]})
+        page = self.client.get('/history?limit=4', headers=self.headers).get_json()
+        self.assertEqual([x['expression'] for x in page], ["9+0", "8+0", "7+0", "6+0"])
+        page = self.client.get(f"/history?limit=4&before={page[-1]['id']}", headers=self.headers).get_json()
+        self.assertEqual([x['expression'] for x in page], ["5+0", "4+0", "3+0", "2+0"])
+        page = self.client.get(f"/history?before={page[-1]['id']}", headers=self.headers).get_json()
+        self.assertEqual([x['expression'] for x in page], ["1+0", "0+0"])
+
+    def test_invalid_history_pages(self):
+        for query in ("limit=abc", "before=abc", "limit=-1", "limit=1.5", "before="):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"/history?{query}", headers=self.headers).status_code, 400)
+
+    def test_history_etag(self):
+        self.client.post('/evaluate/batch', headers=self.headers, json={'items': ["1+1"]})
+        response = self.client.get('/history', headers=self.headers)
+        etag = response.headers['ETag']
+        self.assertIn(SESSION_HEADER, response.headers['Vary'])
+        self.assertIn('Cookie', response.headers['Vary'])
+
+        # Unchanged history is not sent again
+        response = self.client.get('/history', headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+
+        # Changed history has new version
+        self.client.post('/evaluate/batch', headers=self.headers, json={'items': ["2+2"]})
+        response = self.client.get('/history', headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(len(response.get_json()), 2)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "Fork is not available")
+    def test_fork(self):
+        # Workers forked from the same process have their own ETags and ids of history entries
+        pages = []
+        for expression in ("1+1", "2+2"):
+            read, write = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    os.close(read)
+                    self.client.post('/evaluate', json={'expression': expression})
+                    response = self.client.get('/history?limit=1')
+                    os.write(write, json.dumps([response.headers['ETag'], response.get_json()]).encode())
+                    os._exit(0)
+                except BaseException:
+                    os._exit(1)
+
+            os.close(write)
+            with os.fdopen(read) as file:
+                pages.append(json.loads(file.read()))
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+        (first_etag, [first]), (second_etag, [second]) = pages
+        self.assertEqual((first['expression'], second['expression']), ("1+1", "2+2"))
+        self.assertNotEqual(first_etag, second_etag)
+        self.assertNotEqual(first['id'], second['id'])
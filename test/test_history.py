@@ -0,0 +1,92 @@
+import os
+import unittest
+from setup import *
+from logic import History
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.history = History(3)
+
+    def test_order(self):
+        self.history.extend([("1+1", "2"), ("2+2", "4")])
+        self.assertEqual(
+            self.history.snapshot(),
+            [{'expression': '2+2', 'result': '4'}, {'expression': '1+1', 'result': '2'}]
+        )
+
+    def test_eviction(self):
+        self.history.extend((f"{i}", f"{i}") for i in range(5))
+        self.assertEqual([x['expression'] for x in self.history.snapshot()], ["4", "3", "2"])
+        self.assertEqual(self.history.stats, {'evictions': 2, 'size': 3, 'capacity': 3})
+        self.assertEqual(len(self.history), 3)
+
+    def test_interned(self):
+        expression = "".join(["2", "+", "2"])
+        self.history.extend([(expression, "4"), ("2+2", "4")])
+        first, second = self.history.snapshot()
+        self.assertIs(first['expression'], second['expression'])
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "Fork is not available")
+    def test_fork(self):
+        self.history.extend([("1+1", "2")])
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # Ids of child process continue from its own origin (still increasing)
+            self.history.extend([("2+2", "4")])
+            os.write(write, str(self.history.page(1)[0]['id']).encode())
+            os._exit(0)
+
+        os.close(write)
+        with os.fdopen(read) as file:
+            child = int(file.read())
+        os.waitpid(pid, 0)
+        self.history.extend([("3+3", "6")])
+        self.assertEqual([x['id'] for x in self.history.page(2)], [1, 0])
+        self.assertGreaterEqual(child, pid << 30)
+
+    def test_clear(self):
+        self.history.extend([("1+1", "2")])
+        self.history.clear()
+        self.assertEqual(self.history.snapshot(), [])
+        self.history.extend([("2+2", "4")])
+        self.assertEqual(len(self.history), 1)
+
+    def test_disabled(self):
+        history = History(0)
+        history.extend([("1+1", "2")])
+        self.assertEqual(history.snapshot(), [])
+        self.assertRaises(ValueError, History, -1)
+
+    def test_calculator(self):
+        calculator = Calculator(history_size=2)
+        calculator.set_rules(number=number, b_operator=b_operator)
+        for expression in ["1+1", "2+2", "3+3"]:
+            calculator.evaluate(expression, True)
+        self.assertEqual(
+            calculator.history,
+            [{'expression': '3+3', 'result': '6'}, {'expression': '2+2', 'result': '4'}]
+        )
+        self.assertEqual(calculator.history_buffer.stats['evictions'], 1)
+
+    def test_page(self):
+        history = History(4)
+        history.extend((f"{i}", f"{i}") for i in range(6))
+        self.assertEqual([x['id'] for x in history.page(2)], [5, 4])
+        self.assertEqual([x['id'] for x in history.page(2, 4)], [3, 2])
+        self.assertEqual([x['id'] for x in history.page(5, 3)], [2])
+        self.assertEqual(history.page(2, 2), [])
+        self.assertEqual(history.page(1, 100), [{'id': 5, 'expression': '5', 'result': '5'}])
+        self.assertRaises(ValueError, history.page, -1)
+
+    def test_version(self):
+        version = self.history.version
+        self.history.extend([("1+1", "2")])
+        self.assertNotEqual(self.history.version, version)
+        version = self.history.version
+        self.history.clear()
+        self.assertNotEqual(self.history.version, version)
+        self.history.extend([("2+2", "4")])
+        self.assertEqual(self.history.page(1)[0]['id'], 1)
@@ -0,0 +1,48 @@
+import unittest
+from setup import *
+from logic import Histogram, Metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.metrics = Metrics()
+        self.calculator = Calculator(metrics=self.metrics)
+        self.calculator.set_rules(number=number, b_operator=b_operator)
+
+    def test_histogram(self):
+        histogram = Histogram((1.0, 2.0))
+        for value in (0.5, 1.0, 1.5, 3.0):
+            histogram.observe(value)
+        buckets, total, count = histogram.snapshot()
+        self.assertEqual([x[1] for x in buckets], [2, 3, 4])
+        self.assertEqual(total, 6.0)
+        self.assertEqual(count, 4)
+
+    def test_stages(self):
+        self.calculator.evaluate("2+2")
+        self.calculator.evaluate("2 + 2")
+        for stage in ('tokenize', 'validate', 'rpn', 'optimize'):
+            self.assertEqual(self.metrics.stage(stage)[2], 1)
+        self.assertEqual(self.metrics.stage('evaluate')[2], 2)
+
+    def test_counters(self):
+        self.calculator.evaluate("2+2")
+        self.assertRaises(CalculationException, self.calculator.evaluate, "1/0")
+        self.assertEqual(self.metrics.counter('evaluations'), 1)
+        self.assertEqual(self.metrics.counter('errors', type='CalculationException'), 1)
+
+    def test_render(self):
+        self.calculator.evaluate("2+2")
+        self.metrics.increment('requests', endpoint='evaluate', status='200')
+        text = self.metrics.render(self.calculator.cache.stats)
+        self.assertIn('calculator_stage_seconds_bucket{stage="rpn",le="+Inf"} 1\n', text)
+        self.assertIn('calculator_stage_seconds_count{stage="evaluate"} 1\n', text)
+        self.assertIn('calculator_requests_total{endpoint="evaluate",status="200"} 1\n', text)
+        self.assertIn('calculator_evaluations_total 1\n', text)
+        self.assertIn('calculator_cache_misses_total 1\n', text)
+        self.assertIn('# TYPE calculator_cache_size gauge\n', text)
+
+    def test_disabled(self):
+        calculator = Calculator()
+        self.assertEqual(calculator.metrics, None)
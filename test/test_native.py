@@ -0,0 +1,88 @@
+import unittest
+from setup import *
+from logic import Program, Opcode, TokenStream, lower_program
+
+
+class TestNative(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.interpreter = Calculator()
+        self.calculator = Calculator(mode='compile')
+        for calculator in (self.interpreter, self.calculator):
+            calculator.set_rules(
+                function=function,
+                separator=separator,
+                constant=constant,
+                open_bracket=open_bracket,
+                close_bracket=close_bracket,
+                number=number,
+                ul_operator=ul_operator,
+                ul_start_operator=ul_start_operator,
+                b_operator=b_operator,
+                ur_operator=ur_operator
+            )
+
+    def test_invalid_mode(self):
+        self.assertRaises(ValueError, Calculator, mode='jit')
+
+    def test_lower_program(self):
+        tokens = TokenStream("2+3", (Number, BinaryPlus))
+        program = Program(tokens)
+        program.push(2.0, 0)
+        program.push(3.0, 2)
+        program.apply(Opcode.BINARY, BinaryPlus.flyweight(), 1)
+        self.assertEqual(lower_program(program)(), 5)
+        self.assertEqual(lower_program(Program(tokens))(), 0)
+
+        # Stack underflow is not lowered
+        program.apply(Opcode.BINARY, BinaryPlus.flyweight(), 1)
+        self.assertIsNone(lower_program(program))
+
+    def test_results_match_interpreter(self):
+        expressions = [
+            "FDiv(pow(Log(100)*Ln(e),min(MAX(3,e,pi),3.1),3)", "add(2,5,7)*sin(30)^mUL(2,2,2)", "3---2",
+            "-(2+3)!", "root(27,3)+root(16)", "sub(1)-sub(8,2,1)", "mod(17,5,3)%2", "fdiv(7)+fdiv(17,2,2)",
+            "pow(2)^0.5", "log(1000)+log(8,2)", "div(1,3)*3", "-0*1", "tan(45)+cos(60)"
+        ]
+        for expression in expressions:
+            for options in ({}, {'rad': True}):
+                with self.subTest(expression=expression, options=options):
+                    self.assertEqual(
+                        repr(self.calculator.evaluate(expression, **options)),
+                        repr(self.interpreter.evaluate(expression, **options))
+                    )
+
+    def test_specialized_for_options(self):
+        self.calculator.evaluate("sin(30)")
+        self.calculator.evaluate("sin(30)", rad=True)
+        self.assertEqual(len(self.calculator.cache.get("sin(30)").natives), 2)
+        self.assertAlmostEqual(self.calculator.evaluate("sin(30)", rad=True), 0.5)
+
+    def test_errors_match_interpreter(self):
+        for expression in ("1/0", "mod(1,0)", "ln(0)", "(0-1)!"):
+            with self.subTest(expression=expression):
+                with self.assertRaises(CalculationException) as expected:
+                    self.interpreter.evaluate(expression)
+                with self.assertRaises(CalculationException) as actual:
+                    self.calculator.evaluate(expression)
+                self.assertEqual(str(actual.exception), str(expected.exception))
+
+    def test_not_lowered_program(self):
+        # Nesting too deep for python compiler is left to interpreter
+        expression = f"pow(sin(0),{','.join(['1'] * 5000)})"
+        self.assertEqual(self.calculator.evaluate(expression), 0)
+        self.assertEqual(list(self.calculator.cache.get(expression).natives.values()), [None])
+
+    def test_ignored_options(self):
+        # Options not read by any operator of the program do not create new lowered functions
+        for i in range(20):
+            self.assertEqual(self.calculator.evaluate("2^3+1", unknown=i), 9)
+        self.assertEqual(len(self.calculator.cache.get("2^3+1").natives), 1)
+
+    def test_limited_natives(self):
+        # Only limited number of lowered functions is kept (other values of options are interpreted)
+        for i in range(20):
+            self.assertAlmostEqual(
+                self.calculator.evaluate("sin(30)", rad=i), self.interpreter.evaluate("sin(30)", rad=i)
+            )
+        self.assertLessEqual(len(self.calculator.cache.get("sin(30)").natives), 8)
@@ -0,0 +1,80 @@
+import unittest
+from setup import *
+from logic import Observer
+
+
+class Recorder(Observer):
+
+    def __init__(self):
+        self.events = []
+
+    def start(self, stage, expression):
+        self.events.append(('start', stage, expression))
+
+    def end(self, stage, expression, seconds, error):
+        self.events.append(('end', stage, type(error).__name__ if error is not None else None))
+
+
+class OperatorRecorder(Observer):
+
+    def __init__(self):
+        self.operators = []
+
+    def operator(self, operator, pack, result):
+        self.operators.append((type(operator).__name__, pack, result))
+
+
+class TestObserver(unittest.TestCase):
+
+    def create(self, **kwargs) -> Calculator:
+        calculator = Calculator(**kwargs)
+        calculator.set_rules(
+            function=function, separator=separator, open_bracket=open_bracket, close_bracket=close_bracket,
+            number=number, b_operator=b_operator
+        )
+        return calculator
+
+    def test_stages(self):
+        recorder = Recorder()
+        calculator = self.create(observers=[recorder])
+        calculator.evaluate("2 + 3")
+        self.assertEqual(recorder.events, [
+            ('start', 'tokenize', '2+3'), ('end', 'tokenize', None),
+            ('start', 'validate', '2+3'), ('end', 'validate', None),
+            ('start', 'rpn', '2+3'), ('end', 'rpn', None),
+            ('start', 'optimize', '2+3'), ('end', 'optimize', None),
+            ('start', 'evaluate', '2+3'), ('end', 'evaluate', None)
+        ])
+        # Cached expression is only evaluated
+        recorder.events.clear()
+        calculator.evaluate("2+3")
+        self.assertEqual([x[1] for x in recorder.events], ['evaluate', 'evaluate'])
+
+    def test_failed_stage(self):
+        recorder = Recorder()
+        calculator = self.create(observers=[recorder], optimize=False)
+        self.assertRaises(CalculationException, calculator.evaluate, "1/0")
+        self.assertEqual(recorder.events[-1], ('end', 'evaluate', 'CalculationException'))
+
+    def test_operators(self):
+        for mode in Calculator.MODES:
+            recorder = OperatorRecorder()
+            calculator = self.create(mode=mode, optimize=False)
+            calculator.add_observer(recorder)
+            self.assertEqual(calculator.evaluate("2*3+add(1,2)"), 9)
+            self.assertEqual(recorder.operators, [
+                ('BinaryMultiply', [2, 3], 6), ('FunctionAdd', [1, 2], 3), ('BinaryPlus', [6, 3], 9)
+            ])
+
+    def test_remove_observer(self):
+        recorder = Recorder()
+        calculator = self.create()
+        calculator.add_observer(recorder)
+        calculator.remove_observer(recorder)
+        calculator.evaluate("2+3")
+        self.assertEqual(recorder.events, [])
+        self.assertEqual(calculator.observers, ())
+
+    def test_traces_operators(self):
+        self.assertFalse(Recorder().traces_operators)
+        self.assertTrue(OperatorRecorder().traces_operators)
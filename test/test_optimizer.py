@@ -0,0 +1,90 @@
+import unittest
+from setup import *
+from logic import Opcode, optimize_program
+
+
+class TestOptimizer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.calculator = Calculator()
+        self.calculator.set_rules(
+            function=function,
+            separator=separator,
+            constant=constant,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            ul_operator=ul_operator,
+            ul_start_operator=ul_start_operator,
+            b_operator=b_operator,
+            ur_operator=ur_operator
+        )
+
+    def program(self, expression: str):
+        self.calculator.evaluate(expression)
+        return self.calculator.cache.get(expression)
+
+    def rules(self, expression: str) -> list[str]:
+        return [x.rule for x in self.program(expression).rewrites]
+
+    def test_constant_folding(self):
+        program = self.program("2*pi+ln(e)-root(16)")
+        self.assertEqual(list(program.opcodes), [Opcode.PUSH])
+        self.assertEqual(self.rules("2*pi+ln(e)-root(16)"), ['fold'] * 5)
+        self.assertEqual(self.calculator.evaluate("2*pi+ln(e)-root(16)"), round(2 * math.pi + 1 - 4, 15))
+
+    def test_options_are_not_folded(self):
+        self.assertEqual(self.rules("sin(30)"), [])
+        self.assertAlmostEqual(self.calculator.evaluate("sin(30)", rad=True), 0.5)
+        self.assertAlmostEqual(self.calculator.evaluate("sin(30)"), math.sin(30))
+
+    def test_failing_fold(self):
+        self.assertRaises(CalculationException, self.calculator.evaluate, "1/0")
+        self.assertEqual(self.calculator.cache.get("1/0").rewrites, [])
+
+    def test_identities(self):
+        self.assertEqual(self.rules("sin(1)*1"), ['x*1'])
+        self.assertEqual(self.rules("1*sin(1)"), ['1*x'])
+        self.assertEqual(self.rules("sin(1)/1"), ['x/1'])
+        self.assertEqual(self.rules("sin(1)-0"), ['x-0'])
+        self.assertEqual(self.rules("--sin(1)"), ['--x'])
+        self.assertEqual(list(self.program("--sin(1)").opcodes), [Opcode.PUSH, Opcode.CALL])
+        # x+0 changes sign of negative zero
+        self.assertEqual(self.rules("sin(-0)+0"), ['fold'])
+        self.assertEqual(self.calculator.format_result(self.calculator.evaluate("sin(-0)+0")), "0")
+
+    def test_common_subexpressions(self):
+        program = self.program("sin(1)*sin(1)+sin(1)")
+        self.assertEqual(self.rules("sin(1)*sin(1)+sin(1)"), ['cse', 'cse'])
+        self.assertEqual(
+            list(program.opcodes),
+            [Opcode.PUSH, Opcode.CALL, Opcode.STORE, Opcode.FETCH, Opcode.BINARY, Opcode.FETCH, Opcode.BINARY]
+        )
+        self.assertEqual(program.registers, 1)
+        self.assertEqual(self.calculator.evaluate("sin(1)*sin(1)+sin(1)"), round(math.sin(1) ** 2 + math.sin(1), 15))
+
+    def test_optimized_program_is_kept(self):
+        program = self.program("sin(1)*sin(1)")
+        self.assertIs(optimize_program(program), program)
+
+    def test_matches_not_optimized(self):
+        calculator = Calculator(optimize=False)
+        calculator.set_rules(
+            function=function,
+            separator=separator,
+            constant=constant,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            ul_operator=ul_operator,
+            ul_start_operator=ul_start_operator,
+            b_operator=b_operator,
+            ur_operator=ur_operator
+        )
+        expressions = [
+            "FDiv(pow(Log(100)*Ln(e),min(MAX(3,e,pi),3.1),3)", "add(2,5,7)*sin(30)^mUL(2,2,2)", "3---2",
+            "-(2+3)!", "sin(2)*1+--cos(2)-0+sin(2)", "2" + "^1" * 5000, "-0*1"
+        ]
+        for expression in expressions:
+            with self.subTest(expression=expression):
+                self.assertEqual(repr(self.calculator.evaluate(expression)), repr(calculator.evaluate(expression)))
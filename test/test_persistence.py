@@ -0,0 +1,144 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from setup import *
+from logic import History, HistoryStore
+from logic.persistence import sqlalchemy
+
+
+@unittest.skipIf(sqlalchemy is None, "SQLAlchemy is not installed")
+class TestHistoryStore(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{os.path.join(self.directory.name, 'history.db')}"
+        self.store = HistoryStore(self.url, batch_size=4)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_write_behind(self):
+        self.store.put([(0, "1+1", "2"), (1, "2+2", "4")])
+        self.store.put([(2, "3+3", "6")])
+        self.store.flush()
+        self.assertEqual(self.store.stats['written'], 3)
+        self.assertEqual(
+            self.store.page(2),
+            [{'id': 2, 'expression': '3+3', 'result': '6'}, {'id': 1, 'expression': '2+2', 'result': '4'}]
+        )
+        self.assertEqual([x['id'] for x in self.store.page(5, 1)], [0])
+
+    def test_read_through(self):
+        history = History(2, self.store)
+        history.extend((f"{i}", f"{i}") for i in range(5))
+        self.assertEqual([x['id'] for x in history.page(3)], [4, 3, 2])
+        self.assertEqual([x['id'] for x in history.page(2, 2)], [1, 0])
+        self.assertEqual(len(history.snapshot()), 2)
+
+    def test_restart(self):
+        History(2, self.store).extend([("1+1", "2"), ("2+2", "4")])
+        self.store.close()
+        self.store = HistoryStore(self.url)
+        history = History(2, self.store)
+        self.assertEqual(history.page(5), [
+            {'id': 1, 'expression': '2+2', 'result': '4'}, {'id': 0, 'expression': '1+1', 'result': '2'}
+        ])
+        # Restarted process reserves new block of ids (unused ids of the previous block are skipped)
+        history.extend([("3+3", "6")])
+        self.assertEqual(history.page(1)[0]['id'], 1024)
+        self.assertEqual([x['id'] for x in history.page(5)], [1024, 1, 0])
+
+    def test_shared_database(self):
+        # Processes sharing the database reserve disjoint blocks of ids
+        other = HistoryStore(self.url, id_block=4)
+        try:
+            first, second = History(2, self.store), History(2, other)
+            for i in range(10):
+                first.extend([(f"{i}", "a")])
+                second.extend([(f"{i}", "b"), (f"{i}", "b")])
+                # Next blocks are reserved in the background (entries are persisted only with reserved ids)
+                other.flush()
+            self.store.flush()
+            other.flush()
+            self.assertEqual(self.store.stats['failures'] + other.stats['failures'], 0)
+            ids = [x['id'] for x in self.store.page(100)]
+            self.assertEqual(len(ids), 30)
+            self.assertEqual(len(set(ids)), 30)
+        finally:
+            other.close()
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "Fork is not available")
+    def test_fork(self):
+        history = History(2, self.store)
+        history.extend([("1+1", "2")])
+        self.store.flush()
+        pid = os.fork()
+        if pid == 0:
+            # Child process writes with store inherited from parent (own connections, writer and ids)
+            # - ids of the child are reserved in the background right after fork
+            try:
+                self.store.flush()
+                history.extend([("2+2", "4")])
+                self.store.close()
+                os._exit(0 if self.store.stats == {'written': 2, 'failures': 0, 'pending': 0} else 1)
+            except BaseException:
+                os._exit(2)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        history.extend([("3+3", "6")])
+        self.store.flush()
+        self.assertEqual(self.store.stats['failures'], 0)
+        self.assertEqual(sorted(x['expression'] for x in self.store.page(10)), ["1+1", "2+2", "3+3"])
+
+    def test_reserved_ahead(self):
+        store = HistoryStore(self.url, id_block=4)
+        try:
+            history = History(10, store)
+            history.extend([("1+1", "2"), ("2+2", "4"), ("3+3", "6")])
+            # The next block is reserved by the background writer before the current one runs out
+            store.flush()
+            with mock.patch.object(store, '_HistoryStore__reserve_block', side_effect=RuntimeError("database")):
+                history.extend([("4+4", "8"), ("5+5", "10")])
+                self.assertEqual(store.stats['failures'], 0)
+        finally:
+            store.close()
+        self.assertEqual(len(self.store.page(10)), 5)
+
+    def test_reservation_failure(self):
+        calculator = Calculator(history_size=10, history_store=self.store)
+        calculator.set_rules(number=number, b_operator=b_operator)
+        with mock.patch.object(self.store, '_HistoryStore__reserve_block', side_effect=RuntimeError("database")):
+            with self.assertLogs('logic', 'WARNING') as logs:
+                # Evaluation never fails because of the store (entries without ids are kept only in memory)
+                for i in range(1100):
+                    self.assertEqual(calculator.evaluate(f"{i}+1", True), i + 1)
+                self.store.flush()
+        self.assertTrue(any("not persisted" in x for x in logs.output))
+        self.assertGreater(self.store.stats['failures'], 0)
+        ids = [x['id'] for x in calculator.history_buffer.page(10)]
+        self.assertEqual(ids, sorted(set(ids), reverse=True))
+
+        # Persisting continues once ids are reserved again
+        calculator.evaluate("2+2", True)
+        self.store.flush()
+        calculator.evaluate("3+3", True)
+        self.store.flush()
+        self.assertEqual(self.store.page(1)[0]['expression'], "3+3")
+
+    def test_failure_logged(self):
+        self.store.put([(0, "1+1", "2")])
+        self.store.flush()
+        with self.assertLogs('logic.persistence', 'ERROR'):
+            self.store.put([(0, "1+1", "2")])
+            self.store.flush()
+        self.assertEqual(self.store.stats['failures'], 1)
+
+    def test_calculator(self):
+        calculator = Calculator(history_size=1, history_store=self.store)
+        calculator.set_rules(number=number, b_operator=b_operator)
+        calculator.evaluate_batch([("1+1", dict()), ("2+2", dict())], True)
+        self.assertEqual(len(calculator.history), 1)
+        self.assertEqual([x['result'] for x in calculator.history_buffer.page(2)], ['4', '2'])
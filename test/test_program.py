@@ -0,0 +1,57 @@
+import unittest
+from setup import *
+from logic import Program, Opcode, TokenStream
+
+
+class TestProgram(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tokens = TokenStream("2+3", (Number, BinaryPlus))
+        self.tokens.append(0, 0, 1)
+        self.tokens.append(1, 1, 2)
+        self.tokens.append(0, 2, 3)
+        self.program = Program(self.tokens)
+        self.program.push(2.0, 0)
+        self.program.push(3.0, 2)
+        self.program.apply(Opcode.BINARY, BinaryPlus.flyweight(), 1)
+
+    def test_instructions(self):
+        self.assertEqual(len(self.program), 3)
+        self.assertEqual(list(self.program.opcodes), [Opcode.PUSH, Opcode.PUSH, Opcode.BINARY])
+        self.assertEqual(list(self.program.operands), [0, 1, 0])
+        self.assertEqual(list(self.program.arities), [0, 0, 2])
+        self.assertEqual(self.program.constants, [2.0, 3.0])
+        self.assertEqual(self.program.operators, [BinaryPlus.flyweight()])
+        self.assertEqual(self.program.token_at(2), BinaryPlus("+", 1, 2))
+
+    def test_operators_pool(self):
+        self.program.apply(Opcode.BINARY, BinaryPlus.flyweight(), 1)
+        self.program.apply(Opcode.UNARY, UnaryMinus.flyweight(), 1)
+        self.assertEqual(len(self.program.operators), 2)
+        self.assertEqual(list(self.program.operands)[3:], [0, 1])
+
+    def test_long_chain(self):
+        calculator = Calculator()
+        calculator.set_rules(number=number, b_operator=b_operator, ul_operator=ul_operator)
+        self.assertEqual(calculator.evaluate("+".join(["1"] * 20000)), 20000)
+        self.assertEqual(calculator.evaluate("-".join(["1"] * 20001)), -19999)
+        self.assertEqual(calculator.evaluate("2" + "^1" * 20000), 2)
+
+    def test_call_arity(self):
+        self.program.apply(Opcode.CALL, FunctionAdd.flyweight(), 1, 3)
+        self.program.apply(Opcode.UNARY, UnaryMinus.flyweight(), 1)
+        self.assertEqual(list(self.program.arities)[3:], [3, 1])
+
+    def test_variadic_call(self):
+        calculator = Calculator()
+        calculator.set_rules(function=function, separator=separator, open_bracket=open_bracket,
+                             close_bracket=close_bracket, number=number)
+        self.assertEqual(calculator.evaluate(f"add({','.join(['1'] * 20000)})"), 20000)
+        self.assertEqual(calculator.evaluate("add(1,add(2,3),4)"), 10)
+        self.assertRaises(SeparatorException, calculator.evaluate, "(1,2)")
+        self.assertRaises(SeparatorException, calculator.evaluate, "6,7")
+
+    def test_cost(self):
+        self.assertEqual(self.program.cost, 5)
+        self.program.apply(Opcode.CALL, FunctionPow.flyweight(), 1, 3)
+        self.assertEqual(self.program.cost, 12)
@@ -24,5 +24,11 @@ class TestRuleset(unittest.TestCase):
         )
         self.assertEqual(self.ruleset.regex.pattern, "(?<=ADD|DIV)(PI|E)(?=DIV|ADD)")
 
+    def test_named_regex(self):
+        self.ruleset = Ruleset([PIConstant, EConstant], after=[FunctionAdd])
+        self.assertEqual(self.ruleset.named_regex("c").pattern, "(?:(?P<c__0>PI)|(?P<c__1>E))(?=ADD)")
+        self.assertEqual(self.ruleset.groups("c"), {"c__0": PIConstant, "c__1": EConstant})
+        self.assertEqual(self.ruleset.named_regex("c").match("EADD").lastgroup, "c__1")
+
     def test_empty_ruleset(self):
         self.assertRaises(ValueError, Ruleset, [])
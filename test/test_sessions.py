@@ -0,0 +1,73 @@
+import sys
+import threading
+import unittest
+from setup import *
+from logic import SessionHistories
+
+
+class TestSessionHistories(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.sessions = SessionHistories(session_capacity=2, max_entries=4, shards=1, session_overhead=0)
+
+    def test_partitions(self):
+        self.sessions.extend("a", [("1+1", "2")])
+        self.sessions.extend("b", [("2+2", "4")])
+        self.assertEqual(self.sessions.get("a").snapshot(), [{'expression': '1+1', 'result': '2'}])
+        self.assertEqual(self.sessions.get("b").snapshot(), [{'expression': '2+2', 'result': '4'}])
+        self.assertEqual(self.sessions.get("c"), None)
+
+    def test_least_recently_active_eviction(self):
+        self.sessions.extend("a", [("1", "1"), ("2", "2")])
+        self.sessions.extend("b", [("3", "3")])
+        self.sessions.extend("a", [("4", "4")])
+        self.sessions.extend("c", [("5", "5")])
+        self.sessions.extend("c", [("6", "6")])
+        self.assertEqual(self.sessions.get("b"), None)
+        self.assertNotEqual(self.sessions.get("a"), None)
+        self.assertEqual(self.sessions.stats, {'sessions': 2, 'entries': 4, 'evictions': 1})
+
+    def test_session_overhead(self):
+        # Sessions count against the cap even if they have a single entry
+        sessions = SessionHistories(session_capacity=10, max_entries=100, shards=1, session_overhead=9)
+        for i in range(50):
+            sessions.extend(f"session-{i}", [("1+1", "2")])
+        self.assertEqual(sessions.stats, {'sessions': 10, 'entries': 10, 'evictions': 40})
+        self.assertNotEqual(sessions.get("session-49"), None)
+        self.assertEqual(sessions.get("session-39"), None)
+
+    def test_history_grows(self):
+        # Memory of session history grows with its entries (not allocated up front)
+        sessions = SessionHistories(session_capacity=10_000, max_entries=1_000_000, shards=1)
+        sessions.extend("a", [("1+1", "2")])
+        self.assertLess(sys.getsizeof(sessions.get("a")._History__expressions), 1000)
+
+    def test_concurrent_writes(self):
+        sessions = SessionHistories(session_capacity=1000, max_entries=64_000, shards=8)
+
+        def work(session: str) -> None:
+            for i in range(500):
+                sessions.extend(session, [(f"{i}", f"{i}")])
+
+        threads = [threading.Thread(target=work, args=(f"session-{i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sessions.stats['entries'], 4000)
+
+    def test_invalid_configuration(self):
+        self.assertRaises(ValueError, SessionHistories, 0)
+        self.assertRaises(ValueError, SessionHistories, 100, 10)
+        self.assertRaises(ValueError, SessionHistories, 100, 100, 1)
+        self.assertRaises(ValueError, SessionHistories, 100, 1000, 1, -1)
+
+    def test_calculator(self):
+        calculator = Calculator(sessions=SessionHistories())
+        calculator.set_rules(number=number, b_operator=b_operator)
+        calculator.evaluate("1+1", True, "a")
+        calculator.evaluate_batch([("2+2", dict())], True, "b")
+        calculator.evaluate("3+3", True)
+        self.assertEqual(calculator.session_history("a").snapshot(), [{'expression': '1+1', 'result': '2'}])
+        self.assertEqual(calculator.session_history("b").snapshot(), [{'expression': '2+2', 'result': '4'}])
+        self.assertEqual(calculator.history, [{'expression': '3+3', 'result': '6'}])
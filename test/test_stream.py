@@ -0,0 +1,56 @@
+import tracemalloc
+import unittest
+from setup import *
+from logic import Tokenizer, TokenStream
+
+
+class TestTokenStream(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.stream = TokenStream("2+pi", (Number, BinaryPlus, PIConstant))
+        self.stream.append(0, 0, 1)
+        self.stream.append(1, 1, 2)
+        self.stream.append(2, 2, 4)
+
+    def test_access(self):
+        self.assertEqual(len(self.stream), 3)
+        self.assertEqual(self.stream[2], PIConstant("pi", 2, 4))
+        self.assertEqual(self.stream[-1], PIConstant("pi", 2, 4))
+        self.assertEqual(self.stream[:2], [Number("2", 0, 1), BinaryPlus("+", 1, 2)])
+        self.assertEqual(self.stream.type_at(1), BinaryPlus)
+        self.assertEqual(self.stream.value_at(0), "2")
+        self.assertIs(self.stream.flyweight_at(1), BinaryPlus.flyweight())
+        self.assertEqual(list(map(type, self.stream)), [Number, BinaryPlus, PIConstant])
+        self.assertRaises(IndexError, self.stream.__getitem__, 3)
+
+    def test_copy(self):
+        copy = self.stream.copy()
+        copy.append(1, 4, 5)
+        self.assertEqual(len(self.stream), 3)
+        self.assertEqual(copy[:3], list(self.stream))
+        self.assertEqual(copy.source, self.stream.source)
+
+    def test_flyweight(self):
+        self.assertIs(BinaryPlus.flyweight(), BinaryPlus.flyweight())
+        self.assertIsNot(BinaryPlus.flyweight(), BinaryMinus.flyweight())
+        self.assertEqual(BinaryPlus.flyweight().operation([1, 2]), 3)
+
+    def test_memory(self):
+        tokenizer = Tokenizer()
+        tokenizer.set_rules(number=number, b_operator=b_operator)
+        expression = "+".join(["12"] * 5000)
+        tokenizer.parse("1")
+
+        tracemalloc.start()
+        try:
+            stream = tokenizer.parse(expression)
+            _, stream_peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            tokens = list(stream)
+            _, list_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # Stream stores only codes and offsets (token objects are far heavier)
+        self.assertEqual(len(tokens), 9999)
+        self.assertLess(stream_peak * 5, list_peak)
@@ -88,12 +88,15 @@ class TestTokenizer(unittest.TestCase):
         pattern = re.compile(
             fr"""{'|'.join(
                 map(
-                    lambda x: f'(?P<{x}>{rules[x].regex.pattern})', 
+                    lambda x: rules[x].named_regex(x).pattern,
                     rules.keys())
             )}""",
             re.X | re.I
         )
         self.assertEqual(self.tokenizer._Tokenizer__pattern.pattern, pattern.pattern)
+        types = self.tokenizer._Tokenizer__types
+        self.assertEqual(types[self.tokenizer._Tokenizer__dispatch["constant__0"]], PIConstant)
+        self.assertEqual(types[self.tokenizer._Tokenizer__dispatch["invalid__0"]], AnyChar)
 
     def test_set_validator_error(self):
         self.assertRaises(ValueError, self.tokenizer.set_validators, a=2)
@@ -104,3 +107,48 @@ class TestTokenizer(unittest.TestCase):
         self.assertRaises(ValueError, self.tokenizer.set_rules, a=2)
         self.assertRaises(ValueError, self.tokenizer.set_rules, b=Number('3', 0, 0))
         self.assertEqual(self.tokenizer.set_rules(c=separator), None)
+
+
+class TestTableTokenizer(TestTokenizer):
+
+    def setUp(self) -> None:
+        self.tokenizer = Tokenizer('table')
+
+    def test_compile(self):
+        self.tokenizer.set_rules(
+            constant=constant,
+            ur_operator=ur_operator
+        )
+        self.assertEqual(self.tokenizer._Tokenizer__scanner, None)
+        self.tokenizer.compile()
+        self.assertNotEqual(self.tokenizer._Tokenizer__scanner, None)
+        self.assertEqual(self.tokenizer._Tokenizer__pattern, None)
+
+    def test_invalid_engine(self):
+        self.assertRaises(ValueError, Tokenizer, 'unknown')
+
+    def test_engines_equivalence(self):
+        rules = dict(
+            function=function,
+            separator=separator,
+            constant=constant,
+            open_bracket=open_bracket,
+            close_bracket=close_bracket,
+            number=number,
+            ul_operator=ul_operator,
+            ul_start_operator=ul_start_operator,
+            b_operator=b_operator,
+            ur_operator=ur_operator
+        )
+        regex = Tokenizer('regex')
+        regex.set_rules(**rules)
+        self.tokenizer.set_rules(**rules)
+
+        expressions = [
+            "3---2", "-(2+3)!", "fdiv(10,4)", "FDiv(pow(Log(100)*Ln(e),min(MAX(3,e,pi),3.1),3)",
+            "1.5e+3*2", "1e5", "2e", "1.5.3", "12(", "add(2,)", "sin", ")-8-(", "pi e", "2/+7",
+            "5*3-5--2/5%2+4^3!", "-(--((((6+5)^(13%11)*2/10)--7+3)*6-3)%5*(2--(5)))*2", "x+1", ""
+        ]
+        for expression in expressions:
+            with self.subTest(expression=expression):
+                self.assertEqual(self.tokenizer.parse(expression), regex.parse(expression))
@@ -115,3 +115,8 @@ class TestTokens(unittest.TestCase):
         self.assertRaises(ValueError, EndAnchor, 'a', 0, 0)
         self.assertEqual(StartAnchor("", 0, 0).value, '')
         self.assertEqual(AnyChar("anything", 0, 0).value, 'anything')
+
+    def test_trusted(self):
+        self.assertEqual(BinaryPlus.trusted("+", 1, 2), BinaryPlus("+", 1, 2))
+        self.assertEqual(Number.trusted("a", 0, 1).value, 'a')
+        self.assertRaises(TypeError, Operator.trusted, "+", 0, 1)
@@ -1,39 +1,50 @@
 from logic.tokens import *
 from logic.errors import *
+from logic.stream import TokenStream
 
 
-def verify_groups(tokens: list[Token_t]) -> None:
+def verify_groups(tokens: TokenStream) -> None:
     """
-    Verifies if given token list consists of AnyChar (invalid state)
+    Verifies if given token stream consists of AnyChar (invalid state)
 
-    :param tokens: List of tokens
+    :param tokens: Stream of tokens
     """
-    invalid = next(filter(lambda x: isinstance(x, AnyChar), tokens), None)
-    if invalid is not None:
-        raise UnrecognizedTokenException('Invalid expression', invalid)
+    for code, kind in enumerate(tokens.types):
+        # Type codes are searched directly (tokens are not created)
+        if issubclass(kind, AnyChar) and code in tokens.codes:
+            raise UnrecognizedTokenException('Invalid expression', tokens[tokens.codes.index(code)])
 
 
-def verify_functions(tokens: list[Token_t]) -> None:
+def verify_functions(tokens: TokenStream) -> None:
     """
-    Verifies if given token list contains balanced parenthesis
+    Verifies if given token stream contains balanced parenthesis
     (and if every function is given appropriate number of arguments)
 
-    :param tokens: List of tokens
+    :param tokens: Stream of tokens
     """
-    separators = []
-    while len(tokens) > 0:
+    # Stream is traversed backwards
+    # Separators are collected for every bracket group (last one is the innermost group, first one is top level)
+    # (explicit stack instead of recurrence - nesting depth is not limited by recursion limit)
+    scopes: list[list[Token_t]] = [[]]
+    index = len(tokens)
+    while index > 0:
         # Go to next element
-        element = tokens.pop()
-        if isinstance(element, CloseBracket):
-            # In recurrence manner start scope for new bracket pair
-            verify_functions(tokens)
-        elif isinstance(element, BinaryComma):
+        index -= 1
+        element = tokens.type_at(index)
+        if issubclass(element, CloseBracket):
+            # Start scope for new bracket pair
+            scopes.append([])
+        elif issubclass(element, BinaryComma):
             # Append comma to list of separators
             # (could be used as information where invalid separators has been located)
-            separators.append(element)
-        elif isinstance(element, OpenBracket):
+            scopes[-1].append(tokens[index])
+        elif issubclass(element, OpenBracket):
             # Check if separators only occur inside function body (function token is right behind open bracket)
-            fun = tokens.pop() if len(tokens) > 0 else None
+            separators = scopes.pop()
+            fun = None
+            if index > 0:
+                index -= 1
+                fun = tokens[index]
             length = len(separators)
             if not isinstance(fun, Function) and length > 0:
                 raise SeparatorException('Separators outside function body', separators, fun)
@@ -48,9 +59,11 @@ def verify_functions(tokens: list[Token_t]) -> None:
                         fr'Invalid number of separators. Expected {a_min}-{a_max}. Got {length}', separators
                     )
 
-            # Return as current bracket group has been proved to be valid
-            return
+            # Top level scope closed by not matched bracket ends verification
+            if len(scopes) == 0:
+                return
 
     # Raise an error as at this point separators are outside any bracket group
-    if len(separators) > 0:
-        raise SeparatorException('Separators outside bracket group', separators)
+    for separators in reversed(scopes):
+        if len(separators) > 0:
+            raise SeparatorException('Separators outside bracket group', separators)